@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: 2026 Klarälvdalens Datakonsult AB, a KDAB Group company <info@kdab.com>
+# SPDX-License-Identifier: MIT
+
+# End-to-end benchmark of the release tooling against a local GitHub stand-in
+#
+# Builds synthetic repos (KDStateMachineEditor with a graphviz submodule, KDUtils with its
+# FetchContent dependencies, all with --tags tags), serves them with fake_github.py and times:
+#   - dependency reports (submodule and FetchContent versions)
+#   - create_release of KDStateMachineEditor 2.1.0, signed with a throwaway key, or with --from-plan
+#     prepare-release and create_release --from-plan (see release_plan.py)
+#   - sign_and_upload and verify_signature of that release
+#
+# Examples:
+# $ benchmarks/e2e_benchmark.py
+# $ benchmarks/e2e_benchmark.py --tags 5000 --large-file-mb 200 --latency 0.05 --json results.json
+# $ benchmarks/e2e_benchmark.py --from-plan
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCHMARKS_DIR, '..', 'src'))
+
+from fake_github import FakeGitHub  # noqa: E402
+from synthetic_repos import GIT_ENV, create_repo, git, version_tags  # noqa: E402
+
+KDSME_VERSION = '2.1.0'
+KDSME_CHANGES = """Version 2.1.0:
+--------------
+* Synthetic changelog entry
+
+Version 2.0.0:
+--------------
+* Older entry
+"""
+
+# name -> main branch, as in releasing.toml
+FETCHCONTENT_DEPS = {'KDBindings': 'main', 'fmt': 'master', 'spdlog': 'v1.x',
+                     'whereami': 'master', 'mio': 'master', 'doctest': 'master'}
+
+
+def fetchcontent_declare(name, url, sha1):
+    return f"FetchContent_Declare(\n    {name}\n    GIT_REPOSITORY {url}\n    GIT_TAG {sha1}\n)\n"
+
+
+def build_fixtures(github, root, tags, large_file_mb):
+    '''
+    Creates and publishes the synthetic repos. Returns a dict with the paths and sha1s benchmarks need.
+    '''
+    sources = os.path.join(root, 'sources')
+    checkouts = os.path.join(root, 'checkouts')
+    os.makedirs(checkouts)
+
+    # Dependencies are pinned to the middle tag, so there's always a newer version
+    urls = {}
+    pinned = {}
+    for name, branch in list(FETCHCONTENT_DEPS.items()) + [('graphviz', 'main')]:
+        dep_tags = version_tags(tags)
+        path = os.path.join(sources, name)
+        create_repo(path, {'README.md': f"{name}\n"}, branch, dep_tags)
+        urls[name] = github.add_repo(name, path)
+        pinned[name] = git(path, 'rev-parse', f"{dep_tags[len(dep_tags) // 2]}^{{commit}}")
+
+    cmake = ''.join(fetchcontent_declare(name, urls[name], pinned[name])
+                    for name in FETCHCONTENT_DEPS if name != 'doctest')
+    create_repo(os.path.join(sources, 'KDUtils'),
+                {'cmake/dependencies.cmake': cmake,
+                 'tests/CMakeLists.txt': fetchcontent_declare('doctest', urls['doctest'], pinned['doctest'])},
+                'main', version_tags(tags))
+    kdutils_url = github.add_repo('KDUtils', os.path.join(sources, 'KDUtils'))
+
+    kdsme_sha1 = create_repo(os.path.join(sources, 'KDStateMachineEditor'),
+                             {'CHANGES': KDSME_CHANGES, 'version.txt': f"{KDSME_VERSION}\n",
+                              'CMakeLists.txt': "project(KDStateMachineEditor)\n"},
+                             'master', version_tags(tags, last='v2.0.0'),
+                             {'3rdparty/graphviz': (urls['graphviz'], pinned['graphviz'])},
+                             large_file_mb)
+    kdsme_url = github.add_repo('KDStateMachineEditor', os.path.join(sources, 'KDStateMachineEditor'))
+    github.add_run('KDStateMachineEditor', kdsme_sha1, 'CI')
+    github.add_run('KDStateMachineEditor', kdsme_sha1, 'Create release')
+
+    kdsme_checkout = os.path.join(checkouts, 'KDStateMachineEditor')
+    kdutils_checkout = os.path.join(checkouts, 'KDUtils')
+    git(checkouts, 'clone', '-q', '--recurse-submodules', kdsme_url, kdsme_checkout)
+    git(checkouts, 'clone', '-q', kdutils_url, kdutils_checkout)
+
+    return {'kdsme_sha1': kdsme_sha1, 'kdsme_checkout': kdsme_checkout,
+            'kdutils_checkout': kdutils_checkout}
+
+
+def create_signing_key(gnupg_home):
+    os.makedirs(gnupg_home, mode=0o700)
+    subprocess.run(['gpg', '--homedir', gnupg_home, '--batch', '--passphrase', '',
+                    '--quick-gen-key', 'KDAB Products <products@example.com>', 'ed25519', 'sign', 'never'],
+                   check=True, capture_output=True)
+
+
+def timed(results, name, func):
+    start = time.monotonic()
+    ok = func()
+    results[name] = {'seconds': time.monotonic() - start, 'ok': bool(ok)}
+    print(f"--- {name}: {'ok' if ok else 'FAILED'} in {results[name]['seconds']:.2f}s")
+    return ok
+
+
+def run_benchmarks(fixtures, root, from_plan=False):
+    # Imported now, so they pick up the CI_RELEASE_TOOLS_GITHUB_* variables
+    import gh_utils
+    import release_plan
+    from changelog_utils import get_changelog
+
+    results = {}
+
+    def dependency_reports():
+        submodules = gh_utils.get_submodule_versions(fixtures['kdsme_checkout'], 'KDStateMachineEditor')
+        fetchcontents = gh_utils.get_fetchcontent_versions(fixtures['kdutils_checkout'], 'KDUtils')
+        return all(version['latest_version'] for version in submodules + fetchcontents)
+
+    def create_release():
+        notes = get_changelog('KDStateMachineEditor', KDSME_VERSION, fixtures['kdsme_sha1'])
+        work_dir = os.path.join(root, 'create_release')
+        os.makedirs(work_dir)
+        return gh_utils.create_release('KDStateMachineEditor', KDSME_VERSION, fixtures['kdsme_sha1'],
+                                       notes, fixtures['kdsme_checkout'], True, work_dir)
+
+    plan_dir = os.path.join(root, 'release-plan')
+
+    def prepare_release():
+        return release_plan.prepare_release('KDStateMachineEditor', KDSME_VERSION, fixtures['kdsme_sha1'], plan_dir)
+
+    def create_release_from_plan():
+        plan = release_plan.load_plan(os.path.join(plan_dir, release_plan.PLAN_FILENAME))
+        return plan and release_plan.publish_plan(plan, plan_dir, fixtures['kdsme_checkout'], True)
+
+    def sign_and_upload():
+        work_dir = os.path.join(root, 'sign_and_upload')
+        os.makedirs(work_dir)
+        return gh_utils.sign_and_upload('KDStateMachineEditor', KDSME_VERSION, True, work_dir)
+
+    def verify_signature():
+        work_dir = os.path.join(root, 'verify_signature')
+        os.makedirs(work_dir)
+        current_dir = os.getcwd()
+        os.chdir(work_dir)
+        try:
+            return gh_utils.verify_signature('KDStateMachineEditor', KDSME_VERSION)
+        finally:
+            os.chdir(current_dir)
+
+    timed(results, 'dependency_reports', dependency_reports)
+    if from_plan:
+        released = timed(results, 'prepare_release', prepare_release) and \
+            timed(results, 'create_release_from_plan', create_release_from_plan)
+    else:
+        released = timed(results, 'create_release', create_release)
+    if released:
+        if timed(results, 'sign_and_upload', sign_and_upload):
+            timed(results, 'verify_signature', verify_signature)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--tags', type=int, default=1000, help="Tags per repo (default: 1000)")
+    parser.add_argument('--large-file-mb', type=int, default=16,
+                        help="Size of an incompressible file in the release tarball (default: 16)")
+    parser.add_argument('--latency', type=float, default=0.0, help="Seconds added to every request")
+    parser.add_argument('--rate-limit', type=int, default=0,
+                        help="Requests per minute before the fake GitHub answers 403, 0 for unlimited")
+    parser.add_argument('--from-plan', action='store_true',
+                        help="Release via prepare-release and create_release --from-plan")
+    parser.add_argument('--json', metavar='<file>', help="Write the timings to a JSON file")
+    parser.add_argument('--keep', action='store_true', help="Keep the temporary directory")
+    args = parser.parse_args(argv)
+
+    for tool in ('git', 'gpg', 'jq', 'curl'):
+        if not shutil.which(tool):
+            print(f"error: {tool} is required")
+            return 1
+
+    root = tempfile.mkdtemp(prefix='ci-release-tools-bench-')
+    github = FakeGitHub(os.path.join(root, 'github'), latency=args.latency, rate_limit=args.rate_limit)
+    github.start()
+    os.environ.update(github.env())
+    os.environ.update(GIT_ENV)
+    os.environ['GNUPGHOME'] = os.path.join(root, 'gnupg')
+    os.environ['CI_RELEASE_TOOLS_NO_DAEMON'] = '1'
+
+    try:
+        start = time.monotonic()
+        create_signing_key(os.environ['GNUPGHOME'])
+        fixtures = build_fixtures(github, root, args.tags, args.large_file_mb)
+        print(f"--- setup: {time.monotonic() - start:.2f}s")
+
+        results = run_benchmarks(fixtures, root, args.from_plan)
+        results['http_requests'] = github.request_count
+    finally:
+        github.stop()
+        subprocess.run(['gpgconf', '--homedir', os.environ['GNUPGHOME'], '--kill', 'gpg-agent'],
+                       check=False, capture_output=True)
+        if args.keep:
+            print(f"Kept {root}")
+        else:
+            shutil.rmtree(root, ignore_errors=True)
+
+    if args.json:
+        with open(args.json, 'w', encoding='UTF-8') as f:
+            json.dump(results, f, indent=2)
+
+    return 0 if all(result['ok'] for name, result in results.items() if name != 'http_requests') else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
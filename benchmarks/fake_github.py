@@ -0,0 +1,393 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: 2026 Klarälvdalens Datakonsult AB, a KDAB Group company <info@kdab.com>
+# SPDX-License-Identifier: MIT
+
+# A local stand-in for the parts of GitHub our scripts use, for benchmarks
+#
+# Serves, over HTTP:
+#   /api/repos/<owner>/<repo>/git/refs/tags/<tag>          (GET, and POST /git/refs)
+#   /api/repos/<owner>/<repo>/commits/<ref>
+#   /api/repos/<owner>/<repo>/compare/<base>...<head>
+#   /api/repos/<owner>/<repo>/releases[/tags/<tag>]         (paginated, POST to create)
+#   /api/repos/<owner>/<repo>/releases/<id>/assets?name=    (POST to upload)
+#   /api/repos/<owner>/<repo>/actions/runs?head_sha=        (paginated)
+#   /raw/<owner>/<repo>/<ref>/<path>                        (like raw.githubusercontent.com)
+#   /<owner>/<repo>/archive/refs/tags/<tag>.tar.gz|.zip
+#   /<owner>/<repo>/releases/download/<tag>/<asset>
+#
+# Repositories are bare git repos under <root>/git/<owner>/<repo>, cloned via file://.
+# Requests can be slowed down (latency) and rate limited, like the real thing.
+# The scripts find it through the CI_RELEASE_TOOLS_GITHUB_* variables and benchmarks/bin/gh,
+# see FakeGitHub.env().
+#
+# Example:
+# $ fake_github.py --root /tmp/fake-github --port 8765 --latency 0.05
+
+import argparse
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+import zlib
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+BIN_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bin')
+DEFAULT_PER_PAGE = 30
+
+
+def _git(repo_dir, *args, check=True):
+    result = subprocess.run(['git', '-C', repo_dir] + list(args), capture_output=True, check=False)
+    if check and result.returncode != 0:
+        raise RuntimeError(f"git {' '.join(args)} failed: {result.stderr.decode()}")
+    return result
+
+
+def _now():
+    return datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+class FakeGitHub:
+    '''
+    The server's state: bare repos on disk, releases, assets and workflow runs in memory
+    '''
+
+    def __init__(self, root, owner='KDAB', latency=0.0, rate_limit=0, rate_window=60.0):
+        self.root = os.path.abspath(root)
+        self.owner = owner
+        self.latency = latency
+        self.rate_limit = rate_limit
+        self.rate_window = rate_window
+        self.releases = {}   # repo -> list of releases, newest first
+        self.assets = {}     # asset id -> bytes
+        self.runs = {}       # repo -> list of workflow runs
+        self.request_count = 0
+        self._next_id = 1
+        self._window_start = time.monotonic()
+        self._window_count = 0
+        self._lock = threading.Lock()
+        self._server = None
+        os.makedirs(self.git_dir(), exist_ok=True)
+
+    def git_dir(self, owner=None):
+        return os.path.join(self.root, 'git', owner or self.owner)
+
+    def repo_dir(self, repo, owner=None):
+        return os.path.join(self.git_dir(owner), repo)
+
+    def add_repo(self, repo, source_dir, owner=None):
+        '''
+        Publishes a local repo, as a bare clone. Returns its file:// URL.
+        '''
+        target = self.repo_dir(repo, owner)
+        subprocess.run(['git', 'clone', '-q', '--bare', source_dir, target],
+                       check=True, capture_output=True)
+        return f"file://{target}"
+
+    def add_run(self, repo, head_sha, name, status='completed', conclusion='success', run_attempt=1):
+        with self._lock:
+            run = {'id': self._new_id(), 'name': name, 'head_sha': head_sha, 'status': status,
+                   'conclusion': conclusion if status == 'completed' else None,
+                   'run_attempt': run_attempt, 'workflow_id': zlib.crc32(name.encode()),
+                   'created_at': _now(), 'updated_at': _now()}
+            self.runs.setdefault(repo, []).insert(0, run)
+        return run
+
+    def _new_id(self):
+        self._next_id += 1
+        return self._next_id
+
+    # Rate limiting and latency, applied to every request
+    def throttle(self):
+        if self.latency:
+            time.sleep(self.latency)
+
+        with self._lock:
+            self.request_count += 1
+            if not self.rate_limit:
+                return None
+            now = time.monotonic()
+            if now - self._window_start >= self.rate_window:
+                self._window_start = now
+                self._window_count = 0
+            self._window_count += 1
+            if self._window_count > self.rate_limit:
+                return int(time.time() + self.rate_window - (now - self._window_start))
+        return None
+
+    def create_release(self, repo, tag, name, body):
+        with self._lock:
+            for release in self.releases.get(repo, []):
+                if release['tag_name'] == tag:
+                    return None
+            release = {'id': self._new_id(), 'tag_name': tag, 'name': name or tag, 'body': body or '',
+                       'draft': False, 'prerelease': False, 'created_at': _now(),
+                       'published_at': _now(), 'assets': []}
+            self.releases.setdefault(repo, []).insert(0, release)
+        return release
+
+    def find_release(self, repo, tag=None, release_id=None):
+        for release in self.releases.get(repo, []):
+            if release['tag_name'] == tag or release['id'] == release_id:
+                return release
+        return None
+
+    def upload_asset(self, base_url, repo, release, name, data):
+        with self._lock:
+            release['assets'] = [asset for asset in release['assets'] if asset['name'] != name]
+            asset = {'id': self._new_id(), 'name': name, 'size': len(data),
+                     'digest': f"sha256:{hashlib.sha256(data).hexdigest()}",
+                     'updated_at': _now(),
+                     'browser_download_url':
+                         f"{base_url}/{self.owner}/{repo}/releases/download/{release['tag_name']}/{name}"}
+            release['assets'].append(asset)
+            self.assets[asset['id']] = data
+        return asset
+
+    # Serving
+    def start(self, host='127.0.0.1', port=0):
+        '''
+        Starts serving in a thread, returns the base URL
+        '''
+        handler = type('Handler', (_RequestHandler,), {'github': self})
+        self._server = ThreadingHTTPServer((host, port), handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self.url
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def env(self):
+        '''
+        Environment variables pointing our scripts at this server
+        '''
+        return {
+            'CI_RELEASE_TOOLS_GITHUB_URL': self.url,
+            'CI_RELEASE_TOOLS_GITHUB_RAW_URL': f"{self.url}/raw",
+            'CI_RELEASE_TOOLS_GITHUB_GIT_URL': f"file://{os.path.join(self.root, 'git')}",
+            'FAKE_GITHUB_URL': self.url,
+            'PATH': f"{BIN_DIR}{os.pathsep}{os.environ.get('PATH', '')}",
+        }
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    github = None  # set by FakeGitHub.start()
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        pass
+
+    def _send(self, status, body=b'', content_type='application/json', headers=None):
+        if isinstance(body, (dict, list)):
+            body = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _not_found(self):
+        self._send(404, {'message': 'Not Found'})
+
+    def _read_body(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        return self.rfile.read(length) if length else b''
+
+    def _handle(self, method):
+        reset = self.github.throttle()
+        if reset is not None:
+            self._send(403, {'message': 'API rate limit exceeded'},
+                       headers={'X-RateLimit-Remaining': '0', 'X-RateLimit-Reset': str(reset)})
+            return
+
+        url = urlsplit(self.path)
+        parts = [unquote(part) for part in url.path.strip('/').split('/')]
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+
+        try:
+            if parts[0] == 'api' and len(parts) >= 4 and parts[1] == 'repos':
+                self._api(method, parts[2], parts[3], parts[4:], query)
+            elif parts[0] == 'raw' and len(parts) >= 5 and method == 'GET':
+                self._raw(parts[1], parts[2], parts[3:])
+            elif len(parts) >= 5 and parts[2] == 'archive' and method == 'GET':
+                self._archive(parts[0], parts[1], '/'.join(parts[3:]))
+            elif len(parts) == 6 and parts[2:4] == ['releases', 'download'] and method == 'GET':
+                self._download(parts[1], parts[4], parts[5])
+            else:
+                self._not_found()
+        except BrokenPipeError:
+            pass
+
+    def do_GET(self):
+        self._handle('GET')
+
+    def do_POST(self):
+        self._handle('POST')
+
+    def _paginate(self, items, query):
+        per_page = int(query.get('per_page', DEFAULT_PER_PAGE))
+        page = int(query.get('page', 1))
+        chunk = items[(page - 1) * per_page:page * per_page]
+        headers = {}
+        if page * per_page < len(items):
+            path = urlsplit(self.path).path
+            headers['Link'] = (f'<{self.github.url}{path}?per_page={per_page}&page={page + 1}'
+                               + ''.join(f"&{k}={v}" for k, v in query.items() if k not in ('page', 'per_page'))
+                               + '>; rel="next"')
+        return chunk, headers
+
+    def _api(self, method, owner, repo, rest, query):
+        github = self.github
+        repo_dir = github.repo_dir(repo, owner)
+        if not os.path.isdir(repo_dir):
+            self._not_found()
+            return
+
+        if rest[:3] == ['git', 'refs', 'tags'] and method == 'GET':
+            tag = '/'.join(rest[3:])
+            result = _git(repo_dir, 'rev-parse', '--verify', '-q', f"refs/tags/{tag}", check=False)
+            if result.returncode != 0:
+                self._not_found()
+            else:
+                self._send(200, {'ref': f"refs/tags/{tag}",
+                                 'object': {'sha': result.stdout.decode().strip(), 'type': 'commit'}})
+        elif rest == ['git', 'refs'] and method == 'POST':
+            body = json.loads(self._read_body() or b'{}')
+            ref, sha = body.get('ref'), body.get('sha')
+            if _git(repo_dir, 'rev-parse', '--verify', '-q', ref, check=False).returncode == 0:
+                self._send(422, {'message': 'Reference already exists'})
+            elif _git(repo_dir, 'update-ref', ref, sha, check=False).returncode != 0:
+                self._send(422, {'message': 'Object does not exist'})
+            else:
+                self._send(201, {'ref': ref, 'object': {'sha': sha, 'type': 'commit'}})
+        elif rest[:1] == ['commits'] and len(rest) >= 2 and method == 'GET':
+            result = _git(repo_dir, 'rev-parse', '--verify', '-q', f"{'/'.join(rest[1:])}^{{commit}}",
+                          check=False)
+            if result.returncode != 0:
+                self._not_found()
+            else:
+                self._send(200, {'sha': result.stdout.decode().strip()})
+        elif rest[:1] == ['compare'] and '...' in '/'.join(rest[1:]) and method == 'GET':
+            base, head = '/'.join(rest[1:]).split('...', 1)
+            result = _git(repo_dir, 'rev-list', '--left-right', '--count', f"{base}...{head}", check=False)
+            if result.returncode != 0:
+                self._not_found()
+                return
+            behind_by, ahead_by = (int(count) for count in result.stdout.split())
+            status = {(False, False): 'identical', (True, False): 'ahead',
+                      (False, True): 'behind', (True, True): 'diverged'}[(ahead_by > 0, behind_by > 0)]
+            self._send(200, {'status': status, 'ahead_by': ahead_by, 'behind_by': behind_by})
+        elif rest == ['releases'] and method == 'GET':
+            chunk, headers = self._paginate(github.releases.get(repo, []), query)
+            self._send(200, chunk, headers=headers)
+        elif rest == ['releases'] and method == 'POST':
+            body = json.loads(self._read_body() or b'{}')
+            release = github.create_release(repo, body.get('tag_name'), body.get('name'), body.get('body'))
+            if release is None:
+                self._send(422, {'message': 'Release already exists'})
+            else:
+                self._send(201, release)
+        elif rest[:2] == ['releases', 'tags'] and method == 'GET':
+            release = github.find_release(repo, tag='/'.join(rest[2:]))
+            if release is None:
+                self._not_found()
+            else:
+                self._send(200, release)
+        elif len(rest) == 3 and rest[0] == 'releases' and rest[2] == 'assets' and method == 'POST':
+            release = github.find_release(repo, release_id=int(rest[1]))
+            if release is None or 'name' not in query:
+                self._not_found()
+            else:
+                self._send(201, github.upload_asset(github.url, repo, release, query['name'],
+                                                    self._read_body()))
+        elif rest == ['actions', 'runs'] and method == 'GET':
+            runs = [run for run in github.runs.get(repo, [])
+                    if 'head_sha' not in query or run['head_sha'] == query['head_sha']]
+            chunk, headers = self._paginate(runs, query)
+            self._send(200, {'total_count': len(runs), 'workflow_runs': chunk}, headers=headers)
+        else:
+            self._not_found()
+
+    def _raw(self, owner, repo, rest):
+        # The ref can contain slashes: refs/heads/<branch>/<path>
+        if rest[:2] == ['refs', 'heads'] and len(rest) > 3:
+            ref, path = '/'.join(rest[:3]), '/'.join(rest[3:])
+        else:
+            ref, path = rest[0], '/'.join(rest[1:])
+
+        result = _git(self.github.repo_dir(repo, owner), 'show', f"{ref}:{path}", check=False)
+        if result.returncode != 0:
+            self._not_found()
+        else:
+            self._send(200, result.stdout, 'text/plain')
+
+    def _archive(self, owner, repo, ref_path):
+        for suffix, archive_format, content_type in (('.tar.gz', 'tar.gz', 'application/gzip'),
+                                                     ('.zip', 'zip', 'application/zip')):
+            if ref_path.endswith(suffix):
+                ref = ref_path[:-len(suffix)]
+                break
+        else:
+            self._not_found()
+            return
+
+        name = ref.split('/')[-1]
+        result = _git(self.github.repo_dir(repo, owner), 'archive', f"--format={archive_format}",
+                      f"--prefix={repo}-{name.lstrip('v')}/", ref, check=False)
+        if result.returncode != 0:
+            self._not_found()
+        else:
+            self._send(200, result.stdout, content_type)
+
+    def _download(self, repo, tag, name):
+        release = self.github.find_release(repo, tag=tag)
+        asset = next((asset for asset in release['assets'] if asset['name'] == name), None) \
+            if release else None
+        if asset is None:
+            self._not_found()
+        else:
+            self._send(200, self.github.assets[asset['id']], 'application/octet-stream')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--root', required=True, help="Directory with git/<owner>/<repo> bare repos")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.0, help="Seconds added to every request")
+    parser.add_argument('--rate-limit', type=int, default=0,
+                        help="Requests allowed per --rate-window seconds, 0 for unlimited")
+    parser.add_argument('--rate-window', type=float, default=60.0)
+    args = parser.parse_args(argv)
+
+    github = FakeGitHub(args.root, latency=args.latency, rate_limit=args.rate_limit,
+                        rate_window=args.rate_window)
+    github.start(port=args.port)
+    for key, value in github.env().items():
+        print(f"export {key}='{value}'")
+    sys.stdout.flush()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        github.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,197 @@
+# SPDX-FileCopyrightText: 2026 Klarälvdalens Datakonsult AB, a KDAB Group company <info@kdab.com>
+# SPDX-License-Identifier: MIT
+
+# Benchmarks of the hot paths, run by run_benchmarks.py
+#
+# Each benchmark is a setup function taking a scratch directory and returning the callable to time.
+# Nothing here needs network: downloads are replayed from a cassette (see src/cassette.py) and
+# repos are synthetic (see synthetic_repos.py).
+
+import contextlib
+import json
+import os
+
+from synthetic_repos import create_repo, git, version_tags
+
+BENCHMARKS = {}
+
+
+def benchmark(func):
+    BENCHMARKS[func.__name__] = func
+    return func
+
+
+def _sha1(i):
+    return f"{i:040x}"
+
+
+def _generated_cmake(count):
+    '''
+    count FetchContent_Declare() blocks, in the styles found in our repos
+    '''
+    blocks = []
+    for i in range(count):
+        if i % 3 == 0:
+            blocks.append(f"FetchContent_Declare(dep{i} GIT_REPOSITORY https://github.com/example/dep{i}.git "
+                          f"GIT_TAG {_sha1(i)})")
+        elif i % 3 == 1:
+            blocks.append(f"FetchContent_Declare(\n    dep{i}\n    # pinned on purpose\n"
+                          f"    GIT_REPOSITORY https://github.com/example/dep{i}.git\n"
+                          f"    GIT_TAG {_sha1(i)} # v1.{i}\n)")
+        else:
+            blocks.append(f"FetchContent_Declare(dep{i} \\\n    GIT_REPOSITORY https://github.com/example/dep{i} \\\n"
+                          f"    GIT_TAG {_sha1(i)})")
+        blocks.append(f"FetchContent_MakeAvailable(dep{i})\nset(DEP{i}_OPTION ON)\n")
+    return '\n'.join(blocks)
+
+
+@benchmark
+def fetchcontent_parse(_):
+    import utils
+    code = _generated_cmake(2000)
+
+    def run():
+        assert len(utils.get_fetchcontents_from_code(code)) == 2000
+        assert len(utils.get_fetchcontents_from_code(code, 'dep1999')) == 1
+    return run
+
+
+@benchmark
+def fetchcontent_set_sha1(scratch_dir):
+    import utils
+    code = _generated_cmake(2000)
+    filename = os.path.join(scratch_dir, 'dependencies.cmake')
+
+    def run():
+        with open(filename, 'w', encoding='UTF-8') as f:
+            f.write(code)
+        utils.set_fetchcontent_sha1(filename, _sha1(1999), 'f' * 40, 'v2.0.0')
+    return run
+
+
+@contextlib.contextmanager
+def _replaying(cassette_file):
+    os.environ['CI_RELEASE_TOOLS_CASSETTE'] = cassette_file
+    os.environ['CI_RELEASE_TOOLS_CASSETTE_MODE'] = 'replay'
+    try:
+        yield
+    finally:
+        del os.environ['CI_RELEASE_TOOLS_CASSETTE']
+        del os.environ['CI_RELEASE_TOOLS_CASSETTE_MODE']
+
+
+def _changelog_benchmark(scratch_dir, proj_name, filename, text, version):
+    import changelog_utils
+    import utils
+    sha1 = 'a' * 40
+    cassette_file = os.path.join(scratch_dir, 'cassette.json')
+    with open(cassette_file, 'w', encoding='UTF-8') as f:
+        json.dump({'interactions': [{'kind': 'http',
+                                     'request': f"{utils.GITHUB_RAW_URL}/KDAB/{proj_name}/{sha1}/{filename}",
+                                     'response': {'body': text}}]}, f)
+
+    def run():
+        with _replaying(cassette_file):
+            assert changelog_utils.get_changelog(proj_name, version, sha1)
+    return run
+
+
+@benchmark
+def changelog_kddockwidgets(scratch_dir):
+    # About 4 MB, the version asked for is the oldest, so the whole file is scanned
+    sections = [f"* v{i // 100}.{i % 100}.0 (unreleased)\n" + ''.join(
+        f"  - Fixed issue #{i * 100 + j} in the docking layout when undocking nested widgets\n"
+        for j in range(40)) for i in range(1000, 0, -1)]
+    return _changelog_benchmark(scratch_dir, 'KDDockWidgets', 'Changelog', '\n'.join(sections), '0.1.0')
+
+
+@benchmark
+def changelog_generic(scratch_dir):
+    sections = [f"Version {i // 100}.{i % 100}.0:\n-----------------\n" + ''.join(
+        f"* Fixed issue #{i * 100 + j} in the state machine view when zooming\n"
+        for j in range(40)) for i in range(1000, 0, -1)]
+    return _changelog_benchmark(scratch_dir, 'KDStateMachineEditor', 'CHANGES', '\n'.join(sections), '0.1.0')
+
+
+@benchmark
+def version_sort_10k(_):
+    from packaging.version import Version
+    import gh_utils
+    import version_utils
+    tags = [f"{prefix}{tag}" for prefix, tag in
+            zip(('v', 'kdsoap-', '', 'release-') * 2500, version_tags(10000, prefix=''))]
+
+    def run():
+        versions = [gh_utils.extract_version_from_tag(tag) for tag in tags]
+        versions = sorted((v for v in versions if version_utils.is_numeric(v)), key=Version)
+        assert all(version_utils.has_newer_version(a, b) for a, b in zip(versions, versions[1:]))
+    return run
+
+
+@benchmark
+def project_lookup(_):
+    import utils
+    names = list(utils.get_projects())
+
+    def run():
+        for _ in range(2000):
+            for name in names:
+                utils.get_project(name)
+                utils.get_builtin_dependencies(name)
+    return run
+
+
+def _project_with_submodule(scratch_dir, tags):
+    '''
+    A synthetic KDStateMachineEditor with a graphviz submodule, published under scratch_dir/git/KDAB
+    '''
+    sources = os.path.join(scratch_dir, 'sources')
+    published = os.path.join(scratch_dir, 'git', 'KDAB')
+    os.makedirs(published)
+
+    graphviz_tags = version_tags(tags)
+    create_repo(os.path.join(sources, 'graphviz'),
+                {f"lib/file{i}.c": f"int f{i}() {{ return {i}; }}\n" * 50 for i in range(200)},
+                'main', graphviz_tags)
+    git(sources, 'clone', '-q', '--bare', 'graphviz', os.path.join(published, 'graphviz'))
+    graphviz_url = f"file://{os.path.join(published, 'graphviz')}"
+    pinned = git(os.path.join(sources, 'graphviz'), 'rev-parse', f"{graphviz_tags[tags // 2]}^{{commit}}")
+
+    sha1 = create_repo(os.path.join(sources, 'KDStateMachineEditor'),
+                       {f"src/file{i}.cpp": f"void f{i}() {{}}\n" * 50 for i in range(500)},
+                       'master', version_tags(100, last='v2.0.0'),
+                       {'3rdparty/graphviz': (graphviz_url, pinned)})
+    git(sources, 'clone', '-q', '--bare', 'KDStateMachineEditor',
+        os.path.join(published, 'KDStateMachineEditor'))
+    return sha1, f"file://{os.path.join(scratch_dir, 'git')}"
+
+
+@benchmark
+def tarball_with_submodules(scratch_dir):
+    import utils
+    sha1, git_url = _project_with_submodule(scratch_dir, 100)
+    work_dir = os.path.join(scratch_dir, 'work')
+    os.makedirs(work_dir)
+
+    def run():
+        previous_url = utils.GITHUB_GIT_URL
+        utils.GITHUB_GIT_URL = git_url
+        try:
+            assert utils.create_tarball_with_submodules('KDStateMachineEditor', sha1, '2.1.0', work_dir)
+        finally:
+            utils.GITHUB_GIT_URL = previous_url
+    return run
+
+
+@benchmark
+def submodule_versions(scratch_dir):
+    import gh_utils
+    _, git_url = _project_with_submodule(scratch_dir, 2000)
+    checkout = os.path.join(scratch_dir, 'checkout')
+    git(scratch_dir, 'clone', '-q', '--recurse-submodules', f"{git_url}/KDAB/KDStateMachineEditor", checkout)
+
+    def run():
+        versions = gh_utils.get_submodule_versions(checkout, 'KDStateMachineEditor')
+        assert versions[0]['latest_version'] == 'v0.20.0'
+        assert versions[0]['current_version'] == 'v0.10.1'
+    return run
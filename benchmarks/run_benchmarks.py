@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: 2026 Klarälvdalens Datakonsult AB, a KDAB Group company <info@kdab.com>
+# SPDX-License-Identifier: MIT
+
+# Runs the benchmarks of hot_paths.py and compares them with a baseline
+#
+# Each benchmark runs --repeat times, its best time is kept. Results are written as JSON and
+# compared with benchmarks/baseline.json: the run fails if a benchmark is more than --threshold
+# slower than its baseline.
+#
+# Wall-clock times depend on the machine and on what else it's doing, so each benchmark is
+# compared in units of a calibration workload (Python code and git processes, like the
+# benchmarks), timed alternately with it. A benchmark which still looks slower is measured again
+# before it's reported, a single noisy run doesn't fail the gate. Regenerate the baseline with
+# --update-baseline when the benchmarks change.
+#
+# Examples:
+# $ benchmarks/run_benchmarks.py
+# $ benchmarks/run_benchmarks.py --filter changelog --repeat 10
+# $ benchmarks/run_benchmarks.py --update-baseline
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCHMARKS_DIR, '..', 'src'))
+
+from hot_paths import BENCHMARKS  # noqa: E402
+from synthetic_repos import GIT_ENV  # noqa: E402
+
+DEFAULT_BASELINE = os.path.join(BENCHMARKS_DIR, 'baseline.json')
+DEFAULT_THRESHOLD = 0.5
+
+# Differences below this are noise, whatever the ratio
+NOISE_FLOOR_SECONDS = 0.002
+
+CALIBRATION_PROCESSES = 5
+
+
+@contextlib.contextmanager
+def quiet(enabled=True):
+    '''
+    Silences stdout/stderr, including the subprocesses' (git, tar, ...)
+    '''
+    if not enabled:
+        yield
+        return
+
+    sys.stdout.flush()
+    sys.stderr.flush()
+    saved = os.dup(1), os.dup(2)
+    with open(os.devnull, 'w', encoding='UTF-8') as devnull:
+        os.dup2(devnull.fileno(), 1)
+        os.dup2(devnull.fileno(), 2)
+        try:
+            yield
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os.dup2(saved[0], 1)
+            os.dup2(saved[1], 2)
+            os.close(saved[0])
+            os.close(saved[1])
+
+
+def calibration_workload():
+    '''
+    Some of what the benchmarks do: Python string processing, and starting git
+    '''
+    import subprocess
+
+    words = [f"dep{i} GIT_TAG {i:040x}" for i in range(20000)]
+    assert len({word.split()[-1] for word in sorted(words, reverse=True)}) == len(words)
+    for _ in range(CALIBRATION_PROCESSES):
+        subprocess.run(['git', '--version'], stdout=subprocess.DEVNULL, check=True)
+
+
+def timed(func):
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def run_benchmark(name, repeat, verbose=False):
+    '''
+    Times the benchmark and the calibration workload alternately, so both see the same machine
+    '''
+    scratch_dir = tempfile.mkdtemp(prefix=f"bench-{name}-")
+    try:
+        with quiet(not verbose):
+            func = BENCHMARKS[name](scratch_dir)
+            func()  # warm up: imports, caches
+            calibration_workload()
+            times = []
+            calibrations = []
+            for _ in range(repeat):
+                calibrations.append(timed(calibration_workload))
+                times.append(timed(func))
+    finally:
+        shutil.rmtree(scratch_dir, ignore_errors=True)
+
+    calibration = min(calibrations)
+    return {'min': min(times), 'median': statistics.median(times), 'repeat': repeat,
+            'calibration': calibration, 'normalized': min(times) / calibration}
+
+
+def regressed(result, base, threshold):
+    '''
+    Returns (ratio to the baseline, whether that's a regression). Calibrated results are compared
+    in calibration units, older baselines without calibration by wall-clock time.
+    '''
+    if 'normalized' in result and 'normalized' in base:
+        ratio = result['normalized'] / base['normalized']
+        # The baseline's time, scaled to this machine
+        difference = result['min'] - base['normalized'] * result['calibration']
+    else:
+        ratio = result['min'] / base['min']
+        difference = result['min'] - base['min']
+    return ratio, ratio > 1 + threshold and difference > NOISE_FLOOR_SECONDS
+
+
+def compare(results, baseline, threshold, rerun=None):
+    '''
+    Returns the names of the benchmarks which regressed. rerun(name) measures a benchmark again,
+    it only regressed if it did both times.
+    '''
+    regressions = []
+    width = max(len(name) for name in results)
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base:
+            print(f"    {name.ljust(width)}  {result['min'] * 1000:9.2f} ms  (no baseline)")
+            continue
+
+        ratio, slower = regressed(result, base, threshold)
+        if slower and rerun:
+            result = results[name] = rerun(name)
+            ratio, slower = regressed(result, base, threshold)
+        print(f"    {name.ljust(width)}  {result['min'] * 1000:9.2f} ms  "
+              f"{ratio:5.2f}x the baseline{'  REGRESSION' if slower else ''}")
+        if slower:
+            regressions.append(name)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--filter', help="Only run benchmarks whose name contains this")
+    parser.add_argument('--repeat', type=int, default=5, help="Runs per benchmark (default: 5)")
+    parser.add_argument('--output', default='benchmark-results.json',
+                        help="Where to write the results (default: benchmark-results.json)")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE,
+                        help="Baseline to compare with (default: benchmarks/baseline.json)")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help=f"Allowed slowdown before failing, 0.5 = 50%% (default: {DEFAULT_THRESHOLD})")
+    parser.add_argument('--update-baseline', action='store_true',
+                        help="Write the results to the baseline instead of comparing")
+    parser.add_argument('--verbose', action='store_true', help="Don't silence the benchmarked code")
+    args = parser.parse_args(argv)
+
+    os.environ.update(GIT_ENV)
+    os.environ['CI_RELEASE_TOOLS_NO_DAEMON'] = '1'
+
+    names = [name for name in BENCHMARKS if not args.filter or args.filter in name]
+    if not names:
+        print(f"No benchmark matches '{args.filter}'")
+        return 1
+
+    results = {}
+    for name in names:
+        results[name] = run_benchmark(name, args.repeat, args.verbose)
+        print(f"{name}: {results[name]['min'] * 1000:.2f} ms")
+
+    report = {'python': platform.python_version(), 'machine': platform.machine(),
+              'benchmarks': results}
+    with open(args.output, 'w', encoding='UTF-8') as f:
+        json.dump(report, f, indent=2)
+
+    if args.update_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, 'r', encoding='UTF-8') as f:
+                baseline = json.load(f)
+        baseline.setdefault('benchmarks', {}).update(results)
+        baseline.update({'python': report['python'], 'machine': report['machine']})
+        with open(args.baseline, 'w', encoding='UTF-8') as f:
+            json.dump(baseline, f, indent=2)
+            f.write('\n')
+        print(f"Updated {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}, run with --update-baseline first")
+        return 0
+
+    with open(args.baseline, 'r', encoding='UTF-8') as f:
+        baseline = json.load(f)['benchmarks']
+
+    print(f"\nCompared with {args.baseline}, in calibration units (threshold {args.threshold:.0%}):")
+    regressions = compare(results, baseline, args.threshold,
+                          lambda name: run_benchmark(name, args.repeat * 2, args.verbose))
+    if regressions:
+        print(f"\n{len(regressions)} benchmark(s) regressed: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,82 @@
+# SPDX-FileCopyrightText: 2026 Klarälvdalens Datakonsult AB, a KDAB Group company <info@kdab.com>
+# SPDX-License-Identifier: MIT
+
+# Creates git repos with many tags, submodules and large files, for benchmarks
+
+import os
+import subprocess
+
+# So commits and tags work without a user config, and file:// submodules are allowed
+GIT_ENV = {
+    'GIT_AUTHOR_NAME': 'Benchmark', 'GIT_AUTHOR_EMAIL': 'benchmark@example.com',
+    'GIT_COMMITTER_NAME': 'Benchmark', 'GIT_COMMITTER_EMAIL': 'benchmark@example.com',
+    'GIT_CONFIG_COUNT': '1',
+    'GIT_CONFIG_KEY_0': 'protocol.file.allow', 'GIT_CONFIG_VALUE_0': 'always',
+}
+
+
+def git(repo_path, *args, stdin=None):
+    result = subprocess.run(['git', '-C', repo_path] + list(args), input=stdin,
+                            capture_output=True, check=False, env=dict(os.environ, **GIT_ENV))
+    if result.returncode != 0:
+        raise RuntimeError(f"git {' '.join(args)} failed in {repo_path}: {result.stderr.decode()}")
+    return result.stdout.decode().strip()
+
+
+def version_tags(count, prefix='v', last=None):
+    '''
+    count increasing version tags: v0.0.1 ... v0.0.99, v0.1.0 ..., ending with last if given
+    '''
+    tags = [f"{prefix}0.{i // 100}.{i % 100}" for i in range(1, count + 1)]
+    if last:
+        tags = tags[:max(count - 1, 0)] + [last]
+    return tags
+
+
+def _fast_import_stream(branch, tags):
+    '''
+    One commit per tag, each tagged, via git fast-import. Much faster than git commit + git tag.
+    '''
+    lines = []
+    for i, tag in enumerate(tags, 1):
+        message = f"Release {tag}".encode()
+        content = f"{tag}\n".encode()
+        lines += [b"commit refs/heads/" + branch.encode(), f"mark :{i}".encode(),
+                  f"committer Benchmark <benchmark@example.com> {1600000000 + i * 60} +0000".encode(),
+                  f"data {len(message)}".encode(), message,
+                  b"M 644 inline history.txt", f"data {len(content)}".encode(), content,
+                  f"reset refs/tags/{tag}".encode(), f"from :{i}".encode(), b""]
+    return b"\n".join(lines) + b"\n"
+
+
+def create_repo(path, files, branch='main', tags=(), submodules=None, large_file_mb=0):
+    '''
+    Creates a repo with one tagged commit per tag, then a commit on top adding files
+    (dict of path to content), submodules (dict of path to (url, sha1)) and, optionally,
+    a large incompressible file. Returns the sha1 of that last commit.
+    '''
+    os.makedirs(path)
+    git(path, 'init', '-q', '-b', branch)
+
+    if tags:
+        git(path, 'fast-import', '--quiet', stdin=_fast_import_stream(branch, tags))
+        git(path, 'checkout', '-q', '-f', branch)
+
+    for filename, content in files.items():
+        filename = os.path.join(path, filename)
+        os.makedirs(os.path.dirname(filename), exist_ok=True)
+        with open(filename, 'wb' if isinstance(content, bytes) else 'w') as f:
+            f.write(content)
+
+    if large_file_mb:
+        with open(os.path.join(path, 'large.bin'), 'wb') as f:
+            for _ in range(large_file_mb):
+                f.write(os.urandom(1024 * 1024))
+
+    for submodule_path, (url, sha1) in (submodules or {}).items():
+        git(path, 'submodule', 'add', '-q', url, submodule_path)
+        git(os.path.join(path, submodule_path), 'checkout', '-q', sha1)
+
+    git(path, 'add', '-A')
+    git(path, 'commit', '-q', '-m', 'Synthetic content')
+    return git(path, 'rev-parse', 'HEAD')
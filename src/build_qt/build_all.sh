@@ -3,7 +3,7 @@
 # SPDX-FileCopyrightText: 2026 Klarälvdalens Datakonsult AB, a KDAB Group company <info@kdab.com>
 # SPDX-License-Identifier: MIT
 
-# Builds Qt with all presets: asan, tsan, debug, and profile
+# Builds Qt with all presets: asan, ubsan, tsan, debug, and profile, concurrently, see ../qt_build.py
 # They all get installed to subdirectories of the given parent install dir.
 
 if [ $# -ne 3 ]; then
@@ -11,12 +11,6 @@ if [ $# -ne 3 ]; then
     exit 1
 fi
 
-QT_TAG=$1
-QT_SRC_DIR=$2
-QT_PARENT_INSTALL_DIR=$3
+SCRIPT_DIR="$(cd "$(dirname "$0")" && pwd)"
 
-./build.sh asan "$QT_TAG" "$QT_PARENT_INSTALL_DIR" "$QT_SRC_DIR" && \
-./build.sh ubsan "$QT_TAG" "$QT_PARENT_INSTALL_DIR" "$QT_SRC_DIR" && \
-./build.sh tsan "$QT_TAG" "$QT_PARENT_INSTALL_DIR" "$QT_SRC_DIR" && \
-./build.sh debug "$QT_TAG" "$QT_PARENT_INSTALL_DIR" "$QT_SRC_DIR" && \
-./build.sh profile "$QT_TAG" "$QT_PARENT_INSTALL_DIR" "$QT_SRC_DIR"
+exec python3 "$SCRIPT_DIR/../qt_build.py" "$1" "$2" "$3"
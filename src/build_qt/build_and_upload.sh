@@ -5,12 +5,14 @@
 # SPDX-License-Identifier: MIT
 
 # example: ./build_and_upload.sh asan_ubsan v6.11.0-beta2 ~/installed/Qt/ ~/sources/qt6_ci
+# example: ./build_and_upload.sh asan_ubsan v6.11.0-beta3 ~/installed/Qt/ ~/sources/qt6_ci qt-v6.11.0-beta2-asan_ubsan
 
 set -e
 
-if [ $# -ne 4 ]; then
-    echo "Usage: $0 <preset> <qt-version> <parent-install-dir> <qtsrc-dir>"
+if [ $# -lt 4 ] || [ $# -gt 5 ]; then
+    echo "Usage: $0 <preset> <qt-version> <parent-install-dir> <qtsrc-dir> [<base-package>]"
     echo "  preset: asan, asan_ubsan, ubsan, tsan, profile, or debug"
+    echo "  base-package: also upload a delta against it, see upload-qt.sh"
     exit 1
 fi
 
@@ -18,9 +20,10 @@ PRESET="$1"
 QT_VERSION="$2"
 PARENT_INSTALL_DIR="$3"
 QTSRC_DIR="$4"
+BASE_PACKAGE="$5"
 
 SCRIPT_DIR="$(cd "$(dirname "$0")" && pwd)"
 INSTALL_DIR="$PARENT_INSTALL_DIR"/qt-"$QT_VERSION"-"$PRESET"
 
 "$SCRIPT_DIR"/build.sh "$PRESET" "$QT_VERSION" "$PARENT_INSTALL_DIR" "$QTSRC_DIR"
-"$SCRIPT_DIR"/upload-qt.sh "$INSTALL_DIR"
+"$SCRIPT_DIR"/upload-qt.sh "$INSTALL_DIR" $BASE_PACKAGE
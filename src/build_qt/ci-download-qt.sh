@@ -6,32 +6,17 @@
 
 # Called by CI to download a sanitizer enabled Qt build, example:
 # ./ci-download-qt.sh qt-v6.11.0-beta2-debug
+# ./ci-download-qt.sh "latest 6.11 tsan"
+# Extracts to ~/Qt/<package>, see ../qt_download.py. Set CI_RELEASE_TOOLS_QT_CACHE to keep the
+# packages in a local cache, on self-hosted runners.
 
 set -e
 
-error_handler() {
-    local exit_code=$?
-    if [ $exit_code -ne 0 ]; then
-        echo "Error: Failed with exit code $exit_code"
-    fi
-}
-
-trap error_handler EXIT
-
 if [ $# -ne 1 ]; then
-    echo "Usage: $0 <qt package name>"
+    echo "Usage: $0 <qt package name or query>"
     exit 1
 fi
 
-PACKAGE_NAME="$1"
-TARBALL="${PACKAGE_NAME}.tar.zst"
-DEST=~/Qt/${PACKAGE_NAME}
-
-wget -O /tmp/${TARBALL} https://github.com/KDABLabs/ci-release-tools/releases/download/qt-sanitizer-developer-builds/${TARBALL}
-rm -rf ${DEST}
-mkdir -p ${DEST}
-
-echo "Extracting Qt package /tmp/${TARBALL} to ${DEST} ..."
-tar -xf /tmp/${TARBALL} -C ${DEST}
+SCRIPT_DIR="$(cd "$(dirname "$0")" && pwd)"
 
-rm /tmp/${TARBALL}
+exec python3 "$SCRIPT_DIR/../qt_download.py" "$1"
@@ -14,12 +14,16 @@ fi
 
 # Uploads the specified Qt to GitHub so it can be used as CI
 # These Qt's have asserts enabled and sanitizers, so they are not suitable for production use
+# With a base package (for example the previous beta, same preset), a delta against it is uploaded
+# too, see ../qt_delta.py
+# The install is also added to the release's chunk store, see ../qt_chunks.py
+# and the package to the release's index, qt-index.json, see ../qt_index.py
 
 GH_RELEASE_NAME="qt-sanitizer-developer-builds"
 
 cleanup() {
     if [ -f "$TARBALL" ]; then
-        rm -f "$TARBALL"
+        rm -f "$TARBALL" "$TARBALL.sha256" "$PACKAGE_NAME".delta.json "$PACKAGE_NAME".from-*.zstpatch
     fi
 }
 
@@ -33,12 +37,15 @@ error_handler() {
 
 trap error_handler EXIT
 
-if [ $# -ne 1 ]; then
-    echo "Usage: $0 <qt-installed-dir>"
+if [ $# -lt 1 ] || [ $# -gt 2 ]; then
+    echo "Usage: $0 <qt-installed-dir> [<base-package>]"
+    echo "  base-package: for example qt-v6.11.0-beta2-debug"
     exit 1
 fi
 
 QT_DIR="$1"
+BASE_PACKAGE="$2"
+SCRIPT_DIR="$(cd "$(dirname "$0")" && pwd)"
 
 if [ ! -d "$QT_DIR" ]; then
     echo "Error: Qt directory '$QT_DIR' does not exist."
@@ -65,6 +72,18 @@ TARBALL="${PACKAGE_NAME}.tar.zst"
 
 echo "Creating tarball '$TARBALL' for Qt directory "$PACKAGE_NAME" ..."
 tar --zstd -cf "$TARBALL" -C "$QT_DIR" .
+# Checked by qt_download.py while downloading
+sha256sum "$TARBALL" > "$TARBALL.sha256"
+ASSETS=("$TARBALL" "$TARBALL.sha256")
+
+if [ -n "$BASE_PACKAGE" ]; then
+    echo "Creating a delta against $BASE_PACKAGE ..."
+    if python3 "$SCRIPT_DIR/../qt_delta.py" "$TARBALL" --base "$BASE_PACKAGE"; then
+        ASSETS+=("$PACKAGE_NAME.delta.json" "$PACKAGE_NAME.from-$BASE_PACKAGE.zstpatch")
+    else
+        echo "No delta against $BASE_PACKAGE, CI will download the full package"
+    fi
+fi
 
 if gh release view "$GH_RELEASE_NAME" --repo KDABLabs/ci-release-tools >/dev/null 2>&1; then
     echo "Release $GH_RELEASE_NAME already exists; skipping creation."
@@ -74,7 +93,13 @@ else
 fi
 
 echo "Uploading tarball to GitHub Releases..."
-gh release upload "$GH_RELEASE_NAME" "$TARBALL" --repo KDABLabs/ci-release-tools --clobber
+gh release upload "$GH_RELEASE_NAME" "${ASSETS[@]}" --repo KDABLabs/ci-release-tools --clobber
+
+echo "Adding $PACKAGE_NAME to the chunk store..."
+python3 "$SCRIPT_DIR/../qt_chunks.py" "$QT_DIR"
+
+echo "Adding $PACKAGE_NAME to the index..."
+python3 "$SCRIPT_DIR/../qt_index.py" "$TARBALL" --install-dir "$QT_DIR"
 
 echo "Tarball created: $TARBALL at https://github.com/KDABLabs/ci-release-tools/releases/tag/$GH_RELEASE_NAME"
 cleanup
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: 2026 Klarälvdalens Datakonsult AB, a KDAB Group company <info@kdab.com>
+# SPDX-License-Identifier: MIT
+
+# Records and replays the commands (gh, git, curl, ...) and HTTP requests of our scripts
+#
+# In record mode every command run through utils.run_command*() and every HTTP request made via
+# utils/vcpkg_utils is executed for real and its result stored in a JSON cassette.
+# In replay mode results are served from the cassette, nothing is executed and no network is needed.
+# Requests missing from the cassette are an error, so replays stay deterministic.
+#
+# Example:
+# $ CI_RELEASE_TOOLS_CASSETTE=kdsme.json CI_RELEASE_TOOLS_CASSETTE_MODE=record ./src/changelog_utils.py KDStateMachineEditor 2.1.0
+# $ CI_RELEASE_TOOLS_CASSETTE=kdsme.json ./src/changelog_utils.py KDStateMachineEditor 2.1.0
+#
+# Replaying doesn't reproduce side effects on disk (clones, tarballs, ...), those commands only
+# report what they returned when recorded.
+#
+# Requests are stored with the checkout's path as <root> and temporary dirs as <tmp>, so a
+# cassette recorded on one machine replays on another.
+
+import atexit
+import json
+import os
+import re
+import tempfile
+import threading
+
+RECORD = 'record'
+REPLAY = 'replay'
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TEMP_PATH = re.compile(re.escape(tempfile.gettempdir()) + r'/[\w.-]+')
+
+
+def normalized(request):
+    '''
+    request without what depends on the machine: where the checkout is, temporary dir names
+    '''
+    return TEMP_PATH.sub('<tmp>', request.replace(ROOT_DIR, '<root>'))
+
+
+class CassetteMiss(Exception):
+    pass
+
+
+class Cassette:
+    '''
+    Interactions keyed by (kind, request). A request made several times gets its recorded
+    results in order, the last one being repeated if it's made more often than when recorded.
+    '''
+
+    def __init__(self, path, mode=REPLAY):
+        if mode not in (RECORD, REPLAY):
+            raise ValueError(f"Unknown cassette mode '{mode}', expected '{RECORD}' or '{REPLAY}'")
+        self.path = path
+        self.mode = mode
+        self.interactions = []
+        self._lock = threading.Lock()
+        self._by_request = {}
+        self._replayed = {}
+        self._unsaved = False
+
+        if mode == REPLAY:
+            with open(path, 'r', encoding='UTF-8') as f:
+                self.interactions = json.load(f)['interactions']
+            for interaction in self.interactions:
+                key = (interaction['kind'], normalized(interaction['request']))
+                self._by_request.setdefault(key, []).append(interaction['response'])
+
+    def interaction(self, kind, request, func):
+        '''
+        Returns func()'s result, recording it, or the recorded result when replaying.
+        func's result must be JSON serializable.
+        '''
+        request = normalized(request)
+        if self.mode == RECORD:
+            response = func()
+            with self._lock:
+                self.interactions.append({'kind': kind, 'request': request, 'response': response})
+                self._unsaved = True
+            return response
+
+        key = (kind, request)
+        responses = self._by_request.get(key)
+        if not responses:
+            raise CassetteMiss(f"{self.path} has no {kind} interaction for: {request}")
+        with self._lock:
+            index = self._replayed.get(key, 0)
+            self._replayed[key] = index + 1
+        return responses[min(index, len(responses) - 1)]
+
+    def discard(self):
+        '''
+        Forgets what was recorded so far, it won't be saved
+        '''
+        with self._lock:
+            self.interactions = []
+            self._unsaved = False
+
+    def save(self):
+        if self.mode != RECORD or not self._unsaved:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            with open(self.path, 'w', encoding='UTF-8') as f:
+                json.dump({'interactions': self.interactions}, f, indent=1)
+                f.write('\n')
+            self._unsaved = False
+
+
+_current = None
+_current_lock = threading.Lock()
+
+
+def current():
+    '''
+    The cassette selected by CI_RELEASE_TOOLS_CASSETTE and CI_RELEASE_TOOLS_CASSETTE_MODE, or None
+    '''
+    global _current
+    path = os.getenv("CI_RELEASE_TOOLS_CASSETTE")
+    mode = os.getenv("CI_RELEASE_TOOLS_CASSETTE_MODE", REPLAY)
+
+    with _current_lock:
+        if _current is not None and (_current.path, _current.mode) != (path, mode):
+            _current.save()
+            _current = None
+        if path and _current is None:
+            _current = Cassette(path, mode)
+        return _current
+
+
+@atexit.register
+def _save_current():
+    if _current is not None:
+        _current.save()
@@ -9,13 +9,13 @@
 
 import sys
 
-from utils import download_file_as_string
+from utils import download_file_as_string, GITHUB_RAW_URL
 
 # Not KDDW specific anymore, KDSingleApplication uses the same format
 
 
 def get_kddockwidgets_changelog(proj_name, version, sha1):
-    filename = f"https://raw.githubusercontent.com/KDAB/{proj_name}/{sha1}/Changelog"
+    filename = f"{GITHUB_RAW_URL}/KDAB/{proj_name}/{sha1}/Changelog"
     text = download_file_as_string(filename)
 
     sections = text.split('* v')
@@ -29,7 +29,7 @@ def get_kddockwidgets_changelog(proj_name, version, sha1):
 # If your project has a different changelog format, consider normalizing, or just create
 # a new parser.
 def get_generic_changelog(version, repo, sha1):
-    filename = f"https://raw.githubusercontent.com/KDAB/{repo}/{sha1}/CHANGES"
+    filename = f"{GITHUB_RAW_URL}/KDAB/{repo}/{sha1}/CHANGES"
     text = download_file_as_string(filename)
 
     # Remove lines starting with dashes
@@ -53,7 +53,7 @@ def get_docs_versioned_changelog(repo, version, sha1):
     while len(parts) > 2 and parts[-1] == '0':
         parts.pop()
     version_underscored = '_'.join(parts)
-    filename = f"https://raw.githubusercontent.com/KDAB/{repo}/{sha1}/docs/CHANGES_{version_underscored}.txt"
+    filename = f"{GITHUB_RAW_URL}/KDAB/{repo}/{sha1}/docs/CHANGES_{version_underscored}.txt"
     return download_file_as_string(filename).strip()
 
 
@@ -72,11 +72,19 @@ def get_changelog(proj_name, version, sha1):
         f"Don't know how to get changelog for project {proj_name}. IMPLEMENT ME")
 
 
-if __name__ == '__main__':
-    if len(sys.argv) < 3:
+def main(argv=None):
+    if argv is None:
+        argv = sys.argv[1:]
+    if len(argv) < 2:
         print(f"Usage: {sys.argv[0]} <project> <version> [sha1]")
-        sys.exit(1)
-    proj = sys.argv[1]
-    ver = sys.argv[2]
-    sha = sys.argv[3] if len(sys.argv) > 3 else 'master'
+        return 1
+    proj = argv[0]
+    ver = argv[1]
+    sha = argv[2] if len(argv) > 2 else 'master'
     print(get_changelog(proj, ver, sha))
+    return 0
+
+
+if __name__ == '__main__':
+    import ci_release_tools
+    sys.exit(ci_release_tools.run('changelog_utils', sys.argv[1:], main))
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: 2026 Klarälvdalens Datakonsult AB, a KDAB Group company <info@kdab.com>
+# SPDX-License-Identifier: MIT
+
+# Single entry point for all our scripts
+#
+# Each subcommand only imports the module implementing it, so cold starts stay cheap.
+# The individual scripts (gh_utils.py, create_release.py, ...) still work and go through run() too.
+#
+# Examples:
+# $ ci_release_tools.py gh --get-latest-release=KDAB/KDDockWidgets
+# $ ci_release_tools.py create-release --repo KDDockWidgets --version 2.2.1 --sha1 <sha1> --repo-path ../KDDockWidgets
+# $ ci_release_tools.py version --has-newer-version 2.1.0 2.2.0
+
+import sys
+
+# subcommand -> (module, description)
+COMMANDS = {
+    'gh': ('gh_utils', "GitHub queries, for example --get-latest-release"),
+    'create-release': ('create_release', "Tag and create a GitHub release"),
+    'prepare-release': ('release_plan', "Check and build a release ahead of time, for create-release --from-plan"),
+    'sign-and-upload': ('sign_and_upload', "Sign release assets, or verify them with --verify"),
+    'release-train': ('release_train', "Release several projects, respecting their dependencies"),
+    'gpg': ('gpg_utils', "Sign or verify files through one gpg session"),
+    'signature-audit': ('signature_audit', "Verify the signatures of all releases, skipping verified ones"),
+    'changelog': ('changelog_utils', "Print the changelog of a version"),
+    'dependencies': ('update_dependencies', "Print or bump submodule/FetchContent dependencies"),
+    'version': ('version_utils', "Version comparisons"),
+    'vcpkg': ('vcpkg_utils', "vcpkg port queries"),
+    'homebrew': ('homebrew_utils', "Bump homebrew formulas in a tap checkout"),
+    'drift-report': ('drift_report', "Compare GitHub, vcpkg and homebrew versions"),
+    'qt-build': ('qt_build', "Build Qt with several CMake presets concurrently"),
+    'qt-build-telemetry': ('qt_build_telemetry', "Where the time of a Qt build went, from its .ninja_log"),
+    'qt-chunks': ('qt_chunks', "Publish a Qt install to the release's chunk store"),
+    'qt-delta': ('qt_delta', "Make a binary delta of a Qt package against another one"),
+    'qt-download': ('qt_download', "Download and extract one of our Qt builds, verified and cached"),
+    'qt-index': ('qt_index', "Add a Qt package to the release's index, or find one in it"),
+    'qt-modules': ('qt_modules', "The Qt repos our projects need, per Qt build preset"),
+    'qt-patches': ('qt_patches', "Apply our Qt patches to a Qt checkout, cached per Qt tag and patch set"),
+    'mirror-repos': ('mirror_repos', "Mirror or refresh all repos of our GitHub organizations"),
+    'daemon': ('daemon', "Start/stop the daemon answering queries with warm caches"),
+}
+
+
+def run(module_name, argv, main=None):
+    '''
+    Runs a script: via the daemon if it's running and argv is a query, otherwise in-process.
+    main is the script's main(), if it's already imported.
+    '''
+    import daemon
+    exit_code = daemon.run_via_daemon(module_name, argv)
+    if exit_code is not None:
+        return exit_code
+
+    if main is None:
+        # Not importlib.import_module(), which -X importtime doesn't report
+        main = __import__(module_name).main
+    return main(argv)
+
+
+def print_usage():
+    print(f"Usage: {sys.argv[0]} <command> [options]\n")
+    print("Commands:")
+    width = max(len(command) for command in COMMANDS)
+    for command, (_, description) in COMMANDS.items():
+        print(f"  {command.ljust(width)}  {description}")
+    print(f"\nRun '{sys.argv[0]} <command> --help' for the options of a command.")
+
+
+def main(argv=None):
+    if argv is None:
+        argv = sys.argv[1:]
+
+    if not argv or argv[0] in ('-h', '--help'):
+        print_usage()
+        return 0 if argv else 1
+
+    command = argv[0]
+    if command not in COMMANDS:
+        print(f"Unknown command '{command}'\n")
+        print_usage()
+        return 1
+
+    return run(COMMANDS[command][0], argv[1:])
+
+
+if __name__ == "__main__":
+    sys.exit(main())
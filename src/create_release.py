@@ -7,6 +7,9 @@
 # example usage
 # ./src/create_release.py --repo KDDockWidgets --version 2.2.1 --sha1 3aaccddc00a11a643e0959a24677838993de15ac --repo-path ../KDDockWidgets/ [--sign]
 
+# Publishing a release prepared ahead of time by release_plan.py (prepare-release):
+# ./src/create_release.py --from-plan release-plan/release-plan.json --repo-path ../KDDockWidgets/ [--sign]
+
 # Testing the changelog:
 # ./src/create_release.py --only-print-changelog --repo KDDockWidgets --version 2.2.1 --sha1 3aaccddc00a11a643e0959a24677838993de15ac --repo-path ../KDDockWidgets/
 
@@ -17,44 +20,93 @@ import gh_utils
 import changelog_utils
 import utils
 
-parser = argparse.ArgumentParser()
 
-parser.add_argument("--repo", help="GitHub repository name", required=True)
-parser.add_argument("--version", help="Release version", required=True)
-parser.add_argument("--sha1", help="Sha1 for tagging", required=True)
-parser.add_argument("--sign", help="Sign the tag",
-                    action="store_true", required=False)
-parser.add_argument(
-    "--repo-path", help="Path for repo being released", required=True)
-parser.add_argument("--only-print-changelog", help="Only print the changelog without creating a release (for testing)",
-                    action="store_true", required=False)
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument("--repo", help="GitHub repository name, not needed with --from-plan")
+    parser.add_argument("--version", help="Release version, not needed with --from-plan")
+    parser.add_argument("--sha1", help="Sha1 for tagging, not needed with --from-plan")
+    parser.add_argument("--from-plan", metavar="<release-plan.json>",
+                        help="Publish a release prepared by release_plan.py, only checking what can have changed since")
+    parser.add_argument("--sign", help="Sign the tag",
+                        action="store_true", required=False)
+    parser.add_argument(
+        "--repo-path", help="Path for repo being released", required=True)
+    parser.add_argument("--only-print-changelog", help="Only print the changelog without creating a release (for testing)",
+                        action="store_true", required=False)
+
+    args = parser.parse_args(argv)
+
+    if args.from_plan:
+        return create_release_from_plan(args)
 
-args = parser.parse_args()
+    if not (args.repo and args.version and args.sha1):
+        parser.error("--repo, --version and --sha1 are required, unless --from-plan is passed")
 
-# Fix repository name casing by comparing with releasing.toml
-repo_name = utils.get_correct_repo_case(args.repo)
+    # Fix repository name casing by comparing with releasing.toml
+    repo_name = utils.get_correct_repo_case(args.repo)
 
-release_notes = changelog_utils.get_changelog(
-    repo_name, args.version, args.sha1)
+    release_notes = changelog_utils.get_changelog(
+        repo_name, args.version, args.sha1)
 
-if not os.path.exists(args.repo_path):
-    print(f"Error: Repository path {args.repo_path} does not exist")
-    sys.exit(1)
+    if not os.path.exists(args.repo_path):
+        print(f"Error: Repository path {args.repo_path} does not exist")
+        return 1
 
-if not release_notes:
-    print(f"No release found for version {args.version} in {args.sha1}")
-    sys.exit(1)
+    if not release_notes:
+        print(f"No release found for version {args.version} in {args.sha1}")
+        return 1
 
-if args.only_print_changelog:
-    print(release_notes)
-    sys.exit(0)
+    if args.only_print_changelog:
+        print(release_notes)
+        return 0
 
-result = gh_utils.create_release(repo_name, args.version,
-                                 args.sha1, release_notes, args.repo_path, args.sign)
+    result = gh_utils.create_release(repo_name, args.version,
+                                     args.sha1, release_notes, args.repo_path, args.sign)
 
-if result:
-    version_no_prefix = args.version.lstrip("v")
+    if result:
+        print_next_step(repo_name, args.version)
+
+    return 0 if result else -1
+
+
+def print_next_step(repo_name, version):
+    version_no_prefix = version.lstrip("v")
     print(
         f"::warning::Now run: python3 src/sign_and_upload.py --repo {repo_name} --version {version_no_prefix}")
 
-sys.exit(0 if result else -1)
+
+def create_release_from_plan(args):
+    import release_plan
+
+    plan = release_plan.load_plan(args.from_plan)
+    if not plan:
+        return 1
+
+    for option in ('repo', 'version', 'sha1'):
+        given = getattr(args, option)
+        planned = plan['project' if option == 'repo' else option]
+        if given and given.lower() != planned.lower():
+            print(f"Error: --{option} {given} doesn't match the plan's {planned}")
+            return 1
+
+    if not os.path.exists(args.repo_path):
+        print(f"Error: Repository path {args.repo_path} does not exist")
+        return 1
+
+    if args.only_print_changelog:
+        print(plan['notes'])
+        return 0
+
+    result = release_plan.publish_plan(plan, os.path.dirname(os.path.abspath(args.from_plan)),
+                                       args.repo_path, args.sign)
+    if result:
+        print_next_step(plan['project'], plan['version'])
+
+    return 0 if result else -1
+
+
+if __name__ == "__main__":
+    import ci_release_tools
+    sys.exit(ci_release_tools.run('create_release', sys.argv[1:], main))
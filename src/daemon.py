@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: 2026 Klarälvdalens Datakonsult AB, a KDAB Group company <info@kdab.com>
+# SPDX-License-Identifier: MIT
+
+# Optional long-lived server which answers the read-only queries of our scripts
+#
+# Workflows call gh_utils.py, vcpkg_utils.py and version_utils.py many times.
+# Each call pays for interpreter startup, imports, parsing releasing.toml and cold connections.
+# When the daemon is running, those scripts forward their queries to it over a Unix socket and
+# the daemon answers them from warm modules and caches.
+#
+# Example, in a workflow:
+# $ ./src/daemon.py --start &
+# $ ./src/gh_utils.py --get-latest-release=KDAB/KDDockWidgets   # served by the daemon
+# $ ./src/daemon.py --stop
+#
+# Set CI_RELEASE_TOOLS_NO_DAEMON=1 to bypass a running daemon.
+# The caller's GitHub credentials (FORWARDED_ENV) are sent with each query, and the commands the
+# query runs get them instead of the daemon's. Their results are cached apart from other callers'.
+
+import argparse
+import contextlib
+import importlib
+import io
+import json
+import os
+import sys
+
+# Options which only query and print, so they're safe to answer from the daemon.
+# Anything else (--test-tarball, --update-dependency, ...) runs in the calling process, and so
+# does --print-dependency-versions: it clones repos, which would block the daemon.
+QUERY_OPTIONS = {
+    'gh_utils': ['--get-latest-release', '--get-latest-version'],
+    'vcpkg_utils': ['--get-latest-vcpkg-version'],
+    'version_utils': ['--has-newer-version'],
+}
+
+SIDE_EFFECT_OPTIONS = ['--test-tarball', '--update-dependency']
+
+# What gh and git read credentials and hosts from
+FORWARDED_ENV = ('GH_TOKEN', 'GITHUB_TOKEN', 'GH_ENTERPRISE_TOKEN', 'GITHUB_ENTERPRISE_TOKEN', 'GH_HOST',
+                 'GH_CONFIG_DIR')
+
+DEFAULT_CACHE_TTL = 300
+
+
+def socket_path():
+    path = os.getenv("CI_RELEASE_TOOLS_SOCKET")
+    if path:
+        return path
+    runtime_dir = os.getenv("XDG_RUNTIME_DIR", "/tmp")
+    return f"{runtime_dir}/ci-release-tools-{os.getuid()}.sock"
+
+
+def is_query(script, argv):
+    options = [arg.split('=')[0] for arg in argv if arg.startswith('--')]
+    if any(option in SIDE_EFFECT_OPTIONS for option in options):
+        return False
+    return any(option in QUERY_OPTIONS.get(script, []) for option in options)
+
+
+def send_request(request, timeout=None):
+    '''
+    Sends a request to the daemon and returns its reply, or None if it isn't running
+    '''
+    path = socket_path()
+    if not os.path.exists(path):
+        return None
+
+    import socket
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(path)
+            sock.sendall(json.dumps(request).encode() + b'\n')
+            with sock.makefile('rb') as f:
+                reply = f.readline()
+    except OSError:
+        return None
+
+    if not reply:
+        return None
+    return json.loads(reply)
+
+
+def run_via_daemon(script, argv):
+    '''
+    Called by the scripts' __main__. Forwards the query to the daemon, if running.
+    Returns the exit code, or None if the caller should run the query itself.
+    '''
+    if os.getenv("CI_RELEASE_TOOLS_NO_DAEMON", "0") == "1" or not is_query(script, argv):
+        return None
+
+    env = {name: os.environ[name] for name in FORWARDED_ENV if name in os.environ}
+    reply = send_request({'script': script, 'argv': argv, 'cwd': os.getcwd(), 'env': env})
+    if reply is None or 'exit_code' not in reply:
+        return None
+
+    sys.stdout.write(reply['output'])
+    sys.stdout.flush()
+    return reply['exit_code']
+
+
+def query_env(forwarded):
+    '''
+    The daemon's environment, with the caller's FORWARDED_ENV instead of its own
+    '''
+    env = {name: value for name, value in os.environ.items() if name not in FORWARDED_ENV}
+    env.update({name: value for name, value in forwarded.items() if name in FORWARDED_ENV})
+    return env
+
+
+def run_query(script, argv, cwd, env=None):
+    '''
+    Runs a script's main() in-process and returns its exit code and output.
+    env has the caller's FORWARDED_ENV.
+    '''
+    if not is_query(script, argv):
+        return {'error': f"{script} {' '.join(argv)} is not a query"}
+
+    import utils
+
+    output = io.StringIO()
+    exit_code = 0
+    try:
+        # The caller's dir and credentials are passed to the commands the query runs, the daemon's don't change
+        with utils.commands_cwd(cwd), utils.commands_env(query_env(env or {})), \
+                contextlib.redirect_stdout(output), contextlib.redirect_stderr(output):
+            exit_code = importlib.import_module(script).main(argv)
+    except SystemExit as e:
+        exit_code = e.code if isinstance(e.code, int) else 1
+    except Exception as e:
+        output.write(f"error: {e}\n")
+        exit_code = 1
+
+    return {'exit_code': exit_code or 0, 'output': output.getvalue()}
+
+
+def create_server(path, cache_ttl):
+    # socketserver is only imported here, the clients don't need it
+    import socketserver
+
+    class RequestHandler(socketserver.StreamRequestHandler):
+        def handle(self):
+            try:
+                request = json.loads(self.rfile.readline())
+            except ValueError:
+                return
+
+            if request.get('command') == 'stop':
+                reply = {'stopped': True}
+                self.server.should_stop = True
+            elif request.get('command') == 'status':
+                reply = {'pid': os.getpid(), 'cache_ttl': cache_ttl}
+            else:
+                reply = run_query(request.get('script'), request.get('argv', []),
+                                  request.get('cwd', os.getcwd()), request.get('env'))
+
+            self.wfile.write(json.dumps(reply).encode() + b'\n')
+
+    # Single threaded on purpose: queries redirect stdout, which is process-wide
+    server = socketserver.UnixStreamServer(path, RequestHandler)
+    server.should_stop = False
+    return server
+
+
+def serve(cache_ttl=DEFAULT_CACHE_TTL):
+    import utils
+    path = socket_path()
+
+    if send_request({'command': 'status'}, timeout=1):
+        print(f"Daemon already running at {path}")
+        return False
+
+    if os.path.exists(path):
+        os.unlink(path)  # stale socket from a previous run
+
+    utils.set_query_cache_ttl(cache_ttl)
+
+    # Warm up: imports and releasing.toml
+    for module in QUERY_OPTIONS:
+        try:
+            importlib.import_module(module)
+        except ImportError as e:
+            print(f"Not preloading {module}: {e}")
+    utils.get_projects()
+
+    old_umask = os.umask(0o077)
+    try:
+        server = create_server(path, cache_ttl)
+    finally:
+        os.umask(old_umask)
+
+    print(f"Listening on {path}")
+    sys.stdout.flush()
+    try:
+        with server:
+            while not server.should_stop:
+                server.handle_request()
+    finally:
+        if os.path.exists(path):
+            os.unlink(path)
+    return True
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--start', action='store_true',
+                        help="Run the daemon in the foreground")
+    parser.add_argument('--stop', action='store_true',
+                        help="Stop a running daemon")
+    parser.add_argument('--status', action='store_true',
+                        help="Exit with 0 if the daemon is running")
+    parser.add_argument('--cache-ttl', type=int, default=DEFAULT_CACHE_TTL,
+                        help=f"Seconds to cache query results for (default: {DEFAULT_CACHE_TTL})")
+    args = parser.parse_args(argv)
+
+    if args.start:
+        return 0 if serve(args.cache_ttl) else 1
+    if args.stop:
+        return 0 if send_request({'command': 'stop'}) else 1
+    if args.status:
+        status = send_request({'command': 'status'})
+        if status:
+            print(f"Running with pid {status['pid']} at {socket_path()}")
+        return 0 if status else 1
+
+    parser.print_help()
+    return 1
+
+
+if __name__ == "__main__":
+    import ci_release_tools
+    sys.exit(ci_release_tools.run('daemon', sys.argv[1:], main))
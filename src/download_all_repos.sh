@@ -1,16 +1,13 @@
+#!/bin/bash
+
 # SPDX-FileCopyrightText: 2024 Klarälvdalens Datakonsult AB, a KDAB Group company <info@kdab.com>
 # SPDX-License-Identifier: MIT
 
-#!/bin/bash
-
-# Downloads all repos of our organization, 11 GB (as of 2025)
+# Mirrors all repos of our organizations into the current dir, as <org>/<repo>.git partial mirrors.
+# Running it again only fetches what's new, see mirror_repos.py
 
-OUTPUT_DIR=$(pwd)
+set -e
 
-download_repos() {
-    mkdir -p $OUTPUT_DIR/$1 && cd $OUTPUT_DIR/$1
-    gh repo list "$1" --limit 1000 --json nameWithOwner --jq '.[].nameWithOwner' | xargs -I {} git clone "git@github.com:{}.git"
-}
+SCRIPT_DIR="$(cd "$(dirname "$0")" && pwd)"
 
-download_repos KDAB
-download_repos KDABLabs
+exec python3 "$SCRIPT_DIR/mirror_repos.py" "$(pwd)" "$@"
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: 2026 Klarälvdalens Datakonsult AB, a KDAB Group company <info@kdab.com>
+# SPDX-License-Identifier: MIT
+
+# Reports which releases haven't reached vcpkg or homebrew yet
+#
+# Collects, for every project in releasing.toml, the latest GitHub release, the vcpkg port version
+# and the homebrew formula version. All lookups run concurrently in a single process.
+#
+# Examples:
+# $ drift_report.py
+# $ drift_report.py --json
+# $ drift_report.py --tap-path ../homebrew-tap  (read formulas from a local tap checkout)
+
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from utils import get_projects, download_file_as_string, get_correct_repo_case, repo_exists, exit_because, GITHUB_RAW_URL
+import gh_utils
+import homebrew_utils
+import vcpkg_utils
+from version_utils import has_newer_version
+
+HOMEBREW_TAP = "KDAB/homebrew-tap"
+
+
+def get_latest_github_version(proj_name):
+    tag = gh_utils.get_latest_release_tag_in_github(
+        f"KDAB/{proj_name}", None, None)
+    if not tag:
+        return None
+    return gh_utils.extract_version_from_tag(tag)
+
+
+def get_vcpkg_version(proj_name):
+    port = get_projects()[proj_name].get('vcpkg')
+    if not port:
+        return None
+    return vcpkg_utils.get_latest_version_in_vcpkg(port)
+
+
+def get_homebrew_version(proj_name, tap_path=None):
+    formulas = get_projects()[proj_name].get('homebrew')
+    if not formulas:
+        return None
+
+    if tap_path:
+        filename = homebrew_utils.formula_path(tap_path, formulas[0])
+        if not os.path.exists(filename):
+            return None
+        with open(filename, 'r', encoding='UTF-8') as f:
+            code = f.read()
+    else:
+        code = download_file_as_string(
+            f"{GITHUB_RAW_URL}/{HOMEBREW_TAP}/HEAD/Formula/{formulas[0]}", fatal=False)
+        if not code:
+            return None
+
+    return homebrew_utils.get_formula_version(code)
+
+
+def drift_status(packaged_version, released_version):
+    '''
+    Compares a packaged version against the released one.
+    Returns one of: 'missing', 'unknown', 'up-to-date', 'behind', 'ahead'
+    '''
+    if not packaged_version:
+        return 'missing'
+    if not released_version:
+        return 'unknown'
+    from packaging.version import InvalidVersion
+
+    try:
+        if has_newer_version(packaged_version, released_version):
+            return 'behind'
+        return 'up-to-date'
+    except InvalidVersion:
+        # A ValueError too, but not a newer version
+        return 'unknown'
+    except ValueError:
+        return 'ahead'
+
+
+def collect_versions(proj_names, tap_path=None, jobs=16):
+    '''
+    Fetches GitHub, vcpkg and homebrew versions for all projects concurrently.
+    Returns a dict of project name to report entry.
+    '''
+    fetchers = {
+        'github': get_latest_github_version,
+        'vcpkg': get_vcpkg_version,
+        'homebrew': lambda name: get_homebrew_version(name, tap_path),
+    }
+
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        futures = {(name, source): executor.submit(fetcher, name)
+                   for name in proj_names for source, fetcher in fetchers.items()}
+
+    report = {}
+    for name in proj_names:
+        versions = {source: futures[(name, source)].result()
+                    for source in fetchers}
+        entry = {'project': name}
+        entry.update(versions)
+        for source in ('vcpkg', 'homebrew'):
+            entry[f'{source}_status'] = drift_status(
+                versions[source], versions['github'])
+        report[name] = entry
+
+    return report
+
+
+def print_drift_table(report):
+    def cell(entry, source):
+        version = entry[source] or '-'
+        status = entry[f'{source}_status']
+        if status in ('behind', 'ahead'):
+            return f"{version} ({status})"
+        return version
+
+    rows = [('Project', 'GitHub', 'vcpkg', 'Homebrew')]
+    for entry in report.values():
+        rows.append((entry['project'], entry['github'] or '?',
+                     cell(entry, 'vcpkg'), cell(entry, 'homebrew')))
+
+    widths = [max(len(row[i]) for row in rows) for i in range(len(rows[0]))]
+    for row in rows:
+        print('  '.join(text.ljust(widths[i])
+              for i, text in enumerate(row)).rstrip())
+
+
+def has_drift(report):
+    return any(entry[f'{source}_status'] == 'behind'
+               for entry in report.values() for source in ('vcpkg', 'homebrew'))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--repo', action='append',
+                        help="Only report this project, can be passed more than once")
+    parser.add_argument('--json', action='store_true',
+                        help="Print the report as JSON")
+    parser.add_argument('--tap-path', metavar='<path>',
+                        help="Read formulas from a local homebrew-tap checkout instead of GitHub")
+    parser.add_argument('--fail-on-drift', action='store_true',
+                        help="Exit with 1 if any package is behind the GitHub release")
+    args = parser.parse_args(argv)
+
+    projects = [get_correct_repo_case(name) for name in args.repo] if args.repo else list(get_projects())
+    for name in projects:
+        if not repo_exists(name):
+            exit_because(f"Project {name} does not exist")
+
+    drift = collect_versions(projects, args.tap_path)
+
+    if args.json:
+        print(json.dumps(list(drift.values()), indent=2))
+    else:
+        print_drift_table(drift)
+
+    return 1 if args.fail_on_drift and has_drift(drift) else 0
+
+
+if __name__ == "__main__":
+    import ci_release_tools
+    sys.exit(ci_release_tools.run('drift_report', sys.argv[1:], main))
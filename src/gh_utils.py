@@ -12,15 +12,14 @@
 # $ gh_utils.py --test-tarball KDSoap --version 2.2.0 --sha1 <sha1>
 # Creates a tarball with submodules for KDSoap 2.2.0 without creating a release
 
-import json
 import argparse
 import re
 import sys
 import uuid
+import tracing
 from utils import get_projects, repo_exists, run_command, run_command_with_output, run_command_silent, tag_for_version, get_project, get_submodule_builtin_dependencies
 import utils
-from version_utils import is_numeric, previous_version, get_current_version_in_cmake
-from changelog_utils import get_changelog
+from pipeline import resource
 
 
 def get_latest_release_tag_in_github(repo, repo_path, main_branch, via_tag=False):
@@ -34,6 +33,13 @@ def get_latest_release_tag_in_github(repo, repo_path, main_branch, via_tag=False
         cmd = f"git -C {repo_path} describe --tags --abbrev=0 origin/{main_branch}"
         return run_command_with_output(cmd).strip()
 
+    if repo:
+        return utils.cached_query(('latest-release', repo),
+                                  lambda: _get_latest_release_tag_via_gh(repo, repo_path))
+    return _get_latest_release_tag_via_gh(repo, repo_path)
+
+
+def _get_latest_release_tag_via_gh(repo, repo_path):
     # Via gh release:
     try:
         repo_arg = f"--repo {repo}" if repo else ""
@@ -115,65 +121,131 @@ def sha1_for_tag_remote(repo, tag):
     return output.strip()
 
 
-def download_tarball(repo, tag, version):
-    return run_command_silent(f"curl -L -o {repo.lower()}-{version}.tar.gz https://github.com/KDAB/{repo}/archive/refs/tags/{tag}.tar.gz")
+def download_tarball(repo, tag, version, work_dir=None):
+    with resource('network'):
+        return run_command_silent(f"curl -L -o {repo.lower()}-{version}.tar.gz {utils.GITHUB_URL}/KDAB/{repo}/archive/refs/tags/{tag}.tar.gz", cwd=work_dir)
+
+
+def tarball_has_integrity(filename, work_dir=None):
+    return run_command_silent(f"tar tzf {filename}", cwd=work_dir)
+
 
+def sign_files(filenames, work_dir=None):
+    """
+    Signs the files through one gpg session, creating <file>.asc. Returns True if all were signed.
+    """
+    import gpg_utils
+    try:
+        results = gpg_utils.default_session().sign_files(filenames, work_dir)
+    except gpg_utils.GpgError as e:
+        print(f"error: Failed to sign {', '.join(filenames)}: {e}")
+        return False
 
-def tarball_has_integrity(filename):
-    return run_command_silent(f"tar tzf {filename}")
+    for result in results:
+        if result.ok:
+            print(f"Signed {result.filename} with key {result.fingerprint}")
+        else:
+            print(f"error: Failed to sign {result.filename}: {result.error}")
+    return all(result.ok for result in results)
 
 
-def sign_file(filename):
-    return run_command(f"gpg --local-user \"KDAB Products\" --armor --detach-sign {filename}")
+def sign_file(filename, work_dir=None):
+    return sign_files([filename], work_dir)
 
 
-def can_bump_to(proj_name, version, sha1, check_ci=True):
+def verify_files(filenames, work_dir=None):
     """
-    Returns True if we can bump to the specified version
-    Reasons not to, include:
-        - The previous semantic tag doesn't exist
-        - Version in CMake doesn't match
-        - Changelog entry doesn't exist
-        - CI has failures
+    Verifies the files against their <file>.asc through one gpg session. Returns True if all are valid.
     """
+    import gpg_utils
+    results = gpg_utils.default_session().verify_files(filenames, work_dir)
+
+    for result in results:
+        if result.ok:
+            print(f"Signature verification successful for {result.filename} (key {result.fingerprint})")
+        else:
+            print(f"error: GPG signature verification failed for {result.filename}: {result.error}")
+    return all(result.ok for result in results)
+
+
+def check_previous_tag(proj_name, version):
+    """
+    Returns True if the previous semantic tag exists, so we're not skipping versions
+    """
+    from version_utils import is_numeric, previous_version
+
     if not is_numeric(version):
         print("Do not pass versions with prefixes")
         return False
 
     prev = previous_version(version)
-    proj = get_project(proj_name)
-    tag_prefix = proj['tag_prefix']
-
-    new_tag = f"{tag_prefix}{version}"
-    prev_tag = f"{tag_prefix}{prev}"
+    new_tag = tag_for_version(proj_name, version)
+    prev_tag = tag_for_version(proj_name, prev)
     if prev != '0.0.0' and not tag_exists(proj_name, prev_tag):
         print(f"Error: Can't tag {new_tag} without {prev_tag}")
         return False
+    return True
+
+
+def check_changelog(proj_name, version, sha1):
+    from changelog_utils import get_changelog
 
     if not get_changelog(proj_name, version, sha1):
         print(f"Error: No changelog found for version {version}")
         return False
+    return True
+
+
+def check_version_in_cmake(proj_name, version, sha1):
+    from version_utils import get_current_version_in_cmake
 
     cur_cmake_version = get_current_version_in_cmake(proj_name, sha1)
     if cur_cmake_version != version:
         print(
             f"You need to bump the version in CMakeLists.txt, currently it's at {cur_cmake_version}")
         return False
+    return True
 
-    if check_ci:
-        ci_in_progress, ci_completed, ci_failed = ci_run_status(
-            proj_name, sha1)
-        if ci_in_progress:
-            print("error: CI is still running, please try again later")
-            return False
 
-        if ci_failed:
-            print(f"error: CI has failed jobs for sha1 {sha1}")
-            return False
+def check_ci_passed(proj_name, sha1):
+    ci_in_progress, ci_completed, ci_failed = ci_run_status(
+        proj_name, sha1)
+    if ci_in_progress:
+        print("error: CI is still running, please try again later")
+        return False
 
-        if not ci_completed:
-            print(f"error: CI doesn't have completed runs for {sha1}")
-            return False
+    if ci_failed:
+        print(f"error: CI has failed jobs for sha1 {sha1}")
+        return False
+
+    if not ci_completed:
+        print(f"error: CI doesn't have completed runs for {sha1}")
+        return False
+
+    return True
+
+
+@tracing.traced_step
+def can_bump_to(proj_name, version, sha1, check_ci=True):
+    """
+    Returns True if we can bump to the specified version
+    Reasons not to, include:
+        - The previous semantic tag doesn't exist
+        - Version in CMake doesn't match
+        - Changelog entry doesn't exist
+        - CI has failures
+    """
+    if not check_previous_tag(proj_name, version):
+        return False
+
+    if not check_changelog(proj_name, version, sha1):
+        return False
+
+    if not check_version_in_cmake(proj_name, version, sha1):
+        return False
+
+    if check_ci and not check_ci_passed(proj_name, sha1):
+        return False
 
     return True
 
@@ -182,95 +254,132 @@ def release_exists(repo, tag):
     return run_command_silent(f"gh release view {tag} --repo KDAB/{repo}")
 
 
-def create_release(repo, version, sha1, notes, repo_path, should_sign):
+def publish_release(repo, tag, notes, files, work_dir=None):
+    """
+    Creates the GitHub release for an already pushed tag, uploading files from work_dir
+    """
+    cmd = f"gh release create {tag} " \
+        f"--repo KDAB/{repo} " \
+        f'--title "Release {tag}" ' \
+        f'--notes "{notes}" ' + ' '.join(files)
+
+    with resource('network'):
+        if not run_command(cmd, cwd=work_dir):
+            print("error: Could not create release")
+            return False
+    return True
+
+
+@tracing.traced_step
+def create_release(repo, version, sha1, notes, repo_path, should_sign, work_dir=None):
+    """
+    Tags and creates the GitHub release, as a pipeline (see pipeline.py).
+
+    The checks (previous tag, changelog, version.txt, CI, release doesn't exist yet) run
+    concurrently. For projects whose tarball includes submodules, the tarball is built and
+    signed concurrently with the checks too, as it's made from sha1 and not from the tag.
+    The tag is only pushed, and the release only created, once all of those succeeded.
+    The tarball is created in work_dir, or the current directory.
+    """
+    from pipeline import Step, run_pipeline
+
     tag = tag_for_version(repo, version)
     if not repo_exists(repo):
         print(f"error: unknown repo {repo}, check releasing.toml")
         return False
 
-    if not can_bump_to(repo, version, sha1):
-        print("error: Project not ready to be tagged.")
-        return False
+    proj = get_project(repo)
+    tarball = f"{repo}-{version}.tar.gz".lower()
 
-    if not create_tag_via_git(repo, version, sha1, repo_path):
-        print("error: Could not create tag")
-        return False
+    def changelog():
+        # create_release.py already fetched it
+        return bool(notes) or check_changelog(repo, version, sha1)
 
-    if release_exists(repo, tag):
-        print(f"error: release {tag} already exists in {repo}")
-        return False
+    def release_does_not_exist():
+        if release_exists(repo, tag):
+            print(f"error: release {tag} already exists in {repo}")
+            return False
+        return True
 
-    proj = get_project(repo)
-    if proj.get('tarball_includes_submodules'):
-        if not utils.create_tarball_with_submodules(repo, sha1, version):
-            print(
-                f"error: failed to create tarball with submodules for {repo}")
+    def build_tarball():
+        if proj.get('tarball_includes_submodules'):
+            if not utils.create_tarball_with_submodules(repo, sha1, version, work_dir):
+                print(
+                    f"error: failed to create tarball with submodules for {repo}")
+                return False
+        elif not download_tarball(repo, tag, version, work_dir):
+            print(f"error: failed to download tarball from repo {repo}")
             return False
-    elif not download_tarball(repo, tag, version):
-        print(f"error: failed to download tarball from repo {repo}")
-        return False
+        return True
 
-    tarball = f"{repo}-{version}.tar.gz".lower()
-    if not tarball_has_integrity(tarball):
-        print(f"error: Tarball {tarball} is corrupted")
-        return False
+    def check_integrity():
+        if not tarball_has_integrity(tarball, work_dir):
+            print(f"error: Tarball {tarball} is corrupted")
+            return False
+        return True
 
-    files_to_upload = ""
-    if should_sign:
-        if not sign_file(tarball):
+    def sign():
+        if not sign_file(tarball, work_dir):
             print(f"error: Failed to sign {tarball}")
             return False
-        files_to_upload = f"{tarball}.asc {tarball}"
-    else:
-        files_to_upload = f"{tarball}"
+        return True
 
-    cmd = f"gh release create {tag} " \
-        f"--repo KDAB/{repo} " \
-        f'--title "Release {tag}" ' \
-        f'--notes "{notes}" ' + files_to_upload
+    def push_tag():
+        if not create_tag_via_git(repo, version, sha1, repo_path):
+            print("error: Could not create tag")
+            return False
+        return True
 
-    if not run_command(cmd):
-        print("error: Could not create release")
-        return False
+    def publish():
+        return publish_release(repo, tag, notes, [f"{tarball}.asc", tarball] if should_sign else [tarball], work_dir)
 
-    return True
+    gates = ['previous_tag', 'changelog', 'version_txt', 'ci_status', 'release_does_not_exist']
+    steps = [
+        Step('previous_tag', lambda: check_previous_tag(repo, version)),
+        Step('changelog', changelog),
+        Step('version_txt', lambda: check_version_in_cmake(repo, version, sha1)),
+        Step('ci_status', lambda: check_ci_passed(repo, sha1)),
+        Step('release_does_not_exist', release_does_not_exist),
+    ]
 
+    # Only tarballs with submodules are built from sha1, the others are GitHub's archive of the tag
+    tarball_deps = [] if proj.get('tarball_includes_submodules') else ['tag']
+    steps.append(Step('tarball', build_tarball, tarball_deps))
+    steps.append(Step('tarball_integrity', check_integrity, ['tarball']))
+    artifact_steps = ['tarball_integrity']
+    if should_sign:
+        steps.append(Step('sign', sign, ['tarball_integrity']))
+        artifact_steps = ['sign']
 
-def download_sign_and_verify(filename, download_cmd):
-    """
-    Downloads a file, signs it, and returns True on success.
-    download_cmd is the shell command to download the file.
-    """
-    if not run_command(download_cmd):
-        print(f"error: failed to download {filename}")
-        return False
+    if proj.get('tarball_includes_submodules'):
+        steps.append(Step('tag', push_tag, gates + artifact_steps))
+        steps.append(Step('release', publish, ['tag']))
+    else:
+        steps.append(Step('tag', push_tag, gates))
+        steps.append(Step('release', publish, ['tag'] + artifact_steps))
 
-    if not sign_file(filename):
-        print(f"error: Failed to sign {filename}")
+    if not run_pipeline(steps, title=f"Release {repo} {tag}", name='create_release'):
+        print("error: Could not create release")
         return False
 
     return True
 
 
-def download_and_verify(filename, download_cmd):
+def download_files(files, work_dir=None):
     """
-    Downloads a file and verifies its .asc signature. Returns True on success.
-    The .asc file must already be present locally.
+    Downloads a list of (filename, download_cmd). Returns True on success.
     """
-    if not run_command(download_cmd):
-        print(f"error: failed to download {filename}")
-        return False
-
-    print(f"Verifying {filename} with signature {filename}.asc")
-    if not run_command(f"gpg --verify {filename}.asc {filename}"):
-        print(f"error: GPG signature verification failed for {filename}")
-        return False
+    for filename, download_cmd in files:
+        with resource('network'):
+            if not run_command(download_cmd, cwd=work_dir):
+                print(f"error: failed to download {filename}")
+                return False
 
-    print(f"Signature verification successful for {filename}")
     return True
 
 
-def sign_and_upload(proj_name, version, upload=True):
+@tracing.traced_step
+def sign_and_upload(proj_name, version, upload=True, work_dir=None):
     """
     Since GH actions can't sign, here's a function that signs and uploads
     To be run locally, example:
@@ -281,12 +390,14 @@ def sign_and_upload(proj_name, version, upload=True):
         1. The release tarball (uploaded as a release asset)
         2. The GitHub auto-generated .tar.gz archive
         3. The GitHub auto-generated .zip archive
+
+    Files are downloaded to work_dir, or the current directory.
     """
     tag = tag_for_version(proj_name, version)
     tarball = f"{proj_name}-{version}.tar.gz".lower()
     gh_tarball = f"{tag}.tar.gz"
     gh_zip = f"{tag}.zip"
-    gh_archive_base = f"https://github.com/KDAB/{proj_name}/archive/refs/tags/{tag}"
+    gh_archive_base = f"{utils.GITHUB_URL}/KDAB/{proj_name}/archive/refs/tags/{tag}"
 
     files = [
         (tarball,
@@ -295,9 +406,11 @@ def sign_and_upload(proj_name, version, upload=True):
         (gh_zip, f"curl -L -o {gh_zip} {gh_archive_base}.zip"),
     ]
 
-    for filename, download_cmd in files:
-        if not download_sign_and_verify(filename, download_cmd):
-            return False
+    if not download_files(files, work_dir):
+        return False
+
+    if not sign_files([filename for filename, _ in files], work_dir):
+        return False
 
     if not upload:
         asc_list = ', '.join(f"{f}.asc" for f, _ in files)
@@ -305,18 +418,20 @@ def sign_and_upload(proj_name, version, upload=True):
         return True
 
     asc_files = ' '.join(f"{f}.asc" for f, _ in files)
-    if not run_command(f"gh release upload -R KDAB/{proj_name} {tag} {asc_files} --clobber"):
-        print("error: Could not upload signatures")
-        return False
+    with resource('network'):
+        if not run_command(f"gh release upload -R KDAB/{proj_name} {tag} {asc_files} --clobber", cwd=work_dir):
+            print("error: Could not upload signatures")
+            return False
 
     return True
 
 
+@tracing.traced_step
 def verify_signature(proj_name, version):
     """
     Verifies the GPG signatures of a released tarball and the GitHub auto-generated archives.
     Downloads the tarball, zip, and their .asc signatures from the GitHub release, then
-    runs gpg --verify to confirm the signatures are valid.
+    verifies the signatures through gpg_utils.
     For projects with has_version_txt, also checks version.txt inside the tarball.
     To be run locally, example:
         ./src/sign_and_upload.py --repo KDDockWidgets --version 2.2.1 --verify
@@ -329,7 +444,7 @@ def verify_signature(proj_name, version):
     tarball = f"{proj_name}-{version}.tar.gz".lower()
     gh_tarball = f"{tag}.tar.gz"
     gh_zip = f"{tag}.zip"
-    gh_archive_base = f"https://github.com/KDAB/{proj_name}/archive/refs/tags/{tag}"
+    gh_archive_base = f"{utils.GITHUB_URL}/KDAB/{proj_name}/archive/refs/tags/{tag}"
 
     # Download release assets (tarballs and .asc signatures)
     if not run_command(f"gh release download {tag} --repo KDAB/{proj_name} --pattern '*.tar.gz' --clobber"):
@@ -341,22 +456,16 @@ def verify_signature(proj_name, version):
             f"error: failed to download .asc signatures for {proj_name} {tag}")
         return False
 
-    # Verify the release tarball
-    print(f"Verifying {tarball} with signature {tarball}.asc")
-    if not run_command(f"gpg --verify {tarball}.asc {tarball}"):
-        print(f"error: GPG signature verification failed for {tarball}")
-        return False
-    print(f"Signature verification successful for {tarball}")
-
-    # Verify the GitHub auto-generated archives
     gh_files = [
         (gh_tarball, f"curl -L -o {gh_tarball} {gh_archive_base}.tar.gz"),
         (gh_zip, f"curl -L -o {gh_zip} {gh_archive_base}.zip"),
     ]
+    if not download_files(gh_files):
+        return False
 
-    for filename, download_cmd in gh_files:
-        if not download_and_verify(filename, download_cmd):
-            return False
+    # Verify the release tarball and the GitHub auto-generated archives in one gpg session
+    if not verify_files([tarball, gh_tarball, gh_zip]):
+        return False
 
     if proj.get('has_version_txt'):
         with tarfile_module.open(tarball, 'r:gz') as tf:
@@ -378,29 +487,83 @@ def verify_signature(proj_name, version):
     return True
 
 
-def ci_run_status(proj_name, sha1):
-    output = run_command_with_output(
-        f"gh run list -R KDAB/{proj_name} --commit {sha1} --json status,name")
+# Workflows which don't say anything about the commit's health
+CI_IGNORED_WORKFLOWS = ('Create release',)
 
-    try:
-        output = json.loads(output)
-    except Exception as e:
-        print(f"Failed to parse JSON: {output}")
-        raise e
+CI_IN_PROGRESS = 'in_progress'
+CI_PASSED = 'passed'
+CI_FAILED = 'failed'
 
-    filtered_data = [
-        item for item in output if item["name"] != "Create release"]
+# Conclusions of completed runs which count as passed, the others (failure, timed_out, cancelled,
+# startup_failure, action_required, stale) count as failed
+CI_PASSING_CONCLUSIONS = ('success', 'skipped', 'neutral')
 
-    in_progress = any(item["status"] ==
-                      "in_progress" for item in filtered_data)
-    completed = any(item["status"] == "completed" for item in filtered_data)
 
-    failure_states = ["failure", "timed_out", "cancelled"]
-    failed = any(item["status"] in failure_states for item in filtered_data)
+def aggregate_ci_runs(runs, ignored_workflows=CI_IGNORED_WORKFLOWS):
+    '''
+    Reduces workflow runs to one state per workflow: CI_IN_PROGRESS, CI_PASSED or CI_FAILED.
+    runs are dicts with workflow_id, name, id, run_attempt, status and conclusion, as returned by
+    the actions/runs API. Only the latest run of each workflow counts, and of it, the latest attempt,
+    so a failure that was fixed by re-running doesn't count. Workflows can share a name, in
+    different files, so they're told apart by workflow_id.
+    Returns {workflow_id: (state, latest run)}.
+    '''
+    latest = {}
+    for run in runs:
+        if run['name'] in ignored_workflows:
+            continue
+        key = run.get('workflow_id') or run['name']
+        if key not in latest or (run['id'], run['run_attempt']) > (latest[key]['id'], latest[key]['run_attempt']):
+            latest[key] = run
+
+    states = {}
+    for run in latest.values():
+        if run['status'] != 'completed':
+            state = CI_IN_PROGRESS
+        elif run['conclusion'] in CI_PASSING_CONCLUSIONS:
+            state = CI_PASSED
+        else:
+            state = CI_FAILED
+        states[run.get('workflow_id') or run['name']] = (state, run)
+    return states
+
+
+def list_ci_runs(proj_name, sha1):
+    '''
+    Returns all workflow runs for sha1, reduced to the fields aggregate_ci_runs() needs.
+    Paginated with the largest page size, without the pull request data which we don't need.
+    '''
+    fields = ['workflow_id', 'name', 'id', 'run_attempt', 'status', 'conclusion']
+    jq = '.workflow_runs[] | [' + ', '.join(f'(.{field} // "")' for field in fields) + '] | @tsv'
+    output = run_command_with_output(
+        f"gh api --paginate 'repos/KDAB/{proj_name}/actions/runs?head_sha={sha1}&per_page=100"
+        f"&exclude_pull_requests=true' --jq '{jq}'")
+
+    runs = []
+    for line in output.splitlines():
+        values = line.split('\t')
+        if len(values) != len(fields):
+            continue
+        run = dict(zip(fields, values))
+        run['id'] = int(run['id'])
+        run['run_attempt'] = int(run['run_attempt'] or 1)
+        runs.append(run)
+    return runs
 
-    if in_progress or completed or failed:
-        print(output)
 
+@tracing.traced_step
+def ci_run_status(proj_name, sha1):
+    '''
+    Returns (in_progress, completed, failed) for the CI of sha1, aggregated per workflow
+    '''
+    states = aggregate_ci_runs(list_ci_runs(proj_name, sha1))
+    for state, run in sorted(states.values(), key=lambda state_run: (state_run[1]['name'], state_run[1]['id'])):
+        conclusion = f" ({run['conclusion']})" if run['conclusion'] else ''
+        print(f"CI: {run['name']}: {state}{conclusion}, attempt {run['run_attempt']}")
+
+    in_progress = any(state == CI_IN_PROGRESS for state, _ in states.values())
+    completed = any(state != CI_IN_PROGRESS for state, _ in states.values())
+    failed = any(state == CI_FAILED for state, _ in states.values())
     return in_progress, completed, failed
 
 
@@ -667,7 +830,7 @@ def commit_and_push_pr(commit_msg, gh_repo, repo_path, remote, branch, tmp_branc
     return True
 
 
-if __name__ == "__main__":
+def main(argv=None):
     parser = argparse.ArgumentParser()
     parser.add_argument('--get-latest-release', metavar='REPO',
                         help="returns latest release for a repo")
@@ -677,7 +840,7 @@ if __name__ == "__main__":
                         help="test create_tarball_with_submodules for a repo (requires --version and --sha1)")
     parser.add_argument('--version', help="version for --test-tarball")
     parser.add_argument('--sha1', help="sha1 for --test-tarball")
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     if args.get_latest_release:
         print(get_latest_release_tag_in_github(
             args.get_latest_release, None, None))
@@ -687,9 +850,15 @@ if __name__ == "__main__":
     if args.test_tarball:
         if not args.version or not args.sha1:
             print("--test-tarball requires --version and --sha1")
-            sys.exit(1)
+            return 1
         tarball_ok = utils.create_tarball_with_submodules(
             args.test_tarball, args.sha1, args.version)
-        sys.exit(0 if tarball_ok else 1)
+        return 0 if tarball_ok else 1
+    return 0
+
+
+if __name__ == "__main__":
+    import ci_release_tools
+    sys.exit(ci_release_tools.run('gh_utils', sys.argv[1:], main))
 
 # print_submodule_versions('..')
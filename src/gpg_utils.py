@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: 2026 Klarälvdalens Datakonsult AB, a KDAB Group company <info@kdab.com>
+# SPDX-License-Identifier: MIT
+
+# Signs and verifies many files through one gpg session
+#
+# Uses the gpgme Python bindings ('gpg' module) when installed: a single in-process context does
+# all the work. Otherwise falls back to 'gpg --batch --status-fd', one process per file, run from
+# a shared queue: gpg can't make several detached signatures in one process. Those processes share
+# one gpg-agent, started before the first one, which keeps the key unlocked. Either way, results
+# are structured (signer fingerprint, error) instead of an exit code.
+#
+# Each gpg process, or gpgme call, holds a slot of the 'gpg' resource (see pipeline.py), so
+# set_resource_limits(gpg=1) means one gpg at a time, whatever the session's jobs.
+#
+# The signing key is looked up once, before signing anything. A key which doesn't exist is an
+# error, instead of gpg falling back to the default key.
+#
+# Example:
+# $ gpg_utils.py --sign kdsoap-2.2.0.tar.gz v2.2.0.tar.gz v2.2.0.zip
+# $ gpg_utils.py --verify kdsoap-2.2.0.tar.gz v2.2.0.tar.gz v2.2.0.zip
+
+import argparse
+import os
+import subprocess
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from pipeline import resource
+from utils import observed
+
+DEFAULT_SIGNER = "KDAB Products"
+
+
+class GpgError(Exception):
+    pass
+
+
+class SignatureResult:
+    '''
+    Outcome of signing or verifying one file
+    '''
+
+    def __init__(self, filename, ok, fingerprint=None, error=None):
+        self.filename = filename
+        self.ok = ok
+        self.fingerprint = fingerprint
+        self.error = error
+
+    def __repr__(self):
+        if self.ok:
+            return f"{self.filename}: ok ({self.fingerprint})"
+        return f"{self.filename}: FAILED ({self.error})"
+
+
+def parse_status(status_output):
+    '''
+    Parses gpg --status-fd output into a dict of keyword to list of arguments
+    '''
+    result = {}
+    for line in status_output.split('\n'):
+        if not line.startswith('[GNUPG:] '):
+            continue
+        tokens = line[len('[GNUPG:] '):].split()
+        if tokens:
+            result.setdefault(tokens[0], []).append(tokens[1:])
+    return result
+
+
+class _GpgCliBackend:
+    '''
+    One 'gpg --batch' process per file. The private key stays unlocked in gpg-agent
+    between calls, so only the first signature can prompt for a passphrase.
+    '''
+    concurrent = True
+
+    def __init__(self, local_user, homedir):
+        self.base_cmd = ['gpg', '--batch', '--status-fd', '1']
+        self.homedir_args = ['--homedir', homedir] if homedir else []
+        self.base_cmd += self.homedir_args
+        self.local_user = local_user
+
+    def prepare_signing(self):
+        '''
+        Checks the signing key exists and starts the gpg-agent all gpg processes share
+        '''
+        subprocess.run(['gpgconf'] + self.homedir_args + ['--launch', 'gpg-agent'], capture_output=True, check=False)
+        if not self.local_user:
+            return
+        exit_code, _, _ = self._run(['--with-colons', '--list-secret-keys', self.local_user])
+        if exit_code != 0:
+            raise GpgError(f"No secret key for '{self.local_user}'")
+
+    def key_fingerprints(self, pattern):
+        result = subprocess.run(['gpg', '--batch', '--with-colons'] + self.homedir_args + ['--list-keys', pattern],
+                                capture_output=True, text=True, check=False)
+        return {line.split(':')[9] for line in result.stdout.splitlines() if line.startswith('fpr:')}
+
+    def _run(self, args):
+        with observed('gpg', ' '.join(self.base_cmd + args)) as span:
+            result = subprocess.run(self.base_cmd + args, capture_output=True, text=True, check=False)
+            span.update(exit_code=result.returncode, bytes=len(result.stdout) + len(result.stderr))
+        return result.returncode, parse_status(result.stdout), result.stderr.strip()
+
+    def sign(self, path):
+        args = ['--yes', '--armor', '--detach-sign']
+        if self.local_user:
+            args += ['--local-user', self.local_user]
+        exit_code, status, stderr = self._run(args + [path])
+        created = status.get('SIG_CREATED')
+        if exit_code != 0 or not created:
+            return SignatureResult(path, False, error=stderr or f"gpg exited with {exit_code}")
+        return SignatureResult(path, True, fingerprint=created[0][-1])
+
+    def verify(self, path, signature_path):
+        exit_code, status, stderr = self._run(['--verify', signature_path, path])
+        for bad in ('BADSIG', 'ERRSIG', 'EXPKEYSIG', 'REVKEYSIG'):
+            if bad in status:
+                return SignatureResult(path, False, error=f"{bad} {' '.join(status[bad][0])}")
+        valid = status.get('VALIDSIG')
+        if exit_code != 0 or 'GOODSIG' not in status or not valid:
+            return SignatureResult(path, False, error=stderr or f"gpg exited with {exit_code}")
+        # Last field of VALIDSIG is the primary key's fingerprint
+        return SignatureResult(path, True, fingerprint=valid[0][-1])
+
+
+class _GpgmeBackend:
+    '''
+    A single in-process gpgme context. Not thread-safe, so files are processed in order.
+    '''
+    concurrent = False
+
+    def __init__(self, local_user, homedir):
+        import gpg
+        self.gpg = gpg
+        self.context = gpg.Context(armor=True, home_dir=homedir)
+        self.local_user = local_user
+
+    def prepare_signing(self):
+        '''
+        Selects the signing key. gpgme would sign with the default key if there were no signer.
+        '''
+        if self.local_user:
+            keys = list(self.context.keylist(pattern=self.local_user, secret=True))
+            if not keys:
+                raise GpgError(f"No secret key for '{self.local_user}'")
+            self.context.signers = keys[:1]
+
+    def key_fingerprints(self, pattern):
+        return {subkey.fpr for key in self.context.keylist(pattern=pattern) for subkey in key.subkeys}
+
+    def sign(self, path):
+        try:
+            with open(path, 'rb') as f:
+                signature, result = self.context.sign(
+                    f.read(), mode=self.gpg.constants.sig.mode.DETACH)
+            with open(f"{path}.asc", 'wb') as f:
+                f.write(signature)
+            return SignatureResult(path, True, fingerprint=result.signatures[0].fpr)
+        except Exception as e:
+            return SignatureResult(path, False, error=str(e))
+
+    def verify(self, path, signature_path):
+        try:
+            with open(path, 'rb') as data, open(signature_path, 'rb') as signature:
+                _, result = self.context.verify(data, signature=signature)
+            return SignatureResult(path, True, fingerprint=result.signatures[0].fpr)
+        except Exception as e:
+            return SignatureResult(path, False, error=str(e))
+
+
+class GpgSession:
+    '''
+    Signs and verifies files, see the top of this file.
+    '''
+
+    def __init__(self, local_user=DEFAULT_SIGNER, homedir=None, jobs=4):
+        try:
+            self.backend = _GpgmeBackend(local_user, homedir)
+        except ImportError:
+            self.backend = _GpgCliBackend(local_user, homedir)
+        self.jobs = jobs if self.backend.concurrent else 1
+        self._prepared = False
+        self._lock = threading.Lock()
+
+    def _call(self, func, *args):
+        with resource('gpg'):
+            if self.backend.concurrent:
+                return func(*args)
+            with self._lock:
+                return func(*args)
+
+    def _map(self, func, items):
+        if self.jobs <= 1:
+            return [self._call(func, item) for item in items]
+        with ThreadPoolExecutor(max_workers=self.jobs) as executor:
+            return list(executor.map(lambda item: self._call(func, item), items))
+
+    def sign_files(self, filenames, work_dir=None):
+        '''
+        Creates <file>.asc detached signatures. Returns a list of SignatureResult.
+        Raises GpgError when the signing key doesn't exist.
+        '''
+        if not self._prepared:
+            self._call(self.backend.prepare_signing)
+            self._prepared = True
+        return self._map(lambda filename: self.backend.sign(_path(filename, work_dir)), filenames)
+
+    def key_fingerprints(self, pattern):
+        '''
+        The fingerprints of the keys in the keyring matching pattern (a user ID or fingerprint), and of their subkeys
+        '''
+        return self._call(self.backend.key_fingerprints, pattern)
+
+    def verify_files(self, filenames, work_dir=None):
+        '''
+        Verifies files against their <file>.asc. Returns a list of SignatureResult.
+        Any key of the keyring is accepted, check the fingerprints against key_fingerprints().
+        '''
+        def verify(filename):
+            path = _path(filename, work_dir)
+            if not os.path.exists(f"{path}.asc"):
+                return SignatureResult(path, False, error=f"{path}.asc does not exist")
+            return self.backend.verify(path, f"{path}.asc")
+
+        return self._map(verify, filenames)
+
+
+def _path(filename, work_dir):
+    return os.path.join(work_dir, filename) if work_dir else filename
+
+
+_default_session = None
+
+
+def default_session():
+    '''
+    The session used by gh_utils, created on first use
+    '''
+    global _default_session
+    if _default_session is None:
+        _default_session = GpgSession()
+    return _default_session
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sign', action='store_true', help="Sign the files")
+    parser.add_argument('--verify', action='store_true',
+                        help="Verify the files against their .asc")
+    parser.add_argument('--local-user', default=DEFAULT_SIGNER,
+                        help=f"Key to sign with (default: '{DEFAULT_SIGNER}')")
+    parser.add_argument('files', nargs='+')
+    args = parser.parse_args(argv)
+
+    if args.sign == args.verify:
+        print("Pass either --sign or --verify")
+        return 1
+
+    session = GpgSession(args.local_user)
+    if args.sign:
+        try:
+            results = session.sign_files(args.files)
+        except GpgError as e:
+            print(f"error: {e}")
+            return 1
+    else:
+        results = session.verify_files(args.files)
+
+    for result in results:
+        print(result)
+    return 0 if all(result.ok for result in results) else 1
+
+
+if __name__ == "__main__":
+    import ci_release_tools
+    sys.exit(ci_release_tools.run('gpg_utils', sys.argv[1:], main))
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: 2026 Klarälvdalens Datakonsult AB, a KDAB Group company <info@kdab.com>
+# SPDX-License-Identifier: MIT
+
+# Scripts related to our homebrew tap (KDAB/homebrew-tap)
+#
+# Bumps the formulas listed in releasing.toml's 'homebrew' field to a new release.
+# The release tarball is streamed through sha256, nothing is stored on disk.
+#
+# Examples:
+# $ homebrew_utils.py --tap-path ../homebrew-tap --repo KDDockWidgets --version 2.2.1
+# $ homebrew_utils.py --tap-path ../homebrew-tap --all
+# (--all bumps every project to its latest GitHub release)
+
+import argparse
+import os
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from utils import get_projects, get_project, get_url_sha256, tag_for_version, get_correct_repo_case, GITHUB_URL
+import gh_utils
+
+URL_RE = re.compile(r'^(\s*url\s+")([^"]+)(".*)$')
+SHA256_RE = re.compile(r'^(\s*sha256\s+")([0-9a-fA-F]{64})(".*)$')
+VERSION_RE = re.compile(r'^(\s*version\s+")([^"]+)(".*)$')
+
+
+def get_homebrew_projects():
+    '''
+    Returns the names of projects which have homebrew formulas in releasing.toml
+    '''
+    return [name for name, proj in get_projects().items() if proj.get('homebrew')]
+
+
+def release_tarball_url(proj_name, version):
+    '''
+    Returns the URL of the release tarball uploaded by create_release()
+    '''
+    tag = tag_for_version(proj_name, version)
+    return f"{GITHUB_URL}/KDAB/{proj_name}/releases/download/{tag}/{proj_name.lower()}-{version}.tar.gz"
+
+
+def formula_path(tap_path, formula):
+    '''
+    Returns the path of a formula inside a tap checkout.
+    Taps usually have them under Formula/, but the root is allowed too.
+    '''
+    candidate = os.path.join(tap_path, 'Formula', formula)
+    if os.path.exists(candidate):
+        return candidate
+    return os.path.join(tap_path, formula)
+
+
+def get_formula_url(formula_code):
+    '''
+    Returns the url of the stable download in a formula, or None
+    '''
+    for line in formula_code.split('\n'):
+        match = URL_RE.match(line)
+        if match:
+            return match.group(2)
+    return None
+
+
+def get_formula_version(formula_code):
+    '''
+    Returns the version of a formula, from its explicit 'version' line or from its url.
+    '''
+    for line in formula_code.split('\n'):
+        match = VERSION_RE.match(line)
+        if match:
+            return match.group(2)
+
+    url = get_formula_url(formula_code)
+    if not url:
+        return None
+    match = re.search(r'-(\d+(?:\.\d+)+)\.(?:tar|zip)', url)
+    if not match:
+        match = re.search(r'/[^/\d]*(\d+(?:\.\d+)+)/', url)
+    return match.group(1) if match else None
+
+
+def set_formula_url_and_sha256(formula_code, url, sha256, version=None):
+    '''
+    Rewrites the stable url and sha256 lines of a formula.
+    Only the first of each is replaced, so resource blocks and bottle checksums are left alone.
+    An explicit 'version' line is updated too, if present.
+    '''
+    lines = formula_code.split('\n')
+    replaced_url = replaced_sha256 = replaced_version = False
+    for i, line in enumerate(lines):
+        if not replaced_url and URL_RE.match(line):
+            lines[i] = URL_RE.sub(lambda m: m.group(1) + url + m.group(3), line)
+            replaced_url = True
+        elif not replaced_sha256 and SHA256_RE.match(line):
+            lines[i] = SHA256_RE.sub(
+                lambda m: m.group(1) + sha256 + m.group(3), line)
+            replaced_sha256 = True
+        elif version and not replaced_version and VERSION_RE.match(line):
+            lines[i] = VERSION_RE.sub(
+                lambda m: m.group(1) + version + m.group(3), line)
+            replaced_version = True
+
+    if not replaced_url or not replaced_sha256:
+        return None
+
+    return '\n'.join(lines)
+
+
+def bump_formulas(tap_path, proj_name, version):
+    '''
+    Points all homebrew formulas of a project to the specified release.
+    Returns True on success.
+    '''
+    proj = get_project(proj_name)
+    formulas = proj.get('homebrew', [])
+    if not formulas:
+        print(f"{proj_name}: no homebrew formula in releasing.toml")
+        return False
+
+    url = release_tarball_url(proj_name, version)
+    pending = []
+    for formula in formulas:
+        filename = formula_path(tap_path, formula)
+        if not os.path.exists(filename):
+            print(f"{proj_name}: formula {filename} does not exist")
+            return False
+        with open(filename, 'r', encoding='UTF-8') as f:
+            code = f.read()
+        if get_formula_url(code) == url:
+            print(f"{proj_name}: {formula} already at {version}")
+            continue
+        pending.append((filename, code))
+
+    if not pending:
+        return True
+
+    sha256 = get_url_sha256(url)
+    if not sha256:
+        return False
+
+    for filename, code in pending:
+        new_code = set_formula_url_and_sha256(code, url, sha256, version)
+        if new_code is None:
+            print(f"{proj_name}: could not find url and sha256 in {filename}")
+            return False
+        with open(filename, 'w', encoding='UTF-8') as f:
+            f.write(new_code)
+        print(f"{proj_name}: bumped {os.path.basename(filename)} to {version}")
+
+    return True
+
+
+def bump_all_formulas(tap_path, versions, jobs=8):
+    '''
+    Bumps formulas of several projects in parallel.
+    versions is a dict of project name to version, a None version means latest GitHub release.
+    Returns True if all projects were bumped.
+    '''
+    def bump(proj_name):
+        version = versions[proj_name]
+        if not version:
+            version = gh_utils.get_latest_version_in_github(
+                f"KDAB/{proj_name}", None, None)
+            if not version:
+                print(f"{proj_name}: could not determine latest release")
+                return False
+        return bump_formulas(tap_path, proj_name, version)
+
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        results = list(executor.map(bump, versions))
+
+    return all(results)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--tap-path', metavar='<path>', required=True,
+                        help="Path to a local checkout of KDAB/homebrew-tap")
+    parser.add_argument('--repo', help="Project to bump, as in releasing.toml")
+    parser.add_argument('--version',
+                        help="Version to bump to, defaults to the latest GitHub release")
+    parser.add_argument('--all', action='store_true',
+                        help="Bump every project which has homebrew formulas to its latest release")
+    parser.add_argument('--jobs', type=int, default=8,
+                        help="Number of projects to process in parallel")
+    args = parser.parse_args(argv)
+
+    if args.all:
+        projects = {name: None for name in get_homebrew_projects()}
+    elif args.repo:
+        projects = {get_correct_repo_case(args.repo): args.version}
+    else:
+        parser.print_help()
+        return 1
+
+    return 0 if bump_all_formulas(args.tap_path, projects, args.jobs) else 1
+
+
+if __name__ == "__main__":
+    import ci_release_tools
+    sys.exit(ci_release_tools.run('homebrew_utils', sys.argv[1:], main))
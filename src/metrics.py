@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: 2026 Klarälvdalens Datakonsult AB, a KDAB Group company <info@kdab.com>
+# SPDX-License-Identifier: MIT
+
+# Counters, gauges and histograms that the scripts report into, exported in OpenMetrics text format
+#
+# Enabled by environment variables, the metrics are written at exit:
+#   CI_RELEASE_TOOLS_METRICS=/var/lib/node_exporter/release.prom    textfile, written atomically
+#   CI_RELEASE_TOOLS_METRICS_PUSH_URL=http://localhost:9091/metrics/job/ci_release_tools
+#                                                                   PUT to a push endpoint
+#
+# All metric names get the ci_release_tools_ prefix.
+#
+# Commands and HTTP requests going through utils.observed() are recorded automatically.
+#
+# Example:
+#   metrics.inc('cache_requests', cache='query', result='hit')
+#   with metrics.timer('tarball_duration_seconds', project='KDSoap'):
+#       ...
+
+import atexit
+import contextlib
+import os
+import sys
+import threading
+import time
+
+PREFIX = 'ci_release_tools_'
+TEXTFILE = os.getenv("CI_RELEASE_TOOLS_METRICS")
+PUSH_URL = os.getenv("CI_RELEASE_TOOLS_METRICS_PUSH_URL")
+ENABLED = bool(TEXTFILE or PUSH_URL)
+
+# Seconds, suits both quick gh queries and tarballs of large projects
+DEFAULT_BUCKETS = (0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, 60, 300, 900)
+
+HELP = {
+    'command_duration_seconds': "Duration of commands",
+    'http_request_duration_seconds': "Duration of HTTP requests",
+    'http_bytes': "Bytes downloaded over HTTP",
+    'github_throttled': "Requests GitHub answered with 429, or 403 because of a rate limit",
+    'cache_requests': "Cache lookups, by result",
+    'clone_bytes': "Size of cloned repos, submodules included",
+    'tarball_bytes': "Size of tarballs created",
+    'tarball_duration_seconds': "Time to compress tarballs",
+    'pipeline_duration_seconds': "Duration of pipelines",
+    'pipeline_step_duration_seconds': "Duration of pipeline steps",
+    'dependencies_outdated': "Dependencies which can be bumped",
+    'run_duration_seconds': "Duration of the script",
+}
+
+_lock = threading.Lock()
+# name -> (type, {labels tuple: value}); histogram values are [bucket counts, sum, count]
+_metrics = {}
+_start = time.monotonic()
+
+
+def _labels_key(labels):
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _family(name, metric_type):
+    family = _metrics.setdefault(name, (metric_type, {}))
+    if family[0] != metric_type:
+        raise ValueError(f"Metric {name} is a {family[0]}, not a {metric_type}")
+    return family[1]
+
+
+def inc(name, value=1, **labels):
+    '''
+    Adds value to a counter. name is without the _total suffix.
+    '''
+    if not ENABLED:
+        return
+    with _lock:
+        samples = _family(name, 'counter')
+        key = _labels_key(labels)
+        samples[key] = samples.get(key, 0) + value
+
+
+def set_gauge(name, value, **labels):
+    if not ENABLED:
+        return
+    with _lock:
+        _family(name, 'gauge')[_labels_key(labels)] = value
+
+
+def observe(name, value, buckets=DEFAULT_BUCKETS, **labels):
+    '''
+    Adds value to a histogram
+    '''
+    if not ENABLED:
+        return
+    with _lock:
+        samples = _family(name, 'histogram')
+        key = _labels_key(labels)
+        if key not in samples:
+            samples[key] = [dict.fromkeys(buckets, 0), 0.0, 0]
+        histogram = samples[key]
+        for bound in histogram[0]:
+            if value <= bound:
+                histogram[0][bound] += 1
+        histogram[1] += value
+        histogram[2] += 1
+
+
+@contextlib.contextmanager
+def timer(name, **labels):
+    '''
+    Observes the duration of the with block in the histogram name.
+    Yields the labels, so the block can add some, like the result.
+    '''
+    start = time.monotonic()
+    try:
+        yield labels
+    finally:
+        observe(name, time.monotonic() - start, **labels)
+
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(key, extra=()):
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{label}="{_escape(value)}"' for label, value in pairs) + '}'
+
+
+def _format_number(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+def exposition():
+    '''
+    Returns the metrics in OpenMetrics text format
+    '''
+    lines = []
+    with _lock:
+        for name in sorted(_metrics):
+            metric_type, samples = _metrics[name]
+            full_name = PREFIX + name
+            lines.append(f"# TYPE {full_name} {metric_type}")
+            if name in HELP:
+                lines.append(f"# HELP {full_name} {HELP[name]}")
+            for key in sorted(samples):
+                value = samples[key]
+                if metric_type == 'counter':
+                    lines.append(f"{full_name}_total{_format_labels(key)} {_format_number(value)}")
+                elif metric_type == 'gauge':
+                    lines.append(f"{full_name}{_format_labels(key)} {_format_number(value)}")
+                else:
+                    buckets, total, count = value
+                    for bound, bucket_count in buckets.items():
+                        lines.append(f"{full_name}_bucket{_format_labels(key, [('le', _format_number(float(bound)))])}"
+                                     f" {bucket_count}")
+                    lines.append(f"{full_name}_bucket{_format_labels(key, [('le', '+Inf')])} {count}")
+                    lines.append(f"{full_name}_sum{_format_labels(key)} {_format_number(total)}")
+                    lines.append(f"{full_name}_count{_format_labels(key)} {count}")
+    lines.append("# EOF")
+    return '\n'.join(lines) + '\n'
+
+
+def write_textfile(filename):
+    '''
+    Writes atomically, so a collector never reads a half-written file
+    '''
+    temp_filename = f"{filename}.{os.getpid()}.tmp"
+    with open(temp_filename, 'w', encoding='UTF-8') as f:
+        f.write(exposition())
+    os.replace(temp_filename, filename)
+
+
+def push(url):
+    import urllib.request
+    request = urllib.request.Request(
+        url, data=exposition().encode(), method='PUT',
+        headers={'Content-Type': 'application/openmetrics-text; version=1.0.0; charset=utf-8'})
+    try:
+        with urllib.request.urlopen(request, timeout=10):
+            pass
+    except Exception as e:
+        print(f"Failed to push metrics to {url}: {e}", file=sys.stderr)
+        return False
+    return True
+
+
+def program_of(command):
+    '''
+    'gh release view v1.0 ...' -> 'gh', so commands can be labelled without exploding cardinality
+    '''
+    words = command.split(None, 1)
+    return os.path.basename(words[0]) if words else ''
+
+
+def is_throttled(status, headers=None, body=b''):
+    '''
+    True if GitHub answered status because of a rate limit: always for 429, for 403 only when the
+    primary rate limit is used up (x-ratelimit-remaining is 0) or when it's a secondary rate limit.
+    Other 403s are permissions.
+    '''
+    if status == 429:
+        return True
+    if status != 403:
+        return False
+    headers = headers or {}
+    return headers.get('x-ratelimit-remaining') == '0' or headers.get('retry-after') is not None or \
+        b'secondary rate limit' in body
+
+
+def operation_finished(category, name, info, seconds):
+    '''
+    Records a command or HTTP request traced by utils.observed().
+    info has the exit_code, or the HTTP status and whether it was throttled (see is_throttled()), and
+    the bytes received, when known.
+    '''
+    if not ENABLED:
+        return
+    if category == 'http':
+        from urllib.parse import urlsplit
+        host = urlsplit(name).hostname or ''
+        status = info.get('status', 'error')
+        observe('http_request_duration_seconds', seconds, host=host, status=status)
+        inc('http_bytes', info.get('bytes', 0), host=host)
+        if info.get('throttled') or status == 429:
+            inc('github_throttled', host=host)
+    else:
+        result = 'ok' if info.get('exit_code') == 0 else 'failed'
+        observe('command_duration_seconds', seconds, program=program_of(name), result=result)
+
+
+@atexit.register
+def _at_exit():
+    if not ENABLED:
+        return
+    set_gauge('run_duration_seconds', time.monotonic() - _start,
+              script=os.path.basename(sys.argv[0]) if sys.argv and sys.argv[0] else 'python')
+    if TEXTFILE:
+        write_textfile(TEXTFILE)
+    if PUSH_URL:
+        push(PUSH_URL)
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: 2026 Klarälvdalens Datakonsult AB, a KDAB Group company <info@kdab.com>
+# SPDX-License-Identifier: MIT
+
+# Mirrors all repos of our GitHub organizations, replaces download_all_repos.sh
+#
+# Each repo is a partial mirror, <dir>/<org>/<repo>.git, cloned with --filter=blob:none: all
+# commits and trees, blobs are fetched when something reads them. Only branches and tags are
+# mirrored, not GitHub's refs/pull/*, which pin every pull request ever made. Running again only
+# fetches what's new, so nightly refreshes take minutes. Repos which are archived or were deleted
+# are removed from the mirror, unless --no-prune. When the listing fails, or lists a lot fewer
+# repos than are mirrored, nothing is removed.
+#
+# Repos are listed with the paginated API, not gh repo list's --limit, and mirrored --jobs at a time.
+# qt_modules.py --mirror reads this layout.
+#
+# Examples:
+# $ mirror_repos.py ~/kdab-repos
+# $ mirror_repos.py ~/kdab-repos --org KDAB --jobs 16 --no-prune
+
+import argparse
+import os
+import shutil
+import sys
+import threading
+import time
+from utils import run_command_silent, run_command_with_exit_code, GITHUB_GIT_URL
+
+ORGS = ('KDAB', 'KDABLabs')
+DEFAULT_JOBS = 8
+DONE = {'clone': 'cloned', 'fetch': 'fetched'}
+
+FETCH_REFSPECS = ('+refs/heads/*:refs/heads/*', '+refs/tags/*:refs/tags/*')
+
+# Pruning more than this fraction of an org's mirrors at once is more likely a broken listing
+MAX_PRUNE_RATIO = 0.05
+
+
+def list_repos(org):
+    '''
+    Returns {repo: archived} of all repos of org, None if they can't be listed
+    '''
+    # A page failing after the first ones gives a partial listing, only the exit code tells
+    exit_code, output = run_command_with_exit_code(f"gh api --paginate 'orgs/{org}/repos?per_page=100&type=all' "
+                                                   "--jq '.[] | [.name, .archived] | @tsv'")
+    if exit_code != 0:
+        return None
+    repos = {}
+    for line in output.splitlines():
+        name, _, archived = line.partition('\t')
+        if name:
+            repos[name] = archived == 'true'
+    # An org always has repos, nothing listed means gh failed. Pruning everything would be wrong.
+    return repos or None
+
+
+def mirrored_repos(org_dir):
+    if not os.path.isdir(org_dir):
+        return set()
+    return {name[:-len('.git')] for name in os.listdir(org_dir)
+            if name.endswith('.git') and os.path.isdir(os.path.join(org_dir, name))}
+
+
+def plan(listed, mirrored, include_archived=False):
+    '''
+    Returns (repos to clone, repos to fetch, repos to prune), listed being {repo: archived}
+    '''
+    wanted = {repo for repo, archived in listed.items() if include_archived or not archived}
+    return sorted(wanted - mirrored), sorted(wanted & mirrored), sorted(mirrored - wanted)
+
+
+def directory_size(path):
+    total = 0
+    for dirpath, _, filenames in os.walk(path):
+        for filename in filenames:
+            try:
+                total += os.lstat(os.path.join(dirpath, filename)).st_size
+            except OSError:
+                pass
+    return total
+
+
+def configure_fetch(path):
+    '''
+    Makes the mirror at path fetch branches and tags only. Mirrors cloned with --mirror, by previous
+    versions, lose their refs/pull/* too.
+    '''
+    run_command_silent(f"git -C {path} config --unset remote.origin.mirror")
+    return run_command_silent(f"git -C {path} config --replace-all remote.origin.fetch '{FETCH_REFSPECS[0]}'") and \
+        run_command_silent(f"git -C {path} config --add remote.origin.fetch '{FETCH_REFSPECS[1]}'") and \
+        run_command_silent(f"git -C {path} for-each-ref --format='delete %(refname)' refs/pull | "
+                           f"git -C {path} update-ref --stdin")
+
+
+def clone_mirror(url, path):
+    '''
+    Clones url as a partial mirror at path. Done next to it, so an interrupted clone is redone next time.
+    '''
+    partial = f"{path}.partial"
+    shutil.rmtree(partial, ignore_errors=True)
+    if not run_command_silent(f"git clone -q --bare --filter=blob:none {url} {partial}") or \
+            not configure_fetch(partial):
+        shutil.rmtree(partial, ignore_errors=True)
+        return False
+    os.replace(partial, path)
+    return True
+
+
+def fetch_mirror(path):
+    return configure_fetch(path) and run_command_silent(f"git -C {path} remote update --prune")
+
+
+def sync(mirror_dir, org_repos, git_url=GITHUB_GIT_URL, jobs=DEFAULT_JOBS, prune=True, include_archived=False,
+         max_prune=MAX_PRUNE_RATIO):
+    '''
+    Clones, fetches and prunes mirror_dir to match org_repos, {org: {repo: archived}}. Returns True on success.
+    Nothing is pruned from an org when that would remove more than max_prune of its mirrors.
+    '''
+    from pipeline import Step, resource, run_pipeline
+
+    steps = []
+    work = []
+    for org, listed in org_repos.items():
+        org_dir = os.path.join(mirror_dir, org)
+        os.makedirs(org_dir, exist_ok=True)
+        to_clone, to_fetch, to_prune = plan(listed, mirrored_repos(org_dir), include_archived)
+        work += [(org, repo, 'clone') for repo in to_clone] + [(org, repo, 'fetch') for repo in to_fetch]
+        print(f"{org}: {len(to_clone)} to clone, {len(to_fetch)} to fetch, "
+              f"{len(to_prune)} archived or deleted" + ("" if prune else " (kept)"))
+        if prune and len(to_prune) > max(1, max_prune * (len(to_fetch) + len(to_prune))):
+            print(f"warning: {len(to_prune)} of the {org} mirrors are no longer listed, not removing any. "
+                  "Use --max-prune if that's right.")
+            to_prune = []
+        for repo in to_prune if prune else ():
+            print(f"Removing {org}/{repo}")
+            shutil.rmtree(os.path.join(org_dir, f"{repo}.git"))
+
+    lock = threading.Lock()
+    progress = {'done': 0, 'bytes': 0}
+    start = time.monotonic()
+
+    def mirror(org, repo, action):
+        def func():
+            path = os.path.join(mirror_dir, org, f"{repo}.git")
+            size_before = directory_size(path) if action == 'fetch' else 0
+            repo_start = time.monotonic()
+            with resource('network'):
+                ok = clone_mirror(f"{git_url}/{org}/{repo}", path) if action == 'clone' else fetch_mirror(path)
+            transferred = max(0, directory_size(path) - size_before) if ok else 0
+            with lock:
+                progress['done'] += 1
+                progress['bytes'] += transferred
+                status = f"{DONE[action]}, {transferred / 1024 ** 2:.1f} MiB" if ok else f"failed to {action}"
+                print(f"[{progress['done']}/{len(work)}] {org}/{repo}: {status} "
+                      f"in {time.monotonic() - repo_start:.1f}s")
+            return ok
+        return func
+
+    for org, repo, action in work:
+        steps.append(Step(f"{org}/{repo}", mirror(org, repo, action)))
+    ok = run_pipeline(steps, max_workers=jobs, title="Mirroring repos", name='mirror_repos') if steps else True
+
+    seconds = time.monotonic() - start
+    mib = progress['bytes'] / 1024 ** 2
+    print(f"Mirrored {len(work)} repos in {seconds:.0f}s, {mib:.1f} MiB new"
+          + (f" at {mib / seconds:.1f} MiB/s" if seconds else ""))
+    return ok
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument('mirror_dir', nargs='?', default='.', help="Repos go to <dir>/<org>/<repo>.git "
+                        "(default: current dir)")
+    parser.add_argument('--org', action='append', help=f"Default: {', '.join(ORGS)}")
+    parser.add_argument('--jobs', type=int, default=DEFAULT_JOBS, help="Repos mirrored at a time "
+                        "(default: %(default)s)")
+    parser.add_argument('--no-prune', action='store_true', help="Keep archived and deleted repos")
+    parser.add_argument('--max-prune', type=float, default=MAX_PRUNE_RATIO, help="Fraction of an org's "
+                        "mirrors which can be removed at once (default: %(default)s)")
+    parser.add_argument('--include-archived', action='store_true', help="Mirror archived repos too")
+    args = parser.parse_args(argv)
+
+    org_repos = {}
+    for org in args.org or ORGS:
+        org_repos[org] = list_repos(org)
+        if org_repos[org] is None:
+            print(f"error: can't list the repos of {org}")
+            return 1
+
+    return 0 if sync(os.path.abspath(args.mirror_dir), org_repos, jobs=max(1, args.jobs),
+                     prune=not args.no_prune, include_archived=args.include_archived,
+                     max_prune=args.max_prune) else 1
+
+
+if __name__ == "__main__":
+    import ci_release_tools
+    sys.exit(ci_release_tools.run('mirror_repos', sys.argv[1:], main))
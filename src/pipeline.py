@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: 2026 Klarälvdalens Datakonsult AB, a KDAB Group company <info@kdab.com>
+# SPDX-License-Identifier: MIT
+
+# Runs a set of steps with dependencies between them, as a DAG
+#
+# Steps whose dependencies succeeded run concurrently. A failed step causes its dependents to be
+# skipped. At the end, per-step timing and the critical path are printed.
+#
+# Example:
+#   steps = [Step('ci', check_ci), Step('tarball', build_tarball),
+#            Step('tag', push_tag, deps=['ci', 'tarball'])]
+#   ok = run_pipeline(steps)
+
+import contextlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+import metrics
+import tracing
+
+PENDING = 'pending'
+RUNNING = 'running'
+SUCCEEDED = 'ok'
+FAILED = 'failed'
+SKIPPED = 'skipped'
+
+# Name -> semaphore, for resources shared by concurrent pipelines, see set_resource_limits()
+_resource_limits = {}
+
+
+class Step:
+    '''
+    A node of the pipeline. func takes no arguments and returns True on success.
+    '''
+
+    def __init__(self, name, func, deps=None):
+        self.name = name
+        self.func = func
+        self.deps = list(deps or [])
+        self.status = PENDING
+        self.start = None
+        self.end = None
+
+    def duration(self):
+        if self.start is None or self.end is None:
+            return 0.0
+        return self.end - self.start
+
+
+def set_resource_limits(**limits):
+    '''
+    Limits how many steps can use a resource at the same time, process-wide.
+    Example: set_resource_limits(gpg=1, network=4, tarball=2)
+    Resources without a limit are unlimited.
+    '''
+    for name, limit in limits.items():
+        if limit:
+            _resource_limits[name] = threading.BoundedSemaphore(limit)
+        else:
+            _resource_limits.pop(name, None)
+
+
+@contextlib.contextmanager
+def resource(name):
+    '''
+    Holds one slot of the named resource for the duration of the with block
+    '''
+    semaphore = _resource_limits.get(name)
+    if semaphore is None:
+        yield
+        return
+
+    with semaphore:
+        yield
+
+
+def _check_graph(steps):
+    names = {step.name for step in steps}
+    if len(names) != len(steps):
+        raise ValueError("Pipeline has duplicate step names")
+    for step in steps:
+        for dep in step.deps:
+            if dep not in names:
+                raise ValueError(f"Step {step.name} depends on unknown step {dep}")
+
+
+def _run_step(step, parent_step):
+    step.start = time.monotonic()
+    try:
+        # Worker threads don't inherit the caller's step, so it's passed along
+        with tracing.step(step.name, parent=parent_step):
+            ok = step.func()
+    except (Exception, SystemExit) as e:
+        print(f"error: step {step.name} raised: {e}")
+        ok = False
+    step.end = time.monotonic()
+    step.status = SUCCEEDED if ok else FAILED
+    return step
+
+
+def critical_path(steps):
+    '''
+    Returns the chain of steps which determined the total duration.
+    Starts at the step which finished last and walks back through the dependency
+    which finished last, as that's the one the step was waiting for.
+    '''
+    by_name = {step.name: step for step in steps}
+    finished = [step for step in steps if step.end is not None]
+    if not finished:
+        return []
+
+    path = [max(finished, key=lambda step: step.end)]
+    while True:
+        deps = [by_name[dep] for dep in path[-1].deps if by_name[dep].end is not None]
+        if not deps:
+            break
+        path.append(max(deps, key=lambda step: step.end))
+
+    return list(reversed(path))
+
+
+def print_summary(steps, title, pipeline_start):
+    print(f"{title} summary:")
+    width = max(len(step.name) for step in steps)
+    for step in sorted(steps, key=lambda step: (step.start is None, step.start or 0)):
+        if step.start is None:
+            print(f"    {step.name.ljust(width)}  {step.status}")
+        else:
+            print(f"    {step.name.ljust(width)}  {step.status:7}  "
+                  f"start +{step.start - pipeline_start:6.2f}s  took {step.duration():6.2f}s")
+
+    path = critical_path(steps)
+    if path:
+        total = path[-1].end - pipeline_start
+        chain = ' -> '.join(f"{step.name} ({step.duration():.2f}s)" for step in path)
+        print(f"    critical path ({total:.2f}s): {chain}")
+
+
+def run_pipeline(steps, max_workers=8, title="Pipeline", name='pipeline'):
+    '''
+    Runs the steps, respecting dependencies. Returns True if all steps succeeded.
+    name labels the pipeline's metrics (see metrics.py), so unlike title it shouldn't contain versions.
+    '''
+    _check_graph(steps)
+    by_name = {step.name: step for step in steps}
+    pipeline_start = time.monotonic()
+    parent_step = tracing.current_step()
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {}
+        while True:
+            for step in steps:
+                if step.status != PENDING:
+                    continue
+                dep_status = [by_name[dep].status for dep in step.deps]
+                if any(status in (FAILED, SKIPPED) for status in dep_status):
+                    step.status = SKIPPED
+                elif all(status == SUCCEEDED for status in dep_status):
+                    step.status = RUNNING
+                    futures[executor.submit(_run_step, step, parent_step)] = step
+
+            if not futures:
+                break
+
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                del futures[future]
+
+    # Whatever is left depends on a failed step, or is part of a cycle
+    for step in steps:
+        if step.status == PENDING:
+            step.status = SKIPPED
+
+    print_summary(steps, title, pipeline_start)
+    ok = all(step.status == SUCCEEDED for step in steps)
+
+    for step in steps:
+        if step.start is not None:
+            metrics.observe('pipeline_step_duration_seconds', step.duration(),
+                            pipeline=name, step=step.name, status=step.status)
+    metrics.observe('pipeline_duration_seconds', time.monotonic() - pipeline_start,
+                    pipeline=name, result='ok' if ok else 'failed')
+    return ok
@@ -0,0 +1,361 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: 2026 Klarälvdalens Datakonsult AB, a KDAB Group company <info@kdab.com>
+# SPDX-License-Identifier: MIT
+
+# Builds Qt with several presets of build_qt/CMakePresets.json concurrently
+#
+# The patched Qt source is prepared once, then every preset is configured and built in its own
+# build dir, as a pipeline (see pipeline.py). Cores and RAM are split between the presets building
+# at the same time: each gets 'ninja -j <jobs / parallel>', and CMake job pools cap its compile
+# and link jobs so they fit in its share of RAM (links of sanitizer builds are the memory hogs).
+# Installs go to <parent-install-dir>/qt-<qt-tag>-<preset>, through a staging dir that replaces
+# the previous install only once complete.
+#
+# By default each preset builds from scratch. With --incremental, a build dir is kept as long as
+# the Qt tag, preset and patches it was configured for are the same (see ci-release-tools.json in
+# it), and CMake only runs again when the cache variables we pass differ from CMakeCache.txt.
+#
+# After each build, a report of where the time went is written next to the install and compared
+# with the previous build, see qt_build_telemetry.py.
+#
+# Examples:
+# $ qt_build.py v6.11.0 ~/sources/qt6_ci ~/installed/Qt
+# $ qt_build.py v6.11.0 ~/sources/qt6_ci ~/installed/Qt --preset asan --preset tsan --jobs 64 --ram-gb 256
+# $ qt_build.py v6.11.0 ~/sources/qt6_ci ~/installed/Qt --preset asan --incremental
+
+import argparse
+import json
+import os
+import shlex
+import shutil
+import sys
+import qt_build_telemetry
+import qt_patches
+from utils import run_command
+
+BUILD_QT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'build_qt')
+PRESETS_FILE = os.path.join(BUILD_QT_DIR, 'CMakePresets.json')
+QT5_URL = "https://github.com/qt/qt5.git"
+
+# What build_all.sh used to build
+DEFAULT_PRESETS = ['asan', 'ubsan', 'tsan', 'debug', 'profile']
+
+# Not needed by any preset, not worth fetching
+EXCLUDED_SUBMODULES = [
+    'qtwebengine', 'qtpim', 'qttasktree', 'qtsystems', 'qtrepotools', 'qtquicktimeline',
+    'qtquickeffectmaker', 'qtquick3dphysics', 'qtquick3d', 'qtqa', 'qtopenapi', 'qtopcua',
+    'qtlottie', 'qthttpserver', 'qtgraphs', 'qtgamepad', 'qtfeedback', 'qtcoap', 'qtcanvas3d',
+    'qtactiveqt',
+]
+
+# Peak RSS of one job, in GiB. Debug + sanitizer links of QtGui/QtQuick are the worst.
+RAM_PER_COMPILE_JOB_GB = 2
+RAM_PER_LINK_JOB_GB = 8
+
+# What a build dir was configured for, written in it after configuring
+STAMP_FILENAME = 'ci-release-tools.json'
+
+
+def load_presets(filename=PRESETS_FILE):
+    '''
+    Returns the configure presets, name -> preset, with inherited cacheVariables merged in
+    '''
+    with open(filename, 'r', encoding='UTF-8') as f:
+        raw = {preset['name']: preset for preset in json.load(f)['configurePresets']}
+
+    resolved = {}
+
+    def resolve(name):
+        if name not in resolved:
+            preset = raw[name]
+            parents = preset.get('inherits', [])
+            merged = {'cacheVariables': {}}
+            # The first parent wins, so merge them in reverse
+            for parent in reversed([parents] if isinstance(parents, str) else parents):
+                parent_preset = resolve(parent)
+                merged.update({k: v for k, v in parent_preset.items() if k not in ('name', 'hidden')})
+                merged['cacheVariables'] = dict(merged['cacheVariables'], **parent_preset['cacheVariables'])
+            merged.update({k: v for k, v in preset.items() if k not in ('inherits', 'cacheVariables')})
+            merged['cacheVariables'] = dict(merged['cacheVariables'], **preset.get('cacheVariables', {}))
+            resolved[name] = merged
+        return resolved[name]
+
+    for name in raw:
+        resolve(name)
+    return resolved
+
+
+def buildable_presets(presets):
+    return [name for name, preset in presets.items() if not preset.get('hidden')]
+
+
+def build_dir(src_dir, preset_name, presets):
+    binary_dir = presets[preset_name].get('binaryDir', 'build-${presetName}')
+    return os.path.join(src_dir, binary_dir.replace('${presetName}', preset_name).replace('${sourceDir}/', ''))
+
+
+def install_dir(parent_install_dir, qt_tag, preset_name):
+    return os.path.join(parent_install_dir, f"qt-{qt_tag}-{preset_name}")
+
+
+def total_ram_gb():
+    return os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES') / 1024 ** 3
+
+
+def job_budget(parallel, total_jobs, ram_gb):
+    '''
+    Splits total_jobs and ram_gb between parallel presets building at the same time.
+    Returns {'jobs': ninja -j, 'compile': compile pool size, 'link': link pool size}, per preset.
+    Links get half the RAM share, as they run next to compiles.
+    '''
+    jobs = max(1, total_jobs // parallel)
+    ram_share = ram_gb / parallel
+    return {'jobs': jobs,
+            'compile': max(1, min(jobs, int(ram_share // RAM_PER_COMPILE_JOB_GB))),
+            'link': max(1, min(jobs, int(ram_share / 2 // RAM_PER_LINK_JOB_GB)))}
+
+
+def job_pool_args(budget):
+    return (f"-DCMAKE_JOB_POOLS='compile={budget['compile']};link={budget['link']}' "
+            "-DCMAKE_JOB_POOL_COMPILE=compile -DCMAKE_JOB_POOL_LINK=link")
+
+
+def cache_variables(src_dir, preset_name, presets, prefix, budget):
+    '''
+    The cache variables configure sets, as CMakeCache.txt would store them
+    '''
+    def value(v):
+        if isinstance(v, dict):
+            v = v['value']
+        if isinstance(v, bool):
+            return 'ON' if v else 'OFF'
+        return str(v).replace('${sourceDir}', src_dir).replace('${presetName}', preset_name)
+
+    variables = {name: value(v) for name, v in presets[preset_name]['cacheVariables'].items()}
+    variables.update({'CMAKE_INSTALL_PREFIX': prefix,
+                      'CMAKE_JOB_POOLS': f"compile={budget['compile']};link={budget['link']}",
+                      'CMAKE_JOB_POOL_COMPILE': 'compile',
+                      'CMAKE_JOB_POOL_LINK': 'link'})
+    return variables
+
+
+def read_cmake_cache(binary_dir):
+    '''
+    Returns {name: value} from CMakeCache.txt, empty if there's none
+    '''
+    variables = {}
+    try:
+        with open(os.path.join(binary_dir, 'CMakeCache.txt'), 'r', encoding='UTF-8') as f:
+            for line in f:
+                if line.startswith(('#', '//')) or '=' not in line:
+                    continue
+                name_and_type, value = line.rstrip('\n').split('=', 1)
+                variables[name_and_type.split(':', 1)[0]] = value
+    except OSError:
+        pass
+    return variables
+
+
+def changed_cache_variables(binary_dir, wanted):
+    '''
+    Returns the names of the variables of wanted which CMakeCache.txt doesn't have, or with another value
+    '''
+    def normalized(value):
+        upper = value.upper()
+        if upper in ('ON', 'TRUE', 'YES', 'Y', '1'):
+            return 'ON'
+        if upper in ('OFF', 'FALSE', 'NO', 'N', '0', ''):
+            return 'OFF'
+        return value
+
+    cache = read_cmake_cache(binary_dir)
+    return sorted(name for name, value in wanted.items()
+                  if name not in cache or normalized(cache[name]) != normalized(value))
+
+
+def read_stamp(binary_dir):
+    try:
+        with open(os.path.join(binary_dir, STAMP_FILENAME), 'r', encoding='UTF-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def write_stamp(binary_dir, stamp):
+    with open(os.path.join(binary_dir, STAMP_FILENAME), 'w', encoding='UTF-8') as f:
+        json.dump(stamp, f, indent=2)
+        f.write('\n')
+
+
+def swap_in(staging_dir, prefix):
+    '''
+    Replaces prefix with staging_dir. prefix is only missing between two renames, never half installed.
+    '''
+    old_dir = f"{prefix}.old"
+    shutil.rmtree(old_dir, ignore_errors=True)
+    if os.path.exists(prefix):
+        os.rename(prefix, old_dir)
+    os.rename(staging_dir, prefix)
+    shutil.rmtree(old_dir, ignore_errors=True)
+
+
+def submodule_pathspec(excluded=None):
+    return ' '.join(["."] + [shlex.quote(f":(exclude){name}")
+                             for name in (EXCLUDED_SUBMODULES if excluded is None else excluded)])
+
+
+def prepare_source(qt_tag, src_dir, patches_dir=qt_patches.PATCHES_DIR):
+    '''
+    Clones or updates the Qt source at qt_tag, with submodules, CMakePresets.json and our patches
+    (see qt_patches.py). Done once for all presets. Submodules already patched aren't touched.
+    '''
+    if not os.path.isdir(src_dir):
+        if not run_command(f"git clone {QT5_URL} -b {shlex.quote(qt_tag)} --depth 1 --single-branch "
+                           f"{shlex.quote(src_dir)}", fatal=False):
+            return False
+    elif not run_command("git fetch origin", fatal=False, cwd=src_dir):
+        return False
+
+    if not run_command(f"git checkout {shlex.quote(qt_tag)}", fatal=False, cwd=src_dir):
+        return False
+
+    # Updating them would rewrite their patched files, and rebuild everything depending on them
+    patched = qt_patches.patched_submodules(src_dir, patches_dir)
+    print("Initializing Qt submodules..." + (f" {', '.join(patched)} already patched" if patched else ""))
+    pathspec = submodule_pathspec(EXCLUDED_SUBMODULES + patched)
+    if not run_command(f"git submodule update --init --recursive -- {pathspec}", fatal=False, cwd=src_dir):
+        return False
+
+    import filecmp
+    presets_copy = os.path.join(src_dir, os.path.basename(PRESETS_FILE))
+    if not os.path.exists(presets_copy) or not filecmp.cmp(PRESETS_FILE, presets_copy, shallow=False):
+        shutil.copy(PRESETS_FILE, src_dir)
+    return qt_patches.apply_patches(src_dir, patches_dir)
+
+
+def configure(src_dir, preset_name, presets, prefix, budget, stamp, incremental=False):
+    '''
+    Configures the preset's build dir, from scratch unless incremental and it was configured for stamp
+    '''
+    binary_dir = build_dir(src_dir, preset_name, presets)
+    if incremental and read_stamp(binary_dir) == stamp:
+        changed = changed_cache_variables(binary_dir, cache_variables(src_dir, preset_name, presets, prefix, budget))
+        if not changed:
+            print(f"{preset_name}: keeping the configured build dir")
+            return True
+        print(f"{preset_name}: reconfiguring, changed: {', '.join(changed)}")
+    else:
+        if incremental and os.path.exists(binary_dir):
+            print(f"{preset_name}: the Qt tag, preset or patches changed, building from scratch")
+        shutil.rmtree(binary_dir, ignore_errors=True)
+
+    if not run_command(f"cmake --preset={shlex.quote(preset_name)} -DCMAKE_INSTALL_PREFIX={shlex.quote(prefix)} "
+                       f"{job_pool_args(budget)}",
+                       fatal=False, cwd=src_dir):
+        return False
+    write_stamp(binary_dir, stamp)
+    return True
+
+
+def build_and_install(src_dir, preset_name, presets, prefix, budget, qt_tag, patch_set):
+    '''
+    Builds, then installs to a staging dir swapped in for prefix. Writes the build report next to prefix,
+    with patch_set, the key of the patches applied (see qt_patches.patch_set_key).
+    '''
+    binary_dir = build_dir(src_dir, preset_name, presets)
+    ccache_log = os.path.join(binary_dir, qt_build_telemetry.CCACHE_LOG_FILENAME)
+    if os.path.exists(ccache_log):
+        os.remove(ccache_log)
+
+    before = qt_build_telemetry.read_ninja_log(binary_dir)
+    if not run_command(f"CCACHE_STATSLOG={shlex.quote(ccache_log)} cmake --build {shlex.quote(binary_dir)} "
+                       f"-j {budget['jobs']}", fatal=False):
+        return False
+    qt_build_telemetry.record_build(preset_name, binary_dir, before, ccache_log, f"{prefix}.build-report.json",
+                                    qt_tag=qt_tag, preset=preset_name, budget=budget, patches=patch_set)
+
+    staging_dir = f"{prefix}.staging"
+    shutil.rmtree(staging_dir, ignore_errors=True)
+    if not run_command(f"cmake --install {shlex.quote(binary_dir)} --prefix {shlex.quote(staging_dir)}",
+                       fatal=False):
+        return False
+    swap_in(staging_dir, prefix)
+    return True
+
+
+def build_presets(qt_tag, src_dir, parent_install_dir, preset_names, total_jobs, ram_gb, parallel,
+                  incremental=False):
+    '''
+    Prepares the source, then configures and builds the presets, parallel at a time. Returns True on success.
+    '''
+    from pipeline import Step, resource, run_pipeline, set_resource_limits
+
+    presets = load_presets()
+    src_dir = os.path.abspath(src_dir)
+    parent_install_dir = os.path.abspath(parent_install_dir)
+    os.makedirs(parent_install_dir, exist_ok=True)
+
+    parallel = max(1, min(parallel, len(preset_names)))
+    budget = job_budget(parallel, total_jobs, ram_gb)
+    set_resource_limits(qt_build=parallel)
+    print(f"Building {', '.join(preset_names)}, {parallel} at a time, each with -j {budget['jobs']}, "
+          f"{budget['compile']} compile and {budget['link']} link jobs")
+
+    patches = {submodule: qt_patches.series_key('', files)
+               for submodule, files in qt_patches.discover_patches().items()}
+    patch_set = qt_patches.patch_set_key()
+
+    # Configuring runs configure tests with the preset's compiler, so it counts against --parallel too
+    def configure_preset(preset_name, prefix, stamp):
+        def func():
+            with resource('qt_build'):
+                return configure(src_dir, preset_name, presets, prefix, budget, stamp, incremental)
+        return func
+
+    def build(preset_name, prefix):
+        def func():
+            with resource('qt_build'):
+                return build_and_install(src_dir, preset_name, presets, prefix, budget, qt_tag, patch_set)
+        return func
+
+    steps = [Step('source', lambda: prepare_source(qt_tag, src_dir))]
+    for preset_name in preset_names:
+        prefix = install_dir(parent_install_dir, qt_tag, preset_name)
+        stamp = {'qt_tag': qt_tag, 'preset': preset_name, 'patches': patches}
+        steps.append(Step(f"configure:{preset_name}", configure_preset(preset_name, prefix, stamp), ['source']))
+        steps.append(Step(f"build:{preset_name}", build(preset_name, prefix), [f"configure:{preset_name}"]))
+
+    return run_pipeline(steps, max_workers=len(steps), title=f"Qt {qt_tag}", name='qt_build')
+
+
+def main(argv=None):
+    presets = buildable_presets(load_presets())
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('qt_tag', help="Qt tag or branch, for example v6.11.0")
+    parser.add_argument('src_dir', help="Qt source checkout, cloned if it doesn't exist")
+    parser.add_argument('parent_install_dir', help="Each preset is installed to <dir>/qt-<qt-tag>-<preset>")
+    parser.add_argument('--preset', action='append', choices=presets,
+                        help=f"Preset to build, can be repeated (default: {' '.join(DEFAULT_PRESETS)})")
+    parser.add_argument('--jobs', type=int, default=os.cpu_count(),
+                        help="Total build jobs, split between presets (default: %(default)s)")
+    parser.add_argument('--ram-gb', type=float, default=total_ram_gb(),
+                        help="Total RAM in GiB, split between presets (default: all)")
+    parser.add_argument('--parallel', type=int,
+                        help="How many presets build at the same time (default: all of them)")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Keep build dirs configured for the same Qt tag, preset and patches")
+    args = parser.parse_args(argv)
+
+    preset_names = args.preset or DEFAULT_PRESETS
+    if not build_presets(args.qt_tag, args.src_dir, args.parent_install_dir, preset_names,
+                         args.jobs, args.ram_gb, args.parallel or len(preset_names), args.incremental):
+        print("error: Qt build failed")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    import ci_release_tools
+    sys.exit(ci_release_tools.run('qt_build', sys.argv[1:], main))
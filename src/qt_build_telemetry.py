@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: 2026 Klarälvdalens Datakonsult AB, a KDAB Group company <info@kdab.com>
+# SPDX-License-Identifier: MIT
+
+# Where the time of a Qt build goes, from ninja's .ninja_log and ccache's stats
+#
+# After each build, qt_build.py writes <install-dir>.build-report.json with:
+# - time per Qt module (qtbase, qtdeclarative, ...) and per CMake target
+# - the slowest compiles and links
+# - an estimate of the critical path: starting from the last output to finish, going back to the
+#   output which finished last before it started, and so on. ninja doesn't log dependencies, so
+#   this is the chain of jobs the build waited for, not necessarily the dependency chain.
+# - ccache hits and misses of this build, and ccache's own counters (ccache --print-stats)
+# The previous report is compared with the new one, and modules which got slower are reported.
+# Only full builds are compared, incremental ones rebuild too little to say anything.
+#
+# Examples:
+# $ qt_build_telemetry.py ~/sources/qt6_ci/build-asan
+# $ qt_build_telemetry.py ~/sources/qt6_ci/build-asan --previous ~/installed/Qt/qt-v6.11.0-asan.build-report.json
+
+import argparse
+import json
+import os
+import re
+import sys
+from datetime import datetime, timezone
+from utils import run_command_with_output
+
+REPORT_FORMAT = 1
+CCACHE_LOG_FILENAME = 'ci-release-tools-ccache.log'
+SLOWEST_COUNT = 20
+
+# A module is reported slower when it took this much longer, relative and in seconds
+REGRESSION_RATIO = 0.1
+REGRESSION_MIN_SECONDS = 30
+
+CCACHE_HITS = ('direct_cache_hit', 'preprocessed_cache_hit', 'remote_storage_hit')
+
+LINK_OUTPUT = re.compile(r'(\.so(\.\d+)*|\.a|\.dylib)$|(^|/)(bin|libexec)/[^/]+$')
+TARGET_DIR = re.compile(r'CMakeFiles/([^/]+)\.dir/')
+
+
+def read_ninja_log(binary_dir):
+    '''
+    Returns {output: (start_ms, end_ms, mtime, command_hash)} from .ninja_log, the latest entry of each output
+    '''
+    entries = {}
+    try:
+        with open(os.path.join(binary_dir, '.ninja_log'), 'r', encoding='UTF-8') as f:
+            for line in f:
+                fields = line.rstrip('\n').split('\t')
+                if line.startswith('#') or len(fields) != 5:
+                    continue
+                entries[fields[3]] = (int(fields[0]), int(fields[1]), fields[2], fields[4])
+    except OSError:
+        pass
+    return entries
+
+
+def rebuilt_outputs(before, after):
+    '''
+    The outputs ninja built between two read_ninja_log() snapshots
+    '''
+    return [output for output, entry in after.items() if before.get(output) != entry]
+
+
+def read_ccache_log(filename):
+    '''
+    Returns (hits, misses) from a ccache stats_log, (0, 0) if there's none
+    '''
+    hits = misses = 0
+    try:
+        with open(filename, 'r', encoding='UTF-8') as f:
+            for line in f:
+                line = line.strip()
+                if line in CCACHE_HITS:
+                    hits += 1
+                elif line == 'cache_miss':
+                    misses += 1
+    except OSError:
+        pass
+    return hits, misses
+
+
+def ccache_counters():
+    '''
+    Returns ccache's counters, {} if ccache isn't there
+    '''
+    import shutil
+
+    counters = {}
+    if not shutil.which('ccache'):
+        return counters
+    for line in run_command_with_output("ccache --print-stats").splitlines():
+        name, _, value = line.partition('\t')
+        if value.isdigit():
+            counters[name] = int(value)
+    return counters
+
+
+def output_kind(output):
+    if output.endswith(('.o', '.obj')):
+        return 'compile'
+    if LINK_OUTPUT.search(output):
+        return 'link'
+    return 'other'
+
+
+def output_module(output):
+    return output.split('/', 1)[0] if '/' in output else '(top level)'
+
+
+def output_target(output):
+    match = TARGET_DIR.search(output)
+    return match.group(1) if match else os.path.basename(output)
+
+
+def critical_path(timings):
+    '''
+    Estimates the critical path from [(start_ms, end_ms, output)]. Returns (seconds, outputs in build order).
+    '''
+    import bisect
+
+    if not timings:
+        return 0, []
+    by_end = sorted(timings, key=lambda timing: timing[1])
+    ends = [timing[1] for timing in by_end]
+
+    current = len(by_end) - 1
+    path = [by_end[current]]
+    while True:
+        # The output which finished last, before the current one started
+        index = min(bisect.bisect_right(ends, by_end[current][0]), current) - 1
+        if index < 0:
+            break
+        current = index
+        path.append(by_end[current])
+
+    path.reverse()
+    return (path[-1][1] - path[0][0]) / 1000, [output for _, _, output in path]
+
+
+def analyze(entries, outputs):
+    '''
+    The time breakdown of outputs, which entries (see read_ninja_log) has timings for
+    '''
+    timings = [(entries[output][0], entries[output][1], output) for output in outputs]
+    modules = {}
+    targets = {}
+    compiles = []
+    links = []
+    for start, end, output in timings:
+        seconds = (end - start) / 1000
+        for totals, name in ((modules, output_module(output)), (targets, output_target(output))):
+            total = totals.setdefault(name, {'seconds': 0, 'outputs': 0})
+            total['seconds'] += seconds
+            total['outputs'] += 1
+        kind = output_kind(output)
+        if kind == 'compile':
+            compiles.append({'output': output, 'seconds': seconds})
+        elif kind == 'link':
+            links.append({'output': output, 'seconds': seconds})
+
+    def by_time(totals):
+        return dict(sorted(((name, {'seconds': round(total['seconds'], 3), 'outputs': total['outputs']})
+                            for name, total in totals.items()), key=lambda item: -item[1]['seconds']))
+
+    def slowest(items):
+        return sorted(items, key=lambda item: -item['seconds'])[:SLOWEST_COUNT]
+
+    path_seconds, path = critical_path(timings)
+    return {
+        'wall_seconds': (max(end for _, end, _ in timings) - min(start for start, _, _ in timings)) / 1000
+        if timings else 0,
+        'cpu_seconds': round(sum(end - start for start, end, _ in timings) / 1000, 3),
+        'modules': by_time(modules),
+        'targets': by_time(targets),
+        'slowest_compiles': slowest(compiles),
+        'slowest_links': slowest(links),
+        'critical_path': {'seconds': path_seconds, 'outputs': path},
+    }
+
+
+def build_report(binary_dir, before, ccache_log, **info):
+    '''
+    The report of the build which ran since the before snapshot of .ninja_log. info is added as is.
+    '''
+    after = read_ninja_log(binary_dir)
+    outputs = rebuilt_outputs(before, after)
+    hits, misses = read_ccache_log(ccache_log)
+    report = dict({'format': REPORT_FORMAT}, **info)
+    report.update({
+        'finished_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'outputs_built': len(outputs),
+        'outputs_total': len(after),
+        'full_build': len(outputs) == len(after),
+        'ccache': {'hits': hits, 'misses': misses, 'counters': ccache_counters()},
+    })
+    report.update(analyze(after, outputs))
+    return report
+
+
+def load_report(filename):
+    try:
+        with open(filename, 'r', encoding='UTF-8') as f:
+            report = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return report if report.get('format') == REPORT_FORMAT else None
+
+
+def write_report(report, filename):
+    with open(f"{filename}.tmp", 'w', encoding='UTF-8') as f:
+        json.dump(report, f, indent=2)
+        f.write('\n')
+    os.replace(f"{filename}.tmp", filename)
+
+
+def regressions(previous, current):
+    '''
+    Returns [(what, seconds before, seconds now)] for what got slower, empty when the builds aren't comparable
+    '''
+    if not previous or not previous['full_build'] or not current['full_build']:
+        return []
+
+    compared = [('wall time', previous['wall_seconds'], current['wall_seconds']),
+                ('critical path', previous['critical_path']['seconds'], current['critical_path']['seconds'])]
+    compared += [(module, previous['modules'][module]['seconds'], total['seconds'])
+                 for module, total in current['modules'].items() if module in previous['modules']]
+    return [(what, before, now) for what, before, now in compared
+            if now - before > max(REGRESSION_MIN_SECONDS, before * REGRESSION_RATIO)]
+
+
+def print_summary(name, report, slower=None):
+    hits, misses = report['ccache']['hits'], report['ccache']['misses']
+    ccache = f"ccache {100 * hits / (hits + misses):.0f}% hits ({hits} of {hits + misses})" \
+        if hits + misses else "no ccache stats"
+    print(f"{name}: rebuilt {report['outputs_built']} of {report['outputs_total']} outputs "
+          f"in {report['wall_seconds']:.0f}s, {ccache}")
+    if not report['outputs_built']:
+        return
+
+    path = report['critical_path']
+    print(f"  {report['cpu_seconds']:.0f}s of jobs, critical path ~{path['seconds']:.0f}s "
+          f"over {len(path['outputs'])} outputs")
+    modules = list(report['modules'].items())[:5]
+    print("  slowest modules: " + ', '.join(f"{module} {total['seconds']:.0f}s" for module, total in modules))
+    for kind in ('compile', 'link'):
+        if report[f"slowest_{kind}s"]:
+            slowest = report[f"slowest_{kind}s"][0]
+            print(f"  slowest {kind}: {slowest['output']} {slowest['seconds']:.0f}s")
+    for what, before, now in slower or []:
+        print(f"warning: {name}: {what} took {now:.0f}s, was {before:.0f}s in the previous build")
+
+
+def record_build(name, binary_dir, before, ccache_log, report_filename, **info):
+    '''
+    Writes the report of the build, compared with the previous one at report_filename, and prints a summary
+    '''
+    report = build_report(binary_dir, before, ccache_log, **info)
+    print_summary(name, report, regressions(load_report(report_filename), report))
+    write_report(report, report_filename)
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument('binary_dir', help="Qt build dir, with a .ninja_log")
+    parser.add_argument('--previous', help="Report to compare with")
+    parser.add_argument('--output', help="Where to write the JSON report")
+    args = parser.parse_args(argv)
+
+    # Without a snapshot from before the build, this is the latest entry of every output
+    report = build_report(args.binary_dir, {}, os.path.join(args.binary_dir, CCACHE_LOG_FILENAME))
+    print_summary(os.path.basename(os.path.abspath(args.binary_dir)), report,
+                  regressions(load_report(args.previous), report) if args.previous else None)
+    if args.output:
+        write_report(report, args.output)
+    return 0
+
+
+if __name__ == "__main__":
+    import ci_release_tools
+    sys.exit(ci_release_tools.run('qt_build_telemetry', sys.argv[1:], main))
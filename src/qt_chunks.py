@@ -0,0 +1,388 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: 2026 Klarälvdalens Datakonsult AB, a KDAB Group company <info@kdab.com>
+# SPDX-License-Identifier: MIT
+
+# Content-defined chunk store for our Qt packages, shared by all packages of the release
+#
+# The asan, ubsan, tsan, debug and profile installs have almost the same include/, mkspecs/, cmake
+# files and docs. Files are split into chunks where their content says so (a gear rolling hash,
+# as in FastCDC), so an insertion only changes the chunks around it, and each chunk is stored once:
+# - qt-chunks-<hash>.pack: zlib compressed chunks, one pack per upload, holding the chunks no
+#   previous upload had. Packs are never replaced.
+# - <package>.chunks.json.gz: the package's files, with their chunks, and where each chunk is
+# - qt-chunks-index.json.gz: where every chunk of the release is, read by uploads only
+#
+# qt_download.py, given a cache dir, fetches the manifest, downloads only the chunks missing from
+# <cache>/chunks, with HTTP Range requests into the packs, and rebuilds the tree in parallel.
+#
+# Examples:
+# $ qt_chunks.py ~/installed/Qt/qt-v6.11.0-asan
+# $ qt_chunks.py ~/installed/Qt/qt-v6.11.0-asan --output-dir /tmp/chunks --no-upload
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import stat
+import sys
+import zlib
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from utils import observed, run_command
+from qt_download import release_url, stream_url, DownloadError, QT_RELEASE, QT_RELEASE_REPO
+
+CHUNKS_FORMAT = 1
+INDEX_ASSET = 'qt-chunks-index.json.gz'
+MANIFEST_SUFFIX = '.chunks.json.gz'
+
+MIN_CHUNK_SIZE = 16 * 1024
+MAX_CHUNK_SIZE = 256 * 1024
+# 16 bits -> 64 KiB chunks on average. The top bits of the gear hash depend on the last 64 bytes.
+CHUNK_MASK = ((1 << 16) - 1) << 48
+
+# Missing chunks closer than this in a pack are fetched with one Range request
+RANGE_GAP = 256 * 1024
+JOBS = 8
+
+# Must never change, or chunks of new uploads won't match the previous ones
+GEAR = [int.from_bytes(hashlib.sha256(bytes([i])).digest()[:8], 'little') for i in range(256)]
+
+
+def _cut(data, start, end):
+    '''
+    Returns where the chunk of data starting at start ends, end at the latest
+    '''
+    gear = GEAR
+    h = 0
+    for i in range(start + MIN_CHUNK_SIZE, end):
+        h = ((h << 1) + gear[data[i]]) & 0xFFFFFFFFFFFFFFFF
+        if not h & CHUNK_MASK:
+            return i + 1
+    return end
+
+
+def chunk_offsets(data):
+    '''
+    Returns the (start, end) of the chunks of data
+    '''
+    offsets = []
+    start = 0
+    while start < len(data):
+        cut = _cut(data, start, min(start + MAX_CHUNK_SIZE, len(data)))
+        offsets.append((start, cut))
+        start = cut
+    return offsets
+
+
+def _chunk_file(path):
+    '''
+    Returns the (digest, start, end) of the chunks of the file at path, the same as chunk_offsets()
+    of its content. Read as it's chunked, so big libraries aren't held in memory.
+    '''
+    chunks = []
+    offset = 0
+    buffer = bytearray()
+    eof = False
+    with open(path, 'rb') as f:
+        while buffer or not eof:
+            # A cut depends on the next MAX_CHUNK_SIZE bytes at most
+            if not eof and len(buffer) < MAX_CHUNK_SIZE:
+                block = f.read(MAX_CHUNK_SIZE)
+                eof = not block
+                buffer += block
+                continue
+            cut = _cut(buffer, 0, min(MAX_CHUNK_SIZE, len(buffer)))
+            chunks.append((hashlib.sha256(buffer[:cut]).hexdigest(), offset, offset + cut))
+            del buffer[:cut]
+            offset += cut
+    return chunks
+
+
+def scan_tree(root, jobs=None):
+    '''
+    Returns the entries of the manifest for the tree at root, and {digest: (path, start, end)}
+    to read each chunk from. Files are chunked in parallel processes, it's all CPU.
+    '''
+    entries = []
+    files = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for name in dirnames + sorted(filenames):
+            path = os.path.join(dirpath, name)
+            info = os.lstat(path)
+            entry = {'path': os.path.relpath(path, root), 'mode': stat.S_IMODE(info.st_mode)}
+            if stat.S_ISLNK(info.st_mode):
+                entry.update(type='symlink', target=os.readlink(path))
+            elif stat.S_ISDIR(info.st_mode):
+                entry['type'] = 'dir'
+            else:
+                entry.update(type='file', size=info.st_size)
+                files.append((entry, path))
+            entries.append(entry)
+
+    sources = {}
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        for (entry, path), chunks in zip(files, executor.map(_chunk_file, [path for _, path in files], chunksize=16)):
+            entry['chunks'] = [digest for digest, _, _ in chunks]
+            for digest, start, end in chunks:
+                sources.setdefault(digest, (path, start, end))
+    return entries, sources
+
+
+def _write_json_gz(data, filename):
+    with gzip.open(filename, 'wt', encoding='UTF-8') as f:
+        json.dump(data, f, separators=(',', ':'))
+
+
+def _read_json_gz(data):
+    return json.loads(gzip.decompress(data).decode('UTF-8'))
+
+
+def build_assets(root, package, index, output_dir, jobs=None):
+    '''
+    Chunks the tree at root and writes the package's assets to output_dir, against index
+    ({digest: [pack, offset, length, size]}, updated in place). Returns the filenames to upload.
+    '''
+    entries, sources = scan_tree(root, jobs)
+    new = [digest for digest in sources if digest not in index]
+
+    filenames = []
+    if new:
+        temp_pack = os.path.join(output_dir, 'qt-chunks.pack.tmp')
+        pack_hash = hashlib.sha256()
+        locations = {}
+        offset = 0
+        with open(temp_pack, 'wb') as pack:
+            for digest in new:
+                path, start, end = sources[digest]
+                with open(path, 'rb') as f:
+                    f.seek(start)
+                    compressed = zlib.compress(f.read(end - start), 6)
+                pack.write(compressed)
+                pack_hash.update(compressed)
+                locations[digest] = (offset, len(compressed), end - start)
+                offset += len(compressed)
+        pack_name = f"qt-chunks-{pack_hash.hexdigest()[:16]}.pack"
+        os.replace(temp_pack, os.path.join(output_dir, pack_name))
+        index.update({digest: [pack_name, *location] for digest, location in locations.items()})
+        filenames.append(os.path.join(output_dir, pack_name))
+
+    manifest = {'format': CHUNKS_FORMAT, 'package': package, 'files': entries,
+                'chunks': {digest: index[digest] for digest in sources}}
+    filenames.append(os.path.join(output_dir, f"{package}{MANIFEST_SUFFIX}"))
+    _write_json_gz(manifest, filenames[-1])
+    filenames.append(os.path.join(output_dir, INDEX_ASSET))
+    _write_json_gz({'format': CHUNKS_FORMAT, 'chunks': index}, filenames[-1])
+
+    stored = sum(index[digest][2] for digest in sources)
+    print(f"{package}: {len(sources)} chunks, {len(new)} new, "
+          f"{sum(index[digest][2] for digest in new) / 1024 ** 2:.1f} of {stored / 1024 ** 2:.1f} MiB to upload")
+    return filenames
+
+
+def read_index():
+    '''
+    Returns the published chunk index, {digest: [pack, offset, length, size]}. Raises DownloadError.
+    '''
+    data = fetch(release_url(INDEX_ASSET), missing_ok=True)
+    if data is None:
+        return {}
+    try:
+        return _read_json_gz(data)['chunks']
+    except (OSError, ValueError, KeyError) as e:
+        raise DownloadError(f"{INDEX_ASSET} isn't valid: {e}") from e
+
+
+def upload(filenames):
+    '''
+    Uploads the assets build_assets() wrote, the index last, once the packs it points to are there.
+    The index is merged with the published one holding its lock, see qt_index.upload_locked().
+    '''
+    import qt_index
+
+    manifest, index_filename = filenames[-2:]
+    if not run_command(f"gh release upload {QT_RELEASE} {' '.join(filenames[:-1])} --repo {QT_RELEASE_REPO} "
+                       "--clobber", fatal=False):
+        print("error: failed to upload the chunks")
+        return False
+
+    with open(manifest, 'rb') as f:
+        chunks = _read_json_gz(f.read())['chunks']
+
+    def update(index):
+        index.update(chunks)
+        _write_json_gz({'format': CHUNKS_FORMAT, 'chunks': index}, index_filename)
+
+    if qt_index.upload_locked(INDEX_ASSET, index_filename, read_index, update,
+                              lambda index: all(index.get(digest) == location for digest, location in chunks.items())):
+        return True
+    print(f"error: couldn't add the chunks of {os.path.basename(manifest)[:-len(MANIFEST_SUFFIX)]} to {INDEX_ASSET}")
+    return False
+
+
+def fetch(url, missing_ok=False):
+    '''
+    Returns the content of url, None if missing_ok and it doesn't exist. Raises DownloadError.
+    '''
+    content = []
+    try:
+        stream_url(url, content.append)
+    except DownloadError as e:
+        if missing_ok and getattr(e.__cause__, 'code', None) == 404:
+            return None
+        raise
+    return b''.join(content)
+
+
+def fetch_range(url, start, end):
+    '''
+    Returns bytes [start, end) of url
+    '''
+    import urllib.request
+
+    request = urllib.request.Request(url, headers={'Range': f"bytes={start}-{end - 1}"})
+    with observed('http', url) as span:
+        try:
+            with urllib.request.urlopen(request, timeout=60) as response:
+                span['status'] = response.status
+                data = response.read()
+        except OSError as e:
+            span['error'] = str(e)
+            raise DownloadError(f"{url}: {e}") from e
+        span['bytes'] = len(data)
+    if response.status != 206 or len(data) != end - start:
+        raise DownloadError(f"{url}: asked for {end - start} bytes at {start}, got {len(data)} ({response.status})")
+    return data
+
+
+def coalesce(locations, gap=RANGE_GAP):
+    '''
+    Groups [(digest, [pack, offset, length, size])] into [(pack, start, end, [(digest, offset, length)])],
+    one per Range request
+    '''
+    ranges = []
+    for digest, (pack, offset, length, _) in sorted(locations, key=lambda item: (item[1][0], item[1][1])):
+        if ranges and ranges[-1][0] == pack and offset - ranges[-1][2] <= gap:
+            ranges[-1][2] = max(ranges[-1][2], offset + length)
+            ranges[-1][3].append((digest, offset, length))
+        else:
+            ranges.append([pack, offset, offset + length, [(digest, offset, length)]])
+    return [tuple(r) for r in ranges]
+
+
+def chunk_path(store_dir, digest):
+    return os.path.join(store_dir, digest[:2], digest)
+
+
+def _store_range(base_url, store_dir, pack_range):
+    pack, start, end, chunks = pack_range
+    data = fetch_range(f"{base_url}/{pack}", start, end)
+    for digest, offset, length in chunks:
+        chunk = zlib.decompress(data[offset - start:offset - start + length])
+        if hashlib.sha256(chunk).hexdigest() != digest:
+            raise DownloadError(f"chunk {digest} of {pack} is corrupt")
+        path = chunk_path(store_dir, digest)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(f"{path}.tmp{os.getpid()}", 'wb') as f:
+            f.write(chunk)
+        os.replace(f"{path}.tmp{os.getpid()}", path)
+    return end - start
+
+
+def _restore_file(store_dir, root, entry):
+    path = os.path.join(root, entry['path'])
+    with open(path, 'wb') as f:
+        for digest in entry['chunks']:
+            with open(chunk_path(store_dir, digest), 'rb') as chunk:
+                f.write(chunk.read())
+    os.chmod(path, entry['mode'])
+
+
+def extract_chunked(url, dest, cache_dir, jobs=JOBS):
+    '''
+    Rebuilds the package at url in dest from its chunks, downloading those not in <cache_dir>/chunks.
+    Returns False if the package has no chunk manifest or anything fails.
+    '''
+    import shutil
+    import time
+    import qt_build
+    from qt_download import archive_suffix
+
+    base_url, filename = url.rsplit('/', 1)
+    package = filename[:-len(archive_suffix(filename))]
+    store_dir = os.path.join(cache_dir, 'chunks')
+    start_time = time.perf_counter()
+    try:
+        data = fetch(f"{base_url}/{package}{MANIFEST_SUFFIX}", missing_ok=True)
+        if data is None:
+            return False
+        manifest = _read_json_gz(data)
+        if manifest.get('format') != CHUNKS_FORMAT:
+            return False
+
+        missing = [(digest, location) for digest, location in manifest['chunks'].items()
+                   if not os.path.exists(chunk_path(store_dir, digest))]
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            downloaded = sum(executor.map(lambda r: _store_range(base_url, store_dir, r), coalesce(missing)))
+    except (DownloadError, OSError, ValueError, zlib.error) as e:
+        print(f"warning: can't get the chunks of {package}, downloading the full package: {e}")
+        return False
+
+    partial_dest = f"{dest}.partial"
+    shutil.rmtree(partial_dest, ignore_errors=True)
+    os.makedirs(partial_dest)
+    entries = manifest['files']
+    for entry in entries:
+        if entry['type'] == 'dir':
+            os.makedirs(os.path.join(partial_dest, entry['path']), exist_ok=True)
+    try:
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            list(executor.map(lambda entry: _restore_file(store_dir, partial_dest, entry),
+                              [entry for entry in entries if entry['type'] == 'file']))
+    except OSError as e:
+        print(f"warning: failed to rebuild {package} from its chunks: {e}")
+        shutil.rmtree(partial_dest, ignore_errors=True)
+        return False
+    for entry in entries:
+        if entry['type'] == 'symlink':
+            os.symlink(entry['target'], os.path.join(partial_dest, entry['path']))
+        elif entry['type'] == 'dir':
+            os.chmod(os.path.join(partial_dest, entry['path']), entry['mode'])
+    qt_build.swap_in(partial_dest, dest)
+
+    total = sum(location[2] for location in manifest['chunks'].values())
+    print(f"Rebuilt {package} in {dest} in {time.perf_counter() - start_time:.1f}s from "
+          f"{len(manifest['chunks'])} chunks, {len(missing)} downloaded: "
+          f"{downloaded / 1024 ** 2:.1f} of {total / 1024 ** 2:.1f} MiB")
+    return True
+
+
+def main(argv=None):
+    import tempfile
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('install_dir', help="Qt install to publish, its name is the package name")
+    parser.add_argument('--output-dir', help="Where to write the assets (default: a temporary dir)")
+    parser.add_argument('--no-upload', action='store_true', help="Only write the assets")
+    args = parser.parse_args(argv)
+
+    package = os.path.basename(os.path.abspath(args.install_dir))
+    with tempfile.TemporaryDirectory() as temp_dir:
+        output_dir = args.output_dir or temp_dir
+        os.makedirs(output_dir, exist_ok=True)
+        try:
+            index = read_index()
+        except DownloadError as e:
+            print(f"error: can't read the chunk index: {e}")
+            return 1
+
+        filenames = build_assets(args.install_dir, package, index, output_dir)
+        if args.no_upload:
+            return 0
+        return 0 if upload(filenames) else 1
+
+
+if __name__ == "__main__":
+    import ci_release_tools
+    sys.exit(ci_release_tools.run('qt_chunks', sys.argv[1:], main))
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: 2026 Klarälvdalens Datakonsult AB, a KDAB Group company <info@kdab.com>
+# SPDX-License-Identifier: MIT
+
+# Binary deltas between Qt packages, so CI downloads what changed instead of the whole package
+#
+# Consecutive Qt versions (beta2, beta3) and presets of the same version share most of their
+# headers, tools and cmake files. upload-qt.sh, given a base package, also publishes:
+# - <package>.from-<base>.zstpatch: zstd --patch-from of the package's tar against the base's tar
+# - <package>.delta.json: the base and its digest, the digests of the delta and of the resulting
+#   tar, and the sizes of the delta and of the full package
+#
+# qt_download.py uses the delta when the base package is in its cache, and downloads the full
+# package otherwise, or if anything goes wrong with the delta. The tar rebuilt from a delta is
+# cached by its digest, so the next delta can be applied to it: beta2 -> beta3 -> beta4. Packages
+# rebuilt from chunks (see qt_chunks.py) aren't cached as tars, a delta against one of them
+# means downloading the full package.
+#
+# The base's tar has to fit in zstd's window, 2 GiB. There's no delta for bigger ones.
+#
+# Examples:
+# $ qt_delta.py qt-v6.11.0-beta3-debug.tar.zst --base qt-v6.11.0-beta2-debug
+# $ qt_delta.py qt-v6.11.0-beta3-debug.tar.zst --base qt-v6.11.0-beta2-debug --base-tarball qt-v6.11.0-beta2-debug.tar.zst
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from release_plan import file_digests
+from utils import download_file_as_string, run_command
+from qt_download import (archive_suffix, cache_path, release_url, stream_url, DownloadError, TarExtraction,
+                         CHUNK_SIZE, PACKAGE_SUFFIX)
+
+DELTA_FORMAT = 1
+DELTA_SUFFIX = '.zstpatch'
+DELTA_LEVEL = 19
+
+# Qt packages are GBs, the whole base has to fit in zstd's window. Needed when decompressing too.
+ZSTD_WINDOW_LOG = 31
+ZSTD_LONG = f"--long={ZSTD_WINDOW_LOG}"
+
+
+def delta_filename(package, base):
+    return f"{package}.from-{base}{DELTA_SUFFIX}"
+
+
+def delta_json_url(url):
+    return f"{url[:-len(archive_suffix(url))]}.delta.json"
+
+
+def create_delta(tarball, base_tarball, base, output_dir=None):
+    '''
+    Writes the delta from base_tarball to tarball (both .tar.zst) and its .delta.json.
+    Returns the .delta.json filename, or None, also when the base doesn't fit in zstd's window.
+    '''
+    package = os.path.basename(tarball)[:-len(PACKAGE_SUFFIX)]
+    output_dir = output_dir or os.path.dirname(os.path.abspath(tarball))
+    delta = os.path.join(output_dir, delta_filename(package, base))
+
+    # --patch-from diffs uncompressed data, so the tars
+    with tempfile.TemporaryDirectory(dir=output_dir) as temp_dir:
+        base_tar = os.path.join(temp_dir, 'base.tar')
+        tar = os.path.join(temp_dir, 'package.tar')
+        if not run_command(f"zstd -d -q {ZSTD_LONG} {base_tarball} -o {base_tar}", fatal=False):
+            return None
+        # zstd would refuse to apply it, or need more memory than CI has
+        if os.path.getsize(base_tar) > 1 << ZSTD_WINDOW_LOG:
+            print(f"warning: the tar of {base} is {os.path.getsize(base_tar) / 1024 ** 3:.1f} GiB, more than "
+                  f"zstd's {(1 << ZSTD_WINDOW_LOG) / 1024 ** 3:.0f} GiB window, not making a delta")
+            return None
+        if not run_command(f"zstd -d -q {ZSTD_LONG} {tarball} -o {tar}", fatal=False) or \
+                not run_command(f"zstd -q -f -T0 -{DELTA_LEVEL} {ZSTD_LONG} --patch-from={base_tar} {tar} -o {delta}",
+                                fatal=False):
+            return None
+        base_tar_sha256 = file_digests(base_tar)['sha256']
+        tar_sha256 = file_digests(tar)['sha256']
+
+    meta = {
+        'format': DELTA_FORMAT,
+        'package': package,
+        'base': base,
+        'base_sha256': file_digests(base_tarball)['sha256'],
+        'base_tar_sha256': base_tar_sha256,
+        'delta': os.path.basename(delta),
+        'delta_sha256': file_digests(delta)['sha256'],
+        'delta_size': os.path.getsize(delta),
+        'full_size': os.path.getsize(tarball),
+        'tar_sha256': tar_sha256,
+    }
+    filename = os.path.join(output_dir, f"{package}.delta.json")
+    with open(filename, 'w', encoding='UTF-8') as f:
+        json.dump(meta, f, indent=2)
+        f.write('\n')
+    print(f"{meta['delta']}: {meta['delta_size'] / 1024 ** 2:.1f} MiB, "
+          f"the full package is {meta['full_size'] / 1024 ** 2:.1f} MiB")
+    return filename
+
+
+def published_delta(url):
+    '''
+    Returns the .delta.json published for the package at url, or None
+    '''
+    text = download_file_as_string(delta_json_url(url), fatal=False)
+    if not text:
+        return None
+    try:
+        meta = json.loads(text)
+    except ValueError:
+        return None
+    return meta if meta.get('format') == DELTA_FORMAT else None
+
+
+def download_delta(url, meta, cache_dir):
+    '''
+    Returns the delta's path in the cache, downloading it if needed, or None
+    '''
+    delta = cache_path(cache_dir, meta['delta_sha256'], DELTA_SUFFIX)
+    if os.path.exists(delta):
+        return delta
+
+    try:
+        with open(f"{delta}.partial", 'wb') as f:
+            stream_url(f"{url.rsplit('/', 1)[0]}/{meta['delta']}", f.write)
+    except (DownloadError, OSError) as e:
+        print(f"warning: can't download {meta['delta']}: {e}")
+        return None
+    if file_digests(f"{delta}.partial")['sha256'] != meta['delta_sha256']:
+        print(f"warning: {meta['delta']} doesn't have the published digest")
+        os.remove(f"{delta}.partial")
+        return None
+    os.replace(f"{delta}.partial", delta)
+    return delta
+
+
+def cached_base(meta, cache_dir):
+    '''
+    Returns the cached base of a delta: its package, or its tar if it was rebuilt from a delta itself
+    '''
+    base_tarball = cache_path(cache_dir, meta['base_sha256'], PACKAGE_SUFFIX)
+    if os.path.exists(base_tarball):
+        return base_tarball
+    # Older .delta.json don't have it
+    base_tar = cache_path(cache_dir, meta.get('base_tar_sha256', ''), '.tar')
+    return base_tar if meta.get('base_tar_sha256') and os.path.exists(base_tar) else None
+
+
+def extract_with_delta(url, meta, dest, cache_dir):
+    '''
+    Extracts the package at url to dest by applying its delta to the cached base package, and caches
+    the resulting tar. Returns False when that's not possible, then the full package has to be downloaded.
+    '''
+    base = cached_base(meta, cache_dir)
+    if not base:
+        print(f"{meta['base']} isn't cached, downloading the full {meta['package']}")
+        return False
+    if not shutil.which('zstd'):
+        print(f"zstd isn't installed, downloading the full {meta['package']}")
+        return False
+
+    delta = download_delta(url, meta, cache_dir)
+    if not delta:
+        return False
+
+    cached_tar = cache_path(cache_dir, meta['tar_sha256'], '.tar')
+    with tempfile.TemporaryDirectory(dir=cache_dir) as temp_dir:
+        base_tar = base
+        if base.endswith(PACKAGE_SUFFIX):
+            base_tar = os.path.join(temp_dir, 'base.tar')
+            if not run_command(f"zstd -d -q {ZSTD_LONG} {base} -o {base_tar}", fatal=False):
+                return False
+
+        extraction = TarExtraction(dest, [])
+        zstd = subprocess.Popen(['zstd', '-d', '-q', '-c', ZSTD_LONG, f"--patch-from={base_tar}", delta],
+                                stdout=subprocess.PIPE)
+        try:
+            with open(f"{cached_tar}.partial", 'wb') as cache_file:
+                while chunk := zstd.stdout.read(CHUNK_SIZE):
+                    extraction.write(chunk)
+                    cache_file.write(chunk)
+        except OSError as e:
+            print(f"warning: failed to extract {meta['delta']}: {e}")
+            zstd.kill()
+        if zstd.wait() != 0:
+            extraction.abort()
+            ok = False
+        else:
+            ok = extraction.finish(meta['tar_sha256'], f"{meta['delta']} applied to {meta['base']}")
+        if not ok:
+            if os.path.exists(f"{cached_tar}.partial"):
+                os.remove(f"{cached_tar}.partial")
+            return False
+        os.replace(f"{cached_tar}.partial", cached_tar)
+
+    saved = 100 * (1 - meta['delta_size'] / meta['full_size']) if meta['full_size'] else 0
+    print(f"Extracted {meta['package']} to {dest} from {meta['base']} and a "
+          f"{meta['delta_size'] / 1024 ** 2:.1f} MiB delta, instead of {meta['full_size'] / 1024 ** 2:.1f} MiB "
+          f"({saved:.0f}% less)")
+    return True
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument('tarball', help=f"The package to make a delta of, a {PACKAGE_SUFFIX}")
+    parser.add_argument('--base', required=True, help="Package the delta is against, for example qt-v6.11.0-beta2-debug")
+    parser.add_argument('--base-tarball', help="The base package, downloaded from the release if not given")
+    parser.add_argument('--output-dir', help="Default: next to tarball")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        base_tarball = args.base_tarball
+        if not base_tarball:
+            base_tarball = os.path.join(temp_dir, f"{args.base}{PACKAGE_SUFFIX}")
+            try:
+                with open(base_tarball, 'wb') as f:
+                    stream_url(release_url(f"{args.base}{PACKAGE_SUFFIX}"), f.write)
+            except DownloadError as e:
+                print(f"error: can't download the base package: {e}")
+                return 1
+        if not create_delta(args.tarball, base_tarball, args.base, args.output_dir):
+            print("error: failed to create the delta")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    import ci_release_tools
+    sys.exit(ci_release_tools.run('qt_delta', sys.argv[1:], main))
@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: 2026 Klarälvdalens Datakonsult AB, a KDAB Group company <info@kdab.com>
+# SPDX-License-Identifier: MIT
+
+# Downloads and extracts one of our Qt builds, as published by build_qt/upload-qt.sh
+#
+# The download is piped into tar as it arrives, so it's never stored twice and extraction runs
+# while downloading. Meanwhile it's hashed and checked against the .sha256 published next to the
+# package. A dropped connection is resumed with a Range request.
+#
+# With a cache dir (--cache-dir or CI_RELEASE_TOOLS_QT_CACHE), packages are also kept there by
+# digest, so self-hosted runners only download each package once. An interrupted download is
+# resumed from what's in the cache. Nothing is ever evicted, clean it up as disk space requires.
+#
+# The package is extracted next to its destination, and only moved there once verified.
+#
+# With a cache, only the chunks of the package the cache doesn't have are downloaded, see
+# qt_chunks.py. Or, for packages without chunks, a delta against a cached package, see qt_delta.py.
+#
+# The package can also be a query like "latest 6.11 tsan", resolved with the release's index, see
+# qt_index.py. The index also has the digest, then there's no .sha256 to download.
+#
+# Examples:
+# $ qt_download.py qt-v6.11.0-beta2-debug
+# $ qt_download.py "latest 6.11 tsan"
+# $ qt_download.py qt-v6.11.0-beta2-debug --dest /opt/qt --cache-dir /var/cache/qt-packages
+
+import argparse
+import hashlib
+import os
+import shutil
+import subprocess
+import sys
+import time
+from utils import download_file_as_string, http_error_info, observed, GITHUB_URL
+
+QT_RELEASE_REPO = 'KDABLabs/ci-release-tools'
+QT_RELEASE = 'qt-sanitizer-developer-builds'
+PACKAGE_SUFFIX = '.tar.zst'
+CACHE_DIR = os.getenv('CI_RELEASE_TOOLS_QT_CACHE')
+
+CHUNK_SIZE = 1024 * 1024
+RETRIES = 5
+RETRY_DELAY_SECONDS = 2
+
+# Archive suffix -> how tar decompresses it. tar can't guess it when reading a pipe.
+TAR_DECOMPRESS = {'.tar.zst': ['--zstd'], '.tar.gz': ['-z'], '.tar.xz': ['-J'], '.tar': []}
+
+
+class DownloadError(Exception):
+    pass
+
+
+def release_url(filename):
+    return f"{GITHUB_URL}/{QT_RELEASE_REPO}/releases/download/{QT_RELEASE}/{filename}"
+
+
+def archive_suffix(url):
+    for suffix in sorted(TAR_DECOMPRESS, key=len, reverse=True):
+        if url.endswith(suffix):
+            return suffix
+    raise DownloadError(f"{url} isn't a tarball")
+
+
+def published_sha256(url):
+    '''
+    Returns the digest published as <url>.sha256 (sha256sum's format), or None
+    '''
+    text = download_file_as_string(f"{url}.sha256", fatal=False)
+    return text.split()[0] if text and text.split() else None
+
+
+def stream_url(url, sink, offset=0, retries=RETRIES, chunk_size=CHUNK_SIZE):
+    '''
+    Passes the content of url from offset on to sink, chunk by chunk, resuming with a Range request
+    when the connection drops. Returns how many bytes were passed on, raises DownloadError.
+    '''
+    import http.client
+    import urllib.error
+    import urllib.request
+
+    received = 0
+    attempt = 0
+    with observed('http', url) as span:
+        while True:
+            position = offset + received
+            request = urllib.request.Request(url)
+            if position:
+                request.add_header('Range', f"bytes={position}-")
+            try:
+                with urllib.request.urlopen(request, timeout=60) as response:
+                    span['status'] = response.status
+                    # The server can ignore the Range, then skip what we already have
+                    skip = position if position and response.status != 206 else 0
+                    length = response.headers.get('Content-Length')
+                    read = 0
+                    while chunk := response.read(chunk_size):
+                        read += len(chunk)
+                        if skip:
+                            dropped = min(skip, len(chunk))
+                            chunk, skip = chunk[dropped:], skip - dropped
+                            if not chunk:
+                                continue
+                        try:
+                            sink(chunk)
+                        except OSError as e:
+                            raise DownloadError(f"{url}: can't write what was downloaded: {e}") from e
+                        received += len(chunk)
+                    # http.client ends the response without error when the connection drops
+                    if length and read < int(length):
+                        raise http.client.IncompleteRead(b'', int(length) - read)
+                span['bytes'] = received
+                return received
+            except (OSError, http.client.HTTPException) as e:
+                span['bytes'] = received
+                status = getattr(e, 'code', None)
+                span.update(http_error_info(e))
+                if status == 416 and position:
+                    # Nothing left after position, an interrupted run got everything
+                    return received
+                if isinstance(e, urllib.error.HTTPError) and status < 500 and status != 429:
+                    raise DownloadError(f"{url}: {e}") from e
+                attempt += 1
+                if attempt > retries:
+                    span['error'] = str(e)
+                    raise DownloadError(f"{url}: {e}, giving up after {retries} retries") from e
+                print(f"warning: {url} interrupted after {offset + received} bytes ({e}), resuming")
+                time.sleep(RETRY_DELAY_SECONDS * attempt)
+
+
+def cache_path(cache_dir, sha256, suffix):
+    return os.path.join(cache_dir, 'sha256', f"{sha256}{suffix}")
+
+
+class TarExtraction:
+    '''
+    Extracts the tarball written to it into <dest>.partial, which finish() moves to dest if all went well
+    '''
+
+    def __init__(self, dest, decompress_args):
+        self.dest = dest
+        self.partial_dest = f"{dest}.partial"
+        shutil.rmtree(self.partial_dest, ignore_errors=True)
+        os.makedirs(self.partial_dest)
+        self.digest = hashlib.sha256()
+        self._tar = subprocess.Popen(['tar', '-x'] + decompress_args + ['-f', '-', '-C', self.partial_dest],
+                                     stdin=subprocess.PIPE)
+
+    def write(self, chunk):
+        self.digest.update(chunk)
+        self._tar.stdin.write(chunk)
+
+    def abort(self):
+        self._tar.kill()
+        self._tar.wait()
+        shutil.rmtree(self.partial_dest, ignore_errors=True)
+
+    def finish(self, sha256, source):
+        '''
+        Returns True if tar succeeded and what was written has sha256 (unless None). Then dest is replaced.
+        '''
+        import qt_build
+
+        self._tar.stdin.close()
+        ok = self._tar.wait() == 0
+        if not ok:
+            print(f"error: failed to extract {source}")
+        elif sha256 and self.digest.hexdigest() != sha256:
+            print(f"error: {source} has sha256 {self.digest.hexdigest()}, expected {sha256}")
+            ok = False
+
+        if not ok:
+            shutil.rmtree(self.partial_dest, ignore_errors=True)
+            return False
+        qt_build.swap_in(self.partial_dest, self.dest)
+        return True
+
+
+def download_and_extract(url, dest, sha256=None, cache_dir=None):
+    '''
+    Extracts the tarball at url to dest while downloading it, or from the cache. Returns True on success.
+    Without sha256, uses the published one. Without any, nothing is verified nor cached.
+    '''
+    suffix = archive_suffix(url)
+    sha256 = sha256 or published_sha256(url)
+    if not sha256:
+        print(f"warning: no {url}.sha256, the download can't be verified")
+    cached = cache_path(cache_dir, sha256, suffix) if cache_dir and sha256 else None
+    if cached:
+        os.makedirs(os.path.dirname(cached), exist_ok=True)
+
+    extraction = TarExtraction(dest, TAR_DECOMPRESS[suffix])
+    cache_file = None
+
+    def replay(filename):
+        with open(filename, 'rb') as f:
+            while chunk := f.read(CHUNK_SIZE):
+                extraction.write(chunk)
+        return os.path.getsize(filename)
+
+    start = time.perf_counter()
+    downloaded = 0
+    try:
+        if cached and os.path.exists(cached):
+            replay(cached)
+            source = f"cache {cached}"
+        else:
+            offset = 0
+            if cached:
+                # What an interrupted run downloaded already
+                if os.path.exists(f"{cached}.partial"):
+                    offset = replay(f"{cached}.partial")
+                cache_file = open(f"{cached}.partial", 'ab')
+
+            def sink(chunk):
+                extraction.write(chunk)
+                if cache_file:
+                    cache_file.write(chunk)
+
+            downloaded = stream_url(url, sink, offset)
+            source = url
+    except (DownloadError, OSError) as e:
+        print(f"error: {e}")
+        extraction.abort()
+        return False
+    finally:
+        if cache_file:
+            cache_file.close()
+
+    if not extraction.finish(sha256, source):
+        for filename in (cached, f"{cached}.partial") if cached else ():
+            if os.path.exists(filename):
+                os.remove(filename)
+        return False
+    if cache_file:
+        os.replace(f"{cached}.partial", cached)
+
+    seconds = time.perf_counter() - start
+    mib = downloaded / 1024 ** 2
+    print(f"Extracted {source} to {dest} in {seconds:.1f}s"
+          + (f", downloaded {mib:.1f} MiB at {mib / seconds:.1f} MiB/s" if downloaded else ""))
+    return True
+
+
+def download_package(url, dest, sha256=None, cache_dir=None, delta=True, published_sha256=None):
+    '''
+    Extracts the package at url to dest, from the chunks missing in the cache (see qt_chunks.py) or
+    a delta against a cached package (see qt_delta.py) when published, otherwise in full.
+    published_sha256, from the index, spares downloading the .sha256. Returns True on success.
+    '''
+    import qt_chunks
+    import qt_delta
+
+    # A digest given by the caller is for the full package, chunks and deltas are checked with theirs
+    if delta and cache_dir and not sha256:
+        if qt_chunks.extract_chunked(url, dest, cache_dir):
+            return True
+        meta = qt_delta.published_delta(url)
+        if meta and qt_delta.extract_with_delta(url, meta, dest, cache_dir):
+            return True
+    return download_and_extract(url, dest, sha256 or published_sha256, cache_dir)
+
+
+def resolve_package(query):
+    '''
+    Returns the index entry of the package query means (see qt_index.py), or None
+    '''
+    import qt_index
+
+    try:
+        return qt_index.resolve(qt_index.read_index(), query)
+    except DownloadError as e:
+        print(f"warning: can't read {qt_index.INDEX_ASSET}: {e}")
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument('package', help='Package name, for example qt-v6.11.0-beta2-debug, or a query like '
+                        '"latest 6.11 tsan"')
+    parser.add_argument('--dest', help="Where to extract it (default: ~/Qt/<package>)")
+    parser.add_argument('--cache-dir', default=CACHE_DIR,
+                        help="Keep packages there by digest (default: $CI_RELEASE_TOOLS_QT_CACHE, or none)")
+    parser.add_argument('--url', help=f"Download from there instead of the {QT_RELEASE} release")
+    parser.add_argument('--sha256', help="Expected digest, instead of the published one")
+    parser.add_argument('--no-delta', action='store_true', help="Always download the full package, "
+                        "not chunks nor deltas")
+    args = parser.parse_args(argv)
+
+    package = args.package
+    url = args.url
+    published = None
+    if not url:
+        entry = resolve_package(package)
+        if entry:
+            package, published = entry['package'], entry['sha256']
+            url = release_url(entry['asset'])
+            print(f"{args.package}: {package}, built at {entry['built_at']}, {entry['size'] / 1024 ** 2:.1f} MiB")
+        elif ' ' in package or package.startswith('latest'):
+            print(f"error: no package matches '{package}'")
+            return 1
+        else:
+            url = release_url(f"{package}{PACKAGE_SUFFIX}")
+
+    dest = args.dest or os.path.join(os.path.expanduser('~/Qt'), package)
+    try:
+        return 0 if download_package(url, os.path.abspath(dest), args.sha256, args.cache_dir,
+                                     not args.no_delta, published) else 1
+    except DownloadError as e:
+        print(f"error: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    import ci_release_tools
+    sys.exit(ci_release_tools.run('qt_download', sys.argv[1:], main))
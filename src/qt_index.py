@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: 2026 Klarälvdalens Datakonsult AB, a KDAB Group company <info@kdab.com>
+# SPDX-License-Identifier: MIT
+
+# Index of the Qt packages in the qt-sanitizer-developer-builds release
+#
+# upload-qt.sh adds each package it uploads to qt-index.json, another asset of the release, with
+# its Qt version, preset, compressor, size, SHA-256, and the build date and patch set (see qt_patches.py)
+# from the build report qt_build.py wrote next to the install.
+#
+# qt_download.py reads it to find which package a query like "latest 6.11 tsan" means, with one
+# small request instead of listing the release's assets, and to verify the download against it.
+#
+# Examples:
+# $ qt_index.py qt-v6.11.0-beta2-tsan.tar.zst --install-dir ~/installed/Qt/qt-v6.11.0-beta2-tsan
+# $ qt_index.py --resolve "latest 6.11 tsan"
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from datetime import datetime, timezone
+from utils import run_command
+from qt_download import archive_suffix, release_url, stream_url, DownloadError, QT_RELEASE, QT_RELEASE_REPO
+
+INDEX_FORMAT = 1
+INDEX_ASSET = 'qt-index.json'
+
+# The index is read, changed and uploaded again, so uploads take turns: each holds <asset>.lock,
+# another asset of the release, meanwhile. gh doesn't upload an asset which exists already without
+# --clobber, so only one gets it. A lock older than LOCK_STALE_SECONDS is from an upload which died
+# and is deleted. That leaves a window: an upload holding it for longer, or two uploads deleting
+# the same stale lock, can still run at the same time. The upload is read back to report that.
+LOCK_SUFFIX = '.lock'
+LOCK_WAIT_SECONDS = 15 * 60
+LOCK_POLL_SECONDS = 10
+LOCK_STALE_SECONDS = 60 * 60
+
+COMPRESSORS = {'.tar.zst': 'zstd', '.tar.gz': 'gzip', '.tar.xz': 'xz', '.tar': 'none'}
+
+QT_VERSION = re.compile(r'^v?(\d+(?:\.\d+)*)(?:-(alpha|beta|rc)(\d*))?$')
+PRERELEASES = ('alpha', 'beta', 'rc')
+
+
+def parse_package(package, presets=None):
+    '''
+    Returns (Qt version, preset) of a package name like qt-v6.11.0-beta2-asan_ubsan, see qt_build.install_dir().
+    Presets can have dashes (qtbase-only), so the name is matched against the known ones.
+    '''
+    import qt_build
+
+    if presets is None:
+        presets = qt_build.buildable_presets(qt_build.load_presets())
+    for preset in sorted(presets, key=len, reverse=True):
+        if package.startswith('qt-') and package.endswith(f"-{preset}") and len(package) > len(f"qt--{preset}"):
+            return package[len('qt-'):-len(f"-{preset}")].removeprefix('v'), preset
+    raise ValueError(f"{package} isn't named qt-<qt-tag>-<preset>, with one of the presets {', '.join(presets)}")
+
+
+def version_key(version):
+    '''
+    Sorts Qt versions, 6.11.0-beta2 before 6.11.0-rc before 6.11.0
+    '''
+    match = QT_VERSION.match(version)
+    if not match:
+        return ((), 0, 0)
+    numbers = tuple(int(part) for part in match.group(1).split('.'))
+    if not match.group(2):
+        return (numbers, len(PRERELEASES), 0)
+    return (numbers, PRERELEASES.index(match.group(2)), int(match.group(3) or 0))
+
+
+def package_entry(tarball, install_dir=None):
+    '''
+    The index entry of tarball. The build date and patch set come from the install's build report,
+    written by qt_build.py: the uploader's checkout can have other patches than the build had.
+    '''
+    import qt_build_telemetry
+    from release_plan import file_digests
+
+    suffix = archive_suffix(tarball)
+    package = os.path.basename(tarball)[:-len(suffix)]
+    qt_version, preset = parse_package(package)
+    report = qt_build_telemetry.load_report(f"{install_dir.rstrip('/')}.build-report.json") \
+        if install_dir else None
+    built_at = report['finished_at'] if report else \
+        datetime.fromtimestamp(os.path.getmtime(tarball), timezone.utc).isoformat(timespec='seconds')
+    patches = report.get('patches') if report else None
+    if not patches:
+        print(f"warning: no build report with the patch set next to {install_dir or 'the install'}, "
+              "it's unknown in the index")
+    return {
+        'package': package,
+        'asset': os.path.basename(tarball),
+        'qt_version': qt_version,
+        'preset': preset,
+        'compressor': COMPRESSORS[suffix],
+        'size': os.path.getsize(tarball),
+        'sha256': file_digests(tarball)['sha256'],
+        'built_at': built_at,
+        'patches': patches,
+    }
+
+
+def add_entry(index, entry):
+    '''
+    Adds entry to index, replacing the package's previous entry
+    '''
+    previous = index['packages'].get(entry['package'])
+    if previous and previous['sha256'] != entry['sha256']:
+        print(f"Replacing {entry['package']} built at {previous['built_at']}, sha256 {previous['sha256']}")
+    index['packages'][entry['package']] = entry
+    index['packages'] = dict(sorted(index['packages'].items()))
+    return index
+
+
+def read_index(url=None):
+    '''
+    Returns the published index, an empty one if there's none yet. Raises DownloadError.
+    '''
+    content = []
+    try:
+        stream_url(url or release_url(INDEX_ASSET), content.append)
+    except DownloadError as e:
+        if getattr(e.__cause__, 'code', None) == 404:
+            return {'format': INDEX_FORMAT, 'packages': {}}
+        raise
+    try:
+        index = json.loads(b''.join(content))
+    except ValueError as e:
+        raise DownloadError(f"{INDEX_ASSET} isn't valid JSON: {e}") from e
+    if index.get('format') != INDEX_FORMAT:
+        raise DownloadError(f"{INDEX_ASSET} has format {index.get('format')}, expected {INDEX_FORMAT}")
+    return index
+
+
+def resolve(index, query):
+    '''
+    Returns the entry query means: a package name, or "[latest] [<Qt version>] [<preset>]",
+    where 6.11 matches 6.11.0-beta2 and 6.11.1 but not 6.1. None if nothing matches.
+    '''
+    packages = index['packages']
+    if query in packages:
+        return packages[query]
+
+    version = preset = None
+    for word in query.split():
+        if word == 'latest':
+            continue
+        if QT_VERSION.match(word.split('-')[0]):
+            version = word.removeprefix('v')
+        else:
+            preset = word
+
+    def matches(entry):
+        if preset and entry['preset'] != preset:
+            return False
+        return not version or entry['qt_version'] == version or \
+            entry['qt_version'].startswith((f"{version}.", f"{version}-"))
+
+    candidates = [entry for entry in packages.values() if matches(entry)]
+    if not candidates:
+        return None
+    return max(candidates, key=lambda entry: (version_key(entry['qt_version']), entry['built_at']))
+
+
+def read_lock(asset):
+    '''
+    Returns the content of asset's lock, None if nobody holds it. Raises DownloadError.
+    '''
+    content = []
+    try:
+        stream_url(release_url(f"{asset}{LOCK_SUFFIX}"), content.append)
+    except DownloadError as e:
+        if getattr(e.__cause__, 'code', None) == 404:
+            return None
+        raise
+    try:
+        return json.loads(b''.join(content))
+    except ValueError:
+        return {}
+
+
+def lock_age(lock):
+    try:
+        return time.time() - datetime.fromisoformat(lock['acquired_at']).timestamp()
+    except (KeyError, TypeError, ValueError):
+        return 0
+
+
+def acquire_lock(asset, temp_dir, wait=LOCK_WAIT_SECONDS):
+    '''
+    Uploads asset's lock, once whoever holds it is done, within wait seconds. Returns True on success.
+    '''
+    import socket
+
+    filename = os.path.join(temp_dir, f"{asset}{LOCK_SUFFIX}")
+    with open(filename, 'w', encoding='UTF-8') as f:
+        json.dump({'holder': f"{socket.gethostname()}:{os.getpid()}",
+                   'acquired_at': datetime.now(timezone.utc).isoformat(timespec='seconds')}, f)
+    deadline = time.time() + wait
+    while True:
+        if run_command(f"gh release upload {QT_RELEASE} {filename} --repo {QT_RELEASE_REPO}", fatal=False):
+            return True
+        try:
+            lock = read_lock(asset)
+        except DownloadError as e:
+            print(f"error: can't read the lock of {asset}: {e}")
+            return False
+        if lock is not None and lock_age(lock) > LOCK_STALE_SECONDS:
+            print(f"warning: breaking the lock of {asset}, held by {lock.get('holder')} since {lock['acquired_at']}")
+            release_lock(asset)
+            continue
+        if time.time() > deadline:
+            print(f"error: {asset} is still locked by {(lock or {}).get('holder')} after {wait}s")
+            return False
+        print(f"Waiting for {(lock or {}).get('holder', 'another upload')} to finish updating {asset}")
+        time.sleep(LOCK_POLL_SECONDS)
+
+
+def release_lock(asset):
+    return run_command(f"gh release delete-asset {QT_RELEASE} {asset}{LOCK_SUFFIX} --repo {QT_RELEASE_REPO} --yes",
+                       fatal=False)
+
+
+def upload_locked(asset, filename, read, update, is_published, upload=True):
+    '''
+    Writes filename with update(read()) and uploads it as asset, holding asset's lock. Then checks
+    that read() gives an asset is_published() accepts. Returns True on success.
+    '''
+    import tempfile
+
+    if not upload:
+        try:
+            update(read())
+        except DownloadError as e:
+            print(f"error: can't read {asset}: {e}")
+            return False
+        return True
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        if not acquire_lock(asset, temp_dir):
+            return False
+        try:
+            update(read())
+            if not run_command(f"gh release upload {QT_RELEASE} {filename} --repo {QT_RELEASE_REPO} --clobber",
+                               fatal=False):
+                print(f"error: failed to upload {asset}")
+                return False
+            if not is_published(read()):
+                print(f"error: {asset} was replaced meanwhile, by an upload which didn't wait for the lock")
+                return False
+            return True
+        except DownloadError as e:
+            print(f"error: can't read {asset}: {e}")
+            return False
+        finally:
+            if not release_lock(asset):
+                print(f"warning: failed to delete the lock of {asset}, it's broken in {LOCK_STALE_SECONDS}s")
+
+
+def publish(tarball, install_dir=None, output_dir=None, upload=True):
+    '''
+    Adds tarball to the published index. Returns True on success.
+    '''
+    import tempfile
+
+    entry = package_entry(tarball, install_dir)
+    print(f"{entry['package']}: Qt {entry['qt_version']}, {entry['preset']}, "
+          f"{entry['size'] / 1024 ** 2:.1f} MiB, sha256 {entry['sha256']}")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        filename = os.path.join(output_dir or temp_dir, INDEX_ASSET)
+
+        def update(index):
+            with open(filename, 'w', encoding='UTF-8') as f:
+                json.dump(add_entry(index, entry), f, indent=2)
+                f.write('\n')
+
+        if upload_locked(INDEX_ASSET, filename, read_index, update,
+                         lambda index: index['packages'].get(entry['package']) == entry, upload):
+            return True
+
+    print(f"error: couldn't add {entry['package']} to {INDEX_ASSET}")
+    return False
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument('tarball', nargs='?', help="Package to add to the index")
+    parser.add_argument('--install-dir',
+                        help="The package's Qt install, for the date and patch set in its build report")
+    parser.add_argument('--output-dir', help="Also keep the index there")
+    parser.add_argument('--no-upload', action='store_true', help="Only write the index, to --output-dir")
+    parser.add_argument('--resolve', metavar='QUERY', help='Print the package a query like "latest 6.11 tsan" means')
+    args = parser.parse_args(argv)
+
+    if args.resolve:
+        try:
+            entry = resolve(read_index(), args.resolve)
+        except DownloadError as e:
+            print(f"error: {e}")
+            return 1
+        if not entry:
+            print(f"error: no package matches '{args.resolve}'")
+            return 1
+        print(json.dumps(entry, indent=2))
+        return 0
+
+    if not args.tarball:
+        parser.error("a tarball or --resolve is required")
+    return 0 if publish(args.tarball, args.install_dir, args.output_dir, not args.no_upload) else 1
+
+
+if __name__ == "__main__":
+    import ci_release_tools
+    sys.exit(ci_release_tools.run('qt_index', sys.argv[1:], main))
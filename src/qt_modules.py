@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: 2026 Klarälvdalens Datakonsult AB, a KDAB Group company <info@kdab.com>
+# SPDX-License-Identifier: MIT
+
+# Which Qt repos our projects need, so Qt builds only fetch and build those
+#
+# Scans the CMake code of the projects of releasing.toml for find_package(Qt6 COMPONENTS ...),
+# find_package(Qt${QT_VERSION_MAJOR} ...) and find_package(Qt6Widgets) style calls, maps the
+# components to the Qt repos providing them, and adds what those repos depend on, following the
+# 'depends' of qt5's .gitmodules. Then, for each preset of build_qt/CMakePresets.json, prints the
+# QT_BUILD_SUBMODULES it needs and the pathspec to initialize them with.
+#
+# Projects are read from a local mirror (see mirror_repos.py) when given, otherwise shallow cloned.
+#
+# Examples:
+# $ qt_modules.py --mirror ~/kdab-repos --qt-src ~/sources/qt6_ci
+# $ qt_modules.py --qt-tag v6.11.0 --json
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+from utils import download_file_as_string, get_projects, observed, run_command_silent, GITHUB_GIT_URL, GITHUB_RAW_URL
+
+# Qt component -> the Qt repo providing it
+COMPONENT_REPOS = {
+    **dict.fromkeys(['Core', 'Gui', 'Widgets', 'Network', 'Sql', 'Test', 'Concurrent', 'DBus', 'Xml',
+                     'OpenGL', 'OpenGLWidgets', 'PrintSupport', 'EntryPointPrivate', 'CorePrivate',
+                     'GuiPrivate', 'WidgetsPrivate', 'Platform'], 'qtbase'),
+    **dict.fromkeys(['Qml', 'QmlModels', 'QmlWorkerScript', 'Quick', 'QuickControls2', 'QuickTemplates2',
+                     'QuickWidgets', 'QuickTest', 'QuickLayouts', 'QuickDialogs2', 'QuickShapes',
+                     'QmlPrivate', 'QuickPrivate', 'QmlIntegration', 'LabsQmlModels'], 'qtdeclarative'),
+    **dict.fromkeys(['Svg', 'SvgWidgets'], 'qtsvg'),
+    'Core5Compat': 'qt5compat',
+    **dict.fromkeys(['UiTools', 'UiPlugin', 'Designer', 'Help', 'LinguistTools', 'Tools'], 'qttools'),
+    **dict.fromkeys(['Scxml', 'StateMachine', 'ScxmlQml', 'StateMachineQml'], 'qtscxml'),
+    'RemoteObjects': 'qtremoteobjects',
+    'ShaderTools': 'qtshadertools',
+    **dict.fromkeys(['WaylandClient', 'WaylandCompositor'], 'qtwayland'),
+    **dict.fromkeys(['WebEngineCore', 'WebEngineWidgets', 'WebEngineQuick', 'Pdf', 'PdfWidgets'], 'qtwebengine'),
+    'WebSockets': 'qtwebsockets',
+    'WebChannel': 'qtwebchannel',
+    'WebView': 'qtwebview',
+    **dict.fromkeys(['Multimedia', 'MultimediaWidgets', 'SpatialAudio'], 'qtmultimedia'),
+    'Charts': 'qtcharts',
+    'Graphs': 'qtgraphs',
+    'DataVisualization': 'qtdatavis3d',
+    'Positioning': 'qtpositioning',
+    'Location': 'qtlocation',
+    'SerialPort': 'qtserialport',
+    'SerialBus': 'qtserialbus',
+    'NetworkAuth': 'qtnetworkauth',
+    'TextToSpeech': 'qtspeech',
+    'Sensors': 'qtsensors',
+    **dict.fromkeys(['Bluetooth', 'Nfc'], 'qtconnectivity'),
+    'Mqtt': 'qtmqtt',
+    **dict.fromkeys(['Protobuf', 'Grpc'], 'qtgrpc'),
+    'HttpServer': 'qthttpserver',
+    'LanguageServer': 'qtlanguageserver',
+    'Quick3D': 'qtquick3d',
+    'VirtualKeyboard': 'qtvirtualkeyboard',
+    'AxContainer': 'qtactiveqt',
+    'AxServer': 'qtactiveqt',
+}
+
+CMAKE_FILE = re.compile(r'(^|/)CMakeLists\.txt$|\.cmake$')
+FIND_PACKAGE = re.compile(r'\bfind_package\s*\(([^)]*)\)', re.IGNORECASE)
+SET = re.compile(r'\bset\s*\(\s*(\w+)\s+([^)]*)\)', re.IGNORECASE)
+QT_PACKAGE = re.compile(r'^(Qt6|QT|Qt\$\{\w+\})$')
+QT_COMPONENT_PACKAGE = re.compile(r'^Qt(?:6|\$\{\w+\})([A-Z]\w*)$')
+VARIABLE = re.compile(r'^\$\{(\w+)\}$')
+COMPONENT = re.compile(r'^[A-Z][A-Za-z0-9]*$')
+FIND_PACKAGE_KEYWORDS = {'COMPONENTS', 'OPTIONAL_COMPONENTS', 'REQUIRED', 'CONFIG', 'NO_MODULE', 'QUIET',
+                         'EXACT', 'MODULE', 'GLOBAL', 'NAMES', 'CONFIGS', 'HINTS', 'PATHS', 'PATH_SUFFIXES'}
+
+
+def _git(repo_dir, *args, stdin=None):
+    command = ['git', '-C', repo_dir] + list(args)
+    with observed('command', ' '.join(command)) as span:
+        result = subprocess.run(command, input=stdin, capture_output=True, check=False)
+        span['exit_code'] = result.returncode
+    return result.stdout if result.returncode == 0 else None
+
+
+def cmake_files(repo_dir):
+    '''
+    Returns {path: content} of the CMake files at HEAD of a clone or bare mirror
+    '''
+    listing = _git(repo_dir, 'ls-tree', '-r', '-z', '--name-only', 'HEAD')
+    if listing is None:
+        return {}
+    paths = [path for path in listing.decode().split('\0') if CMAKE_FILE.search(path)]
+    if not paths:
+        return {}
+
+    output = _git(repo_dir, 'cat-file', '--batch', stdin=''.join(f"HEAD:{path}\n" for path in paths).encode())
+    files = {}
+    offset = 0
+    for path in paths:
+        # '<sha1> blob <size>\n<content>\n' per path
+        header_end = output.index(b'\n', offset)
+        header = output[offset:header_end].split()
+        if header[-1] == b'missing':
+            offset = header_end + 1
+            continue
+        size = int(header[-1])
+        files[path] = output[header_end + 1:header_end + 1 + size].decode('utf-8', errors='replace')
+        offset = header_end + 1 + size + 1
+    return files
+
+
+def _strip_comments(cmake_code):
+    return re.sub(r'#[^\n]*', '', cmake_code)
+
+
+def qt_components(files):
+    '''
+    Returns the Qt components the CMake code of files ({path: content}) looks for.
+    ${VAR} arguments are expanded with what set(VAR ...) sets anywhere in the files.
+    '''
+    codes = [_strip_comments(content) for content in files.values()]
+    variables = {}
+    for code in codes:
+        for name, values in SET.findall(code):
+            variables.setdefault(name, set()).update(values.split())
+
+    def expanded(args, seen=frozenset()):
+        for arg in args:
+            match = VARIABLE.match(arg)
+            if match and match.group(1) not in seen:
+                yield from expanded(sorted(variables.get(match.group(1), ())), seen | {match.group(1)})
+            elif not match:
+                yield arg
+
+    components = set()
+    for code in codes:
+        for call in FIND_PACKAGE.findall(code):
+            args = call.split()
+            if not args:
+                continue
+            match = QT_COMPONENT_PACKAGE.match(args[0])
+            if match:
+                components.add(match.group(1))
+            elif QT_PACKAGE.match(args[0]):
+                components.update(arg for arg in expanded(args[1:])
+                                  if COMPONENT.match(arg) and arg not in FIND_PACKAGE_KEYWORDS)
+    return components
+
+
+def parse_gitmodules(text):
+    '''
+    Returns {submodule: {'depends': [...], 'recommends': [...]}} from qt5's .gitmodules, in file order
+    '''
+    repos = {}
+    current = None
+    for line in text.splitlines():
+        line = line.strip()
+        match = re.match(r'^\[submodule "([^"]+)"\]$', line)
+        if match:
+            current = repos.setdefault(match.group(1), {'depends': [], 'recommends': []})
+        elif current is not None and '=' in line:
+            key, value = (part.strip() for part in line.split('=', 1))
+            if key in current:
+                current[key] = value.split()
+    return repos
+
+
+def load_qt_repos(qt_src=None, qt_tag='dev'):
+    if qt_src:
+        with open(os.path.join(qt_src, '.gitmodules'), 'r', encoding='UTF-8') as f:
+            return parse_gitmodules(f.read())
+    return parse_gitmodules(download_file_as_string(f"{GITHUB_RAW_URL}/qt/qt5/{qt_tag}/.gitmodules"))
+
+
+def with_dependencies(repos, qt_repos, recommends=False):
+    '''
+    repos and everything they depend on, in the order of qt5's .gitmodules
+    '''
+    needed = set()
+    pending = list(repos)
+    while pending:
+        repo = pending.pop()
+        if repo in needed:
+            continue
+        needed.add(repo)
+        info = qt_repos.get(repo, {})
+        pending += info.get('depends', []) + (info.get('recommends', []) if recommends else [])
+    order = list(qt_repos)
+    return sorted(needed, key=lambda repo: order.index(repo) if repo in order else len(order))
+
+
+def mirror_path(mirror_dir, proj_name):
+    for candidate in (proj_name, f"{proj_name}.git", f"KDAB/{proj_name}", f"KDAB/{proj_name}.git"):
+        path = os.path.join(mirror_dir, candidate)
+        if os.path.isdir(path):
+            return path
+    return None
+
+
+def scan_projects(proj_names, mirror_dir=None):
+    '''
+    Returns {project: set of Qt components}, reading the projects from mirror_dir or shallow clones
+    '''
+    import tempfile
+    from pipeline import Step, resource, run_pipeline
+
+    components = {}
+
+    def scan(proj_name):
+        def func():
+            if mirror_dir:
+                repo_dir = mirror_path(mirror_dir, proj_name)
+                if not repo_dir:
+                    print(f"error: {proj_name} isn't in {mirror_dir}")
+                    return False
+                components[proj_name] = qt_components(cmake_files(repo_dir))
+                return True
+
+            with tempfile.TemporaryDirectory() as temp_dir:
+                with resource('network'):
+                    if not run_command_silent(f"git clone -q --depth 1 --no-checkout "
+                                              f"{GITHUB_GIT_URL}/KDAB/{proj_name} {temp_dir}"):
+                        print(f"error: failed to clone {proj_name}")
+                        return False
+                components[proj_name] = qt_components(cmake_files(temp_dir))
+            return True
+        return func
+
+    ok = run_pipeline([Step(proj_name, scan(proj_name)) for proj_name in proj_names],
+                      title="Scanning projects", name='qt_modules')
+    return components if ok else None
+
+
+def minimal_submodules(components, qt_repos, presets, recommends=False):
+    '''
+    Returns (needed repos, {repo: [projects]}, unknown components, {preset: submodules}).
+    A preset never gets repos it doesn't build today, qtbase-only stays qtbase only.
+    '''
+    consumers = {}
+    unknown = set()
+    for proj_name, proj_components in sorted(components.items()):
+        for component in proj_components:
+            repo = COMPONENT_REPOS.get(component)
+            if repo and proj_name not in consumers.get(repo, []):
+                consumers.setdefault(repo, []).append(proj_name)
+            elif not repo:
+                unknown.add(component)
+
+    needed = with_dependencies(consumers, qt_repos, recommends)
+    per_preset = {}
+    for name, preset in presets.items():
+        current = preset['cacheVariables'].get('QT_BUILD_SUBMODULES')
+        if current:
+            built = set(with_dependencies(current.split(';'), qt_repos, recommends))
+            per_preset[name] = [repo for repo in needed if repo in built]
+        else:
+            per_preset[name] = needed
+    return needed, consumers, sorted(unknown), per_preset
+
+
+def main(argv=None):
+    import qt_build
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--mirror', help="Directory with the projects' repos, cloned or mirrored")
+    parser.add_argument('--qt-src', help="Qt checkout to read the dependencies between Qt repos from")
+    parser.add_argument('--qt-tag', default='dev', help="Otherwise, qt5 ref to download .gitmodules of "
+                        "(default: %(default)s)")
+    parser.add_argument('--recommends', action='store_true', help="Also follow 'recommends' of .gitmodules")
+    parser.add_argument('--project', action='append', help="Project to scan (default: all of releasing.toml)")
+    parser.add_argument('--json', action='store_true', help="Print JSON instead of text")
+    args = parser.parse_args(argv)
+
+    components = scan_projects(args.project or list(get_projects()), args.mirror)
+    if components is None:
+        return 1
+    qt_repos = load_qt_repos(args.qt_src, args.qt_tag)
+    all_presets = qt_build.load_presets()
+    presets = {name: all_presets[name] for name in qt_build.buildable_presets(all_presets)}
+    needed, consumers, unknown, per_preset = minimal_submodules(components, qt_repos, presets, args.recommends)
+    missing = [repo for repo in needed if not any(repo in submodules for submodules in per_preset.values())]
+
+    if args.json:
+        print(json.dumps({'submodules': needed, 'consumers': consumers, 'unknown_components': unknown,
+                          'not_built': missing, 'presets': {name: {
+                              'QT_BUILD_SUBMODULES': ';'.join(submodules),
+                              'pathspec': submodules} for name, submodules in per_preset.items()}}, indent=2))
+        return 0
+
+    for repo in needed:
+        print(f"{repo}: {', '.join(consumers.get(repo, [])) or 'dependency'}")
+    if unknown:
+        print(f"warning: unknown Qt components, not mapped to a Qt repo: {', '.join(unknown)}")
+    if missing:
+        print(f"warning: needed, but no preset builds them: {', '.join(missing)}")
+    print()
+    for name, submodules in per_preset.items():
+        current = presets[name]['cacheVariables'].get('QT_BUILD_SUBMODULES', '')
+        dropped = [repo for repo in current.split(';') if repo and repo not in submodules]
+        print(f"{name}: -DQT_BUILD_SUBMODULES=\"{';'.join(submodules)}\""
+              + (f" (drops {', '.join(dropped)})" if dropped else ""))
+        print(f"  git submodule update --init --recursive -- {' '.join(submodules)}")
+    return 0
+
+
+if __name__ == "__main__":
+    import ci_release_tools
+    sys.exit(ci_release_tools.run('qt_modules', sys.argv[1:], main))
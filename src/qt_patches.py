@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: 2026 Klarälvdalens Datakonsult AB, a KDAB Group company <info@kdab.com>
+# SPDX-License-Identifier: MIT
+
+# Applies our patch series to a Qt source checkout, caching the patched commits
+#
+# The series is whatever is in build_qt/patches/<submodule>/*.patch, applied in name order.
+# Rename a patch to .patch.disabled to stop applying it.
+#
+# For each submodule, the key is a hash of the commit the Qt tag pins and of the patches' content.
+# The patched commit is kept under refs/ci-release-tools/patched/<key> in the submodule, so when
+# neither the tag nor the patches changed, it's only a checkout, and nothing at all when the
+# submodule is still at that commit: files keep their mtimes, so incremental builds stay incremental.
+# Otherwise the patches are applied with git am, and the first one that fails is reported, with
+# git's output.
+#
+# Example:
+# $ qt_patches.py ~/sources/qt6_ci
+
+import argparse
+import hashlib
+import os
+import subprocess
+import sys
+from utils import observed
+
+PATCHES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'build_qt', 'patches')
+REF_PREFIX = 'refs/ci-release-tools/patched'
+
+# git am needs a committer, build machines don't always have one configured
+GIT_IDENTITY = {'GIT_COMMITTER_NAME': 'ci-release-tools', 'GIT_COMMITTER_EMAIL': 'ci-release-tools@kdab.com'}
+
+
+class PatchError(Exception):
+    def __init__(self, submodule, patch, output):
+        super().__init__(f"{submodule}/{os.path.basename(patch)} failed to apply:\n{output}")
+        self.submodule = submodule
+        self.patch = patch
+        self.output = output
+
+
+def _git(repo_dir, *args):
+    command = ['git', '-C', repo_dir] + list(args)
+    with observed('command', ' '.join(command)) as span:
+        result = subprocess.run(command, capture_output=True, text=True, check=False,
+                                env=dict(GIT_IDENTITY, **os.environ))
+        span['exit_code'] = result.returncode
+    return result
+
+
+def discover_patches(patches_dir=PATCHES_DIR):
+    '''
+    Returns {submodule: [patch paths, in the order they apply]}
+    '''
+    series = {}
+    for submodule in sorted(os.listdir(patches_dir)):
+        directory = os.path.join(patches_dir, submodule)
+        if os.path.isdir(directory):
+            patches = sorted(name for name in os.listdir(directory) if name.endswith('.patch'))
+            if patches:
+                series[submodule] = [os.path.join(directory, name) for name in patches]
+    return series
+
+
+def series_key(base_sha1, patches):
+    '''
+    Identifies base_sha1 with patches applied, patches being paths
+    '''
+    key = hashlib.sha256(base_sha1.encode())
+    for patch in patches:
+        with open(patch, 'rb') as f:
+            key.update(os.path.basename(patch).encode() + b'\0' + hashlib.sha256(f.read()).digest())
+    return key.hexdigest()[:24]
+
+
+def patch_set_key(patches_dir=PATCHES_DIR):
+    '''
+    Identifies all the patches of patches_dir, recorded in the build report and the index of packages
+    '''
+    return series_key('', [patch for patches in discover_patches(patches_dir).values() for patch in patches])
+
+
+def pinned_sha1(src_dir, submodule):
+    '''
+    The commit the Qt superproject pins the submodule to
+    '''
+    result = _git(src_dir, 'rev-parse', f"HEAD:{submodule}")
+    return result.stdout.strip() if result.returncode == 0 else None
+
+
+def is_patched(src_dir, submodule, patches):
+    '''
+    True if the submodule is checked out at its patched commit for the pinned commit and patches
+    '''
+    repo_dir = os.path.join(src_dir, submodule)
+    base = pinned_sha1(src_dir, submodule)
+    if not base or not os.path.exists(os.path.join(repo_dir, '.git')):
+        return False
+    cached = _git(repo_dir, 'rev-parse', '--verify', '-q', f"{REF_PREFIX}/{series_key(base, patches)}")
+    head = _git(repo_dir, 'rev-parse', '--verify', '-q', 'HEAD')
+    return cached.returncode == 0 and head.stdout.strip() == cached.stdout.strip()
+
+
+def patched_submodules(src_dir, patches_dir=PATCHES_DIR):
+    '''
+    The submodules is_patched() already, git submodule update would check out their pinned commit again
+    '''
+    return [submodule for submodule, patches in discover_patches(patches_dir).items()
+            if is_patched(src_dir, submodule, patches)]
+
+
+def patch_submodule(src_dir, submodule, patches):
+    '''
+    Checks out the patched submodule, from the cache or by applying patches.
+    Returns 'unchanged', 'cached' or 'applied', raises PatchError.
+    '''
+    repo_dir = os.path.join(src_dir, submodule)
+    base = pinned_sha1(src_dir, submodule)
+    if not base or not os.path.exists(os.path.join(repo_dir, '.git')):
+        raise PatchError(submodule, patches[0], f"{submodule} isn't checked out")
+    if is_patched(src_dir, submodule, patches):
+        return 'unchanged'
+
+    ref = f"{REF_PREFIX}/{series_key(base, patches)}"
+    if _git(repo_dir, 'rev-parse', '--verify', '-q', ref).returncode == 0:
+        result = _git(repo_dir, 'checkout', '-q', '--detach', ref)
+        if result.returncode != 0:
+            raise PatchError(submodule, patches[0], result.stderr)
+        return 'cached'
+
+    # A previous run can have left a failed git am behind
+    _git(repo_dir, 'am', '--abort')
+    result = _git(repo_dir, 'checkout', '-q', '-f', '--detach', base)
+    if result.returncode != 0:
+        raise PatchError(submodule, patches[0], result.stderr)
+
+    for patch in patches:
+        result = _git(repo_dir, 'am', '-q', '--3way', patch)
+        if result.returncode != 0:
+            _git(repo_dir, 'am', '--abort')
+            raise PatchError(submodule, patch, (result.stdout + result.stderr).strip())
+
+    _git(repo_dir, 'update-ref', ref, 'HEAD')
+    return 'applied'
+
+
+def apply_patches(src_dir, patches_dir=PATCHES_DIR):
+    '''
+    Patches all submodules which have patches. Returns True on success, prints what happened.
+    '''
+    ok = True
+    for submodule, patches in discover_patches(patches_dir).items():
+        try:
+            outcome = patch_submodule(src_dir, submodule, patches)
+        except PatchError as e:
+            print(f"error: {e}")
+            ok = False
+            continue
+        print(f"{submodule}: {len(patches)} patches {outcome}")
+    return ok
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument('src_dir', help="Qt source checkout, with submodules initialized")
+    parser.add_argument('--patches-dir', default=PATCHES_DIR, help="Default: %(default)s")
+    args = parser.parse_args(argv)
+
+    return 0 if apply_patches(args.src_dir, args.patches_dir) else 1
+
+
+if __name__ == "__main__":
+    import ci_release_tools
+    sys.exit(ci_release_tools.run('qt_patches', sys.argv[1:], main))
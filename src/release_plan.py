@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: 2026 Klarälvdalens Datakonsult AB, a KDAB Group company <info@kdab.com>
+# SPDX-License-Identifier: MIT
+
+# Prepares a release ahead of time, so release day only has to check and publish
+#
+# prepare-release runs the slow parts of create_release (previous tag, version.txt, changelog,
+# building the tarball and its digests) once version.txt is bumped, typically in CI, and writes
+# them to a directory: release-plan.json and the tarball. The tarball is reproducible: sorted
+# entries, fixed owner, mtimes set to the commit's date and no timestamp in the gzip header, so
+# anyone can rebuild it from the sha1 and compare digests.
+#
+# Only projects with tarball_includes_submodules get a tarball built ahead of time. The others
+# publish GitHub's archive of the tag, like create_release does, which honors .gitattributes
+# (export-ignore, export-subst). It only exists once the tag is pushed, so it's downloaded then.
+#
+# create_release.py --from-plan then only checks that the tarball is intact, that sha1 is still
+# on the main branch, that CI passed and that the release doesn't exist yet, then tags and publishes.
+#
+# Examples:
+# $ release_plan.py --repo KDSoap --version 2.2.1 --sha1 <sha1> --output-dir release-plan
+# $ create_release.py --from-plan release-plan/release-plan.json --repo-path ../KDSoap --sign
+
+import argparse
+import json
+import os
+import sys
+import utils
+from utils import get_project, repo_exists, run_command_with_output, tag_for_version
+
+# 2: projects without tarball_includes_submodules publish GitHub's tag archive
+PLAN_FORMAT = 2
+PLAN_FILENAME = 'release-plan.json'
+
+
+def reproducible_tarball(source_dir, arcname, filename, mtime):
+    '''
+    Writes source_dir to filename as a .tar.gz with everything under arcname/, without .git.
+    The bytes only depend on the content and mtime: entries are sorted, owners and timestamps are fixed.
+    '''
+    import gzip
+    import stat
+    import tarfile
+
+    def normalized(info):
+        info.uid = info.gid = 0
+        info.uname = info.gname = ''
+        info.mtime = mtime
+        if info.isdir() or info.mode & stat.S_IXUSR:
+            info.mode = 0o755
+        else:
+            info.mode = 0o644
+        return info
+
+    with open(filename, 'wb') as raw, \
+            gzip.GzipFile(filename='', mode='wb', fileobj=raw, mtime=0) as compressed, \
+            tarfile.open(fileobj=compressed, mode='w', format=tarfile.GNU_FORMAT) as tar:
+        tar.add(source_dir, arcname, recursive=False, filter=normalized)
+        for root, dirs, files in os.walk(source_dir):
+            # Submodules have a .git file instead of a directory
+            dirs[:] = sorted(d for d in dirs if d != '.git')
+            relative_root = os.path.relpath(root, source_dir)
+            for name in sorted(dirs + [f for f in files if f != '.git']):
+                path = os.path.join(root, name)
+                member_name = os.path.normpath(os.path.join(arcname, relative_root, name))
+                tar.add(path, member_name, recursive=False, filter=normalized)
+
+
+def file_digests(filename, chunk_size=1024 * 1024):
+    import hashlib
+    sha256 = hashlib.sha256()
+    sha512 = hashlib.sha512()
+    with open(filename, 'rb') as f:
+        while chunk := f.read(chunk_size):
+            sha256.update(chunk)
+            sha512.update(chunk)
+    return {'sha256': sha256.hexdigest(), 'sha512': sha512.hexdigest()}
+
+
+def tarball_filename(proj_name, version):
+    return f"{proj_name.lower()}-{version}.tar.gz"
+
+
+def build_tarball(proj_name, version, sha1, output_dir):
+    '''
+    Builds the reproducible release tarball, with submodules, in output_dir. Returns its plan entry, or None.
+    '''
+    import tempfile
+
+    arcname = f"{proj_name.lower()}-{version}"
+    filename = tarball_filename(proj_name, version)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        clone_dir = os.path.join(temp_dir, arcname)
+        if not utils.checkout_sha1(proj_name, sha1, clone_dir, submodules=True):
+            print(f"error: failed to check out {proj_name} at {sha1}")
+            return None
+        mtime = int(run_command_with_output(f"git -C {clone_dir} log -1 --format=%ct {sha1}").strip())
+        reproducible_tarball(clone_dir, arcname, os.path.join(output_dir, filename), mtime)
+
+    path = os.path.join(output_dir, filename)
+    return dict({'filename': filename, 'size': os.path.getsize(path), 'mtime': mtime,
+                 'includes_submodules': True}, **file_digests(path))
+
+
+def tag_archive_entry(proj_name, version):
+    '''
+    The plan entry of a tarball which is GitHub's archive of the tag, downloaded once the tag is pushed
+    '''
+    return {'filename': tarball_filename(proj_name, version), 'includes_submodules': False, 'github_archive': True}
+
+
+def write_plan(plan, output_dir):
+    filename = os.path.join(output_dir, PLAN_FILENAME)
+    with open(f"{filename}.tmp", 'w', encoding='UTF-8') as f:
+        json.dump(plan, f, indent=2)
+        f.write('\n')
+    os.replace(f"{filename}.tmp", filename)
+    return filename
+
+
+def load_plan(filename):
+    '''
+    Returns the plan, or None if it can't be read or is from an incompatible version
+    '''
+    try:
+        with open(filename, 'r', encoding='UTF-8') as f:
+            plan = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"error: can't read release plan {filename}: {e}")
+        return None
+
+    if plan.get('format') != PLAN_FORMAT:
+        print(f"error: {filename} has plan format {plan.get('format')}, expected {PLAN_FORMAT}")
+        return None
+    return plan
+
+
+def prepare_release(proj_name, version, sha1, output_dir):
+    '''
+    Runs the checks and builds the tarball concurrently, then writes the plan. Returns its filename, or None.
+    '''
+    import gh_utils
+    from changelog_utils import get_changelog
+    from datetime import datetime, timezone
+    from pipeline import Step, run_pipeline
+
+    if not repo_exists(proj_name):
+        print(f"error: unknown repo {proj_name}, check releasing.toml")
+        return None
+
+    os.makedirs(output_dir, exist_ok=True)
+    results = {}
+
+    def changelog():
+        results['notes'] = get_changelog(proj_name, version, sha1)
+        if not results['notes']:
+            print(f"Error: No changelog found for version {version}")
+        return bool(results['notes'])
+
+    def tarball():
+        if not get_project(proj_name).get('tarball_includes_submodules'):
+            results['tarball'] = tag_archive_entry(proj_name, version)
+            return True
+        results['tarball'] = build_tarball(proj_name, version, sha1, output_dir)
+        return results['tarball'] is not None
+
+    steps = [
+        Step('previous_tag', lambda: gh_utils.check_previous_tag(proj_name, version)),
+        Step('version_txt', lambda: gh_utils.check_version_in_cmake(proj_name, version, sha1)),
+        Step('changelog', changelog),
+        Step('tarball', tarball),
+    ]
+    if not run_pipeline(steps, title=f"Prepare {proj_name} {version}", name='prepare_release'):
+        return None
+
+    plan = {
+        'format': PLAN_FORMAT,
+        'project': proj_name,
+        'version': version,
+        'tag': tag_for_version(proj_name, version),
+        'sha1': sha1,
+        'branch': get_project(proj_name).get('main_branch', 'main'),
+        'notes': results['notes'],
+        'tarball': results['tarball'],
+        'prepared_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+    }
+    return write_plan(plan, output_dir)
+
+
+def check_tarball(plan, plan_dir):
+    '''
+    Returns True if the tarball next to the plan is the one the plan was made with
+    '''
+    expected = plan['tarball']
+    path = os.path.join(plan_dir, expected['filename'])
+    if not os.path.exists(path):
+        print(f"error: {path} is missing")
+        return False
+    if os.path.getsize(path) != expected['size'] or file_digests(path)['sha256'] != expected['sha256']:
+        print(f"error: {path} doesn't match the digests in the release plan")
+        return False
+    return True
+
+
+def check_sha1_on_branch(proj_name, sha1, branch):
+    '''
+    Returns True if sha1 is still the tip of branch, or one of its ancestors (not force-pushed away)
+    '''
+    status = run_command_with_output(
+        f"gh api repos/KDAB/{proj_name}/compare/{branch}...{sha1} --jq .status").strip()
+    if status not in ('identical', 'behind'):
+        print(f"error: {sha1} is no longer on {branch} ({status or 'unknown'}), prepare the release again")
+        return False
+    if status == 'behind':
+        print(f"note: {branch} has moved past {sha1} since the plan was prepared")
+    return True
+
+
+def publish_plan(plan, plan_dir, repo_path, should_sign):
+    '''
+    Checks what can have changed since the plan was prepared, then tags and publishes, downloading
+    GitHub's archive of the tag first if that's the plan's tarball. Returns True on success.
+    '''
+    import gh_utils
+    from pipeline import Step, run_pipeline
+
+    proj_name = plan['project']
+    tag = plan['tag']
+    tarball = plan['tarball']['filename']
+
+    def release_does_not_exist():
+        if gh_utils.release_exists(proj_name, tag):
+            print(f"error: release {tag} already exists in {proj_name}")
+            return False
+        return True
+
+    def sign():
+        if not gh_utils.sign_file(tarball, plan_dir):
+            print(f"error: Failed to sign {tarball}")
+            return False
+        return True
+
+    def push_tag():
+        if not gh_utils.create_tag_via_git(proj_name, plan['version'], plan['sha1'], repo_path):
+            print("error: Could not create tag")
+            return False
+        return True
+
+    def download_tag_archive():
+        if not gh_utils.download_tarball(proj_name, tag, plan['version'], plan_dir) or \
+                not gh_utils.tarball_has_integrity(tarball, plan_dir):
+            print(f"error: failed to download {tarball} from {proj_name}")
+            return False
+        return True
+
+    github_archive = plan['tarball'].get('github_archive')
+    gates = ['sha1_on_branch', 'ci_status', 'release_does_not_exist']
+    steps = [
+        Step('sha1_on_branch', lambda: check_sha1_on_branch(proj_name, plan['sha1'], plan['branch'])),
+        Step('ci_status', lambda: gh_utils.check_ci_passed(proj_name, plan['sha1'])),
+        Step('release_does_not_exist', release_does_not_exist),
+    ]
+    if github_archive:
+        # GitHub's archive of the tag only exists once the tag is pushed, as in create_release
+        steps.append(Step('tag', push_tag, gates))
+        steps.append(Step('tarball', download_tag_archive, ['tag']))
+        artifact = 'tarball'
+    else:
+        steps.append(Step('tarball_digest', lambda: check_tarball(plan, plan_dir)))
+        artifact = 'tarball_digest'
+    if should_sign:
+        steps.append(Step('sign', sign, [artifact]))
+        artifact = 'sign'
+    if not github_archive:
+        steps.append(Step('tag', push_tag, gates + [artifact]))
+    files = [f"{tarball}.asc", tarball] if should_sign else [tarball]
+    steps.append(Step('release', lambda: gh_utils.publish_release(proj_name, tag, plan['notes'], files, plan_dir),
+                      ['tag', artifact]))
+
+    return run_pipeline(steps, title=f"Release {proj_name} {tag} from plan", name='create_release_from_plan')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repo", help="GitHub repository name", required=True)
+    parser.add_argument("--version", help="Release version", required=True)
+    parser.add_argument("--sha1", help="Sha1 to release", required=True)
+    parser.add_argument("--output-dir", default='release-plan',
+                        help=f"Where {PLAN_FILENAME} and the tarball are written (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    repo_name = utils.get_correct_repo_case(args.repo)
+    plan_file = prepare_release(repo_name, args.version, args.sha1, args.output_dir)
+    if not plan_file:
+        print("error: Could not prepare the release")
+        return 1
+
+    print(f"Release plan written to {plan_file}, publish it with: "
+          f"create_release.py --from-plan {plan_file} --repo-path <path>")
+    return 0
+
+
+if __name__ == "__main__":
+    import ci_release_tools
+    sys.exit(ci_release_tools.run('release_plan', sys.argv[1:], main))
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: 2026 Klarälvdalens Datakonsult AB, a KDAB Group company <info@kdab.com>
+# SPDX-License-Identifier: MIT
+
+# Releases several projects together
+#
+# Runs create_release and, for projects with signed_release, sign_and_upload for every project.
+# Projects listed as dependencies of each other in releasing.toml are released in order
+# (e.g. KDStateMachineEditor before GammaRay), independent ones concurrently.
+# Global limits apply to all projects: one gpg signer, N network streams, M tarball builders.
+#
+# Example:
+# ./src/release_train.py --repos-path .. \
+#     --release KDBindings:1.1.0:<sha1> --release KDUtils:0.2.0:<sha1> --release KDAlgorithms:1.5.0:<sha1>
+#
+# Each project is expected to be checked out at <repos-path>/<project>.
+# Tarballs and signatures go to <work-dir>/<project>/.
+
+import argparse
+import os
+import sys
+from changelog_utils import get_changelog
+import gh_utils
+from pipeline import Step, run_pipeline, set_resource_limits
+from utils import get_builtin_dependencies, get_correct_repo_case, get_project, repo_exists
+
+
+def parse_release(text):
+    '''
+    Parses 'project:version:sha1'
+    '''
+    parts = text.split(':')
+    if len(parts) != 3 or not all(parts):
+        raise argparse.ArgumentTypeError(
+            f"expected <project>:<version>:<sha1>, got '{text}'")
+    return (get_correct_repo_case(parts[0]), parts[1], parts[2])
+
+
+def train_dependencies(proj_name, proj_names):
+    '''
+    Returns the projects of the train which proj_name depends on, according to releasing.toml
+    '''
+    lowered = {name.lower(): name for name in proj_names}
+    return [lowered[dep.lower()] for dep in get_builtin_dependencies(proj_name)
+            if dep.lower() in lowered and lowered[dep.lower()] != proj_name]
+
+
+def release_project(proj_name, version, sha1, repo_path, work_dir, should_sign):
+    os.makedirs(work_dir, exist_ok=True)
+
+    notes = get_changelog(proj_name, version, sha1)
+    if not notes:
+        print(f"{proj_name}: no changelog found for version {version} in {sha1}")
+        return False
+
+    return gh_utils.create_release(proj_name, version, sha1, notes, repo_path,
+                                   should_sign, work_dir)
+
+
+def release_train(releases, repos_path, work_dir, should_sign=False, sign_and_upload=True, max_workers=8):
+    '''
+    Releases a list of (project, version, sha1). Returns True if all succeeded.
+    '''
+    proj_names = [proj_name for proj_name, _, _ in releases]
+    steps = []
+    for proj_name, version, sha1 in releases:
+        proj_work_dir = os.path.join(work_dir, proj_name)
+        repo_path = os.path.join(repos_path, proj_name)
+        deps = [f"release:{dep}" for dep in train_dependencies(proj_name, proj_names)]
+
+        steps.append(Step(f"release:{proj_name}",
+                          lambda p=proj_name, v=version, s=sha1, r=repo_path, w=proj_work_dir:
+                          release_project(p, v, s, r, w, should_sign),
+                          deps))
+
+        if sign_and_upload and get_project(proj_name).get('signed_release'):
+            steps.append(Step(f"sign_and_upload:{proj_name}",
+                              lambda p=proj_name, v=version, w=proj_work_dir:
+                              gh_utils.sign_and_upload(p, v, True, w),
+                              [f"release:{proj_name}"]))
+
+    return run_pipeline(steps, max_workers, title="Release train", name='release_train')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--release', type=parse_release, action='append', required=True,
+                        metavar='<project>:<version>:<sha1>',
+                        help="Project to release, can be passed more than once")
+    parser.add_argument('--repos-path', metavar='<path>', required=True,
+                        help="Directory containing a checkout of each project")
+    parser.add_argument('--work-dir', metavar='<path>', default='release-train',
+                        help="Where tarballs and signatures are written (default: release-train)")
+    parser.add_argument('--sign', action='store_true',
+                        help="Sign the release tarballs")
+    parser.add_argument('--no-sign-and-upload', action='store_true',
+                        help="Don't run sign_and_upload after releasing")
+    parser.add_argument('--network-streams', type=int, default=4,
+                        help="Maximum concurrent downloads/uploads (default: 4)")
+    parser.add_argument('--tarball-builders', type=int, default=2,
+                        help="Maximum concurrent tarball builds (default: 2)")
+    args = parser.parse_args(argv)
+
+    for proj_name, _, _ in args.release:
+        if not repo_exists(proj_name):
+            print(f"error: unknown repo {proj_name}, check releasing.toml")
+            return 1
+
+    set_resource_limits(gpg=1, network=args.network_streams,
+                        tarball=args.tarball_builders)
+
+    ok = release_train(args.release, args.repos_path, args.work_dir,
+                       args.sign, not args.no_sign_and_upload)
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    import ci_release_tools
+    sys.exit(ci_release_tools.run('release_train', sys.argv[1:], main))
@@ -14,20 +14,27 @@ import argparse
 import sys
 from gh_utils import sign_and_upload, verify_signature
 
-parser = argparse.ArgumentParser()
-
-parser.add_argument("--repo", help="GitHub repository name", required=True)
-parser.add_argument("--version", help="Release version", required=True)
-parser.add_argument(
-    "--verify", help="Verify signature instead of signing", action="store_true")
-parser.add_argument(
-    "--no-upload", help="Sign but do not upload the .asc file", action="store_true")
-args = parser.parse_args()
-
-if args.verify:
-    result = verify_signature(args.repo, args.version)
-else:
-    result = sign_and_upload(args.repo, args.version,
-                             upload=not args.no_upload)
-
-sys.exit(0 if result else -1)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument("--repo", help="GitHub repository name", required=True)
+    parser.add_argument("--version", help="Release version", required=True)
+    parser.add_argument(
+        "--verify", help="Verify signature instead of signing", action="store_true")
+    parser.add_argument(
+        "--no-upload", help="Sign but do not upload the .asc file", action="store_true")
+    args = parser.parse_args(argv)
+
+    if args.verify:
+        result = verify_signature(args.repo, args.version)
+    else:
+        result = sign_and_upload(args.repo, args.version,
+                                 upload=not args.no_upload)
+
+    return 0 if result else -1
+
+
+if __name__ == "__main__":
+    import ci_release_tools
+    sys.exit(ci_release_tools.run('sign_and_upload', sys.argv[1:], main))
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: 2026 Klarälvdalens Datakonsult AB, a KDAB Group company <info@kdab.com>
+# SPDX-License-Identifier: MIT
+
+# Audits the GPG signatures of every release of every signed_release project
+#
+# Lists the release assets (with their size and digest) via the GitHub API and skips the ones whose
+# (asset digest, signature digest) pair was already verified by a previous run. Only new or changed
+# assets are downloaded and verified, concurrently. GitHub's archives of a tag have no digest, they
+# are identified by the commit the tag points to, so they're verified again when the tag moves.
+# The verified pairs are cached in ~/.cache/ci-release-tools/signature-audit.json.
+#
+# The KDAB public key must be in the local keyring. Signatures made by any other key fail the audit.
+#
+# Examples:
+# $ signature_audit.py
+# $ signature_audit.py --repo KDSoap --no-cache
+
+import argparse
+import json
+import metrics
+import os
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from utils import get_projects, get_correct_repo_case, repo_exists, run_command_silent, run_command_with_output, GITHUB_URL
+from gpg_utils import DEFAULT_SIGNER
+from pipeline import resource
+
+# Signatures of GitHub's auto-generated archives are uploaded as '<tag>.tar.gz.asc' and '<tag>.zip.asc'
+ARCHIVE_SUFFIXES = ('.tar.gz', '.zip')
+
+
+def default_cache_file():
+    cache_home = os.getenv("XDG_CACHE_HOME", os.path.expanduser("~/.cache"))
+    return os.path.join(cache_home, "ci-release-tools", "signature-audit.json")
+
+
+def load_cache(filename):
+    try:
+        with open(filename, 'r', encoding='UTF-8') as f:
+            return json.load(f).get('verified', {})
+    except (OSError, ValueError):
+        return {}
+
+
+def save_cache(filename, verified):
+    os.makedirs(os.path.dirname(filename), exist_ok=True)
+    tmp_filename = f"{filename}.tmp"
+    with open(tmp_filename, 'w', encoding='UTF-8') as f:
+        json.dump({'verified': verified}, f, indent=1, sort_keys=True)
+    os.replace(tmp_filename, filename)
+
+
+def signed_projects():
+    return [name for name, proj in get_projects().items() if proj.get('signed_release')]
+
+
+def list_releases(proj_name):
+    '''
+    Returns the releases of a project as a list of {'tag': ..., 'assets': [{name, size, digest, url}]}
+    '''
+    jq = ('.[] | {tag: .tag_name, assets: [.assets[] | '
+          '{name, size, digest, url: .browser_download_url, updated_at}]}')
+    with resource('network'):
+        output = run_command_with_output(
+            f"gh api --paginate repos/KDAB/{proj_name}/releases --jq '{jq}'")
+
+    return [json.loads(line) for line in output.splitlines() if line.strip()]
+
+
+def has_archive_signatures(release):
+    return any(asset['name'] == f"{release['tag']}{suffix}.asc" for asset in release['assets']
+               for suffix in ARCHIVE_SUFFIXES)
+
+
+def add_tag_commits(proj_name, releases):
+    '''
+    Adds 'tag_sha1', the commit each tag points to, to the releases with signed GitHub archives
+    '''
+    import gh_utils
+
+    for release in releases:
+        if has_archive_signatures(release):
+            with resource('network'):
+                release['tag_sha1'] = gh_utils.sha1_for_tag_remote(proj_name, release['tag'])
+    return releases
+
+
+def asset_identity(asset):
+    '''
+    The digest GitHub computed for the asset. Older assets don't have one, fall back to size and date.
+    '''
+    return asset.get('digest') or f"size:{asset['size']}:{asset.get('updated_at')}"
+
+
+def audit_items(proj_name, release):
+    '''
+    Pairs each signature of a release with the file it signs.
+    Returns (items, unsigned): items are dicts with key, url, signature_url, asset and signature
+    identities, unsigned are the asset names without a signature.
+    '''
+    tag = release['tag']
+    assets = {asset['name']: asset for asset in release['assets']}
+    items = []
+
+    for name, signature in sorted(assets.items()):
+        if not name.endswith('.asc'):
+            continue
+
+        signed_name = name[:-len('.asc')]
+        if signed_name in assets:
+            asset = assets[signed_name]
+            url = asset['url']
+            identity = asset_identity(asset)
+        elif signed_name in (f"{tag}{suffix}" for suffix in ARCHIVE_SUFFIXES):
+            url = f"{GITHUB_URL}/KDAB/{proj_name}/archive/refs/tags/{signed_name}"
+            # Not a release asset, so no digest, but its content follows the tag's commit.
+            # Without it, it's verified every time.
+            identity = f"archive:{release['tag_sha1']}" if release.get('tag_sha1') else None
+        else:
+            continue
+
+        items.append({'key': f"{proj_name}/{tag}/{signed_name}",
+                      'name': signed_name,
+                      'url': url,
+                      'signature_url': signature['url'],
+                      'asset': identity,
+                      'signature': asset_identity(signature)})
+
+    unsigned = [f"{proj_name}/{tag}/{name}" for name in sorted(assets)
+                if not name.endswith('.asc') and f"{name}.asc" not in assets]
+    return items, unsigned
+
+
+def pending_items(items, verified, trusted=None):
+    '''
+    Returns the items which aren't in the verified cache with the same digests,
+    and signed by one of the trusted fingerprints, if given
+    '''
+    pending = []
+    for item in items:
+        cached = verified.get(item['key'])
+        if not cached or not item['asset'] or cached['asset'] != item['asset'] or \
+                cached['signature'] != item['signature'] or \
+                (trusted is not None and cached.get('fingerprint') not in trusted):
+            pending.append(item)
+    return pending
+
+
+def download_item(item, download_dir):
+    '''
+    Downloads the file and its signature to download_dir/<key>. Returns the relative filename, or None.
+    '''
+    filename = item['key']
+    directory = os.path.join(download_dir, os.path.dirname(filename))
+    os.makedirs(directory, exist_ok=True)
+
+    with resource('network'):
+        for url, target in ((item['url'], item['name']), (item['signature_url'], f"{item['name']}.asc")):
+            if not run_command_silent(f"curl -sfL -o '{target}' '{url}'", cwd=directory):
+                print(f"error: failed to download {url}")
+                return None
+
+    if item['asset'] and item['asset'].startswith('sha256:'):
+        import hashlib
+        with open(os.path.join(download_dir, filename), 'rb') as f:
+            digest = hashlib.file_digest(f, 'sha256').hexdigest()
+        if f"sha256:{digest}" != item['asset']:
+            print(f"error: {filename} has digest sha256:{digest}, GitHub reports {item['asset']}")
+            return None
+
+    return filename
+
+
+def audit(proj_names, cache_file, use_cache=True, jobs=8, signer=DEFAULT_SIGNER):
+    '''
+    Verifies the signatures of all releases of proj_names, which must be made by signer's key.
+    Returns True if all are valid.
+    '''
+    import gpg_utils
+
+    session = gpg_utils.GpgSession(local_user=None, jobs=jobs)
+    trusted = session.key_fingerprints(signer)
+    if not trusted:
+        print(f"error: no key for '{signer}' in the keyring")
+        return False
+
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        releases = dict(zip(proj_names, executor.map(lambda p: add_tag_commits(p, list_releases(p)), proj_names)))
+
+    items = []
+    unsigned = []
+    for proj_name, proj_releases in releases.items():
+        for release in proj_releases:
+            release_items, release_unsigned = audit_items(proj_name, release)
+            items += release_items
+            unsigned += release_unsigned
+
+    verified = load_cache(cache_file)
+    pending = pending_items(items, verified if use_cache else {}, trusted)
+    print(f"{len(items)} signed files, {len(items) - len(pending)} already verified, "
+          f"{len(pending)} to verify")
+    metrics.inc('cache_requests', len(items) - len(pending), cache='signature_audit', result='hit')
+    metrics.inc('cache_requests', len(pending), cache='signature_audit', result='miss')
+
+    failed = []
+    with tempfile.TemporaryDirectory() as download_dir:
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            filenames = list(executor.map(lambda item: download_item(item, download_dir), pending))
+
+        downloaded = [(item, filename) for item, filename in zip(pending, filenames) if filename]
+        failed += [item['key'] for item, filename in zip(pending, filenames) if not filename]
+
+        results = session.verify_files([filename for _, filename in downloaded], download_dir)
+
+    newly_verified = 0
+    for (item, _), result in zip(downloaded, results):
+        if result.ok and result.fingerprint in trusted:
+            newly_verified += 1
+            verified[item['key']] = {'asset': item['asset'], 'signature': item['signature'],
+                                     'fingerprint': result.fingerprint}
+        else:
+            error = result.error if not result.ok else f"signed by {result.fingerprint}, not by '{signer}'"
+            print(f"error: {item['key']}: {error}")
+            failed.append(item['key'])
+            verified.pop(item['key'], None)
+
+    save_cache(cache_file, verified)
+
+    for key in unsigned:
+        print(f"warning: {key} has no signature")
+
+    print(f"Verified {newly_verified} files, {len(failed)} failed")
+    return not failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--repo', action='append',
+                        help="Only audit this project, can be passed more than once")
+    parser.add_argument('--cache-file', default=default_cache_file(),
+                        help="Where verified digests are stored (default: %(default)s)")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="Verify everything again, ignoring previous runs")
+    parser.add_argument('--jobs', type=int, default=8,
+                        help="Concurrent downloads and verifications (default: 8)")
+    parser.add_argument('--signer', default=DEFAULT_SIGNER,
+                        help="User ID or fingerprint of the release key in the keyring (default: '%(default)s')")
+    args = parser.parse_args(argv)
+
+    if args.repo:
+        proj_names = [get_correct_repo_case(repo) for repo in args.repo]
+        for proj_name in proj_names:
+            if not repo_exists(proj_name):
+                print(f"error: unknown repo {proj_name}, check releasing.toml")
+                return 1
+    else:
+        proj_names = signed_projects()
+
+    return 0 if audit(proj_names, args.cache_file, not args.no_cache, args.jobs, args.signer) else 1
+
+
+if __name__ == "__main__":
+    import ci_release_tools
+    sys.exit(ci_release_tools.run('signature_audit', sys.argv[1:], main))
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: 2026 Klarälvdalens Datakonsult AB, a KDAB Group company <info@kdab.com>
+# SPDX-License-Identifier: MIT
+
+# Records how long each command and HTTP request took, and on behalf of which step
+#
+# Enabled by environment variables:
+#   CI_RELEASE_TOOLS_TRACE=trace.json     write a Chrome trace-event file, open it in https://ui.perfetto.dev
+#   CI_RELEASE_TOOLS_TRACE_SUMMARY=20     print the 20 slowest operations at exit (default 10 if only
+#                                         CI_RELEASE_TOOLS_TRACE is set)
+#
+# Steps are logical names like 'can_bump_to/ci_run_status'. Each thread has its own stack of steps,
+# pipeline.py passes the parent step on to the threads running its steps.
+#
+# Example:
+# $ CI_RELEASE_TOOLS_TRACE=trace.json ./src/create_release.py --repo KDSoap --version 2.2.1 --sha1 <sha1>
+
+import atexit
+import functools
+import os
+import sys
+import threading
+import time
+
+TRACE_FILE = os.getenv("CI_RELEASE_TOOLS_TRACE")
+SUMMARY_SIZE = int(os.getenv("CI_RELEASE_TOOLS_TRACE_SUMMARY", "10" if TRACE_FILE else "0"))
+ENABLED = bool(TRACE_FILE or SUMMARY_SIZE)
+
+_spans = []
+_spans_lock = threading.Lock()
+_local = threading.local()
+_start = time.perf_counter()
+
+
+def current_step():
+    '''
+    The logical step of the calling thread, for example 'create_release/tarball', or ''
+    '''
+    stack = getattr(_local, 'steps', None)
+    return stack[-1] if stack else ''
+
+
+class _Span:
+    def __init__(self, category, name, step_name=None):
+        self.category = category
+        self.name = name
+        self.step = step_name if step_name is not None else current_step()
+        self.args = {}
+        self.start = None
+        self.end = None
+        self.thread = threading.current_thread().name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self.args
+
+    def __exit__(self, exc_type, exc, tb):
+        self.end = time.perf_counter()
+        if exc_type is not None:
+            self.args.setdefault('error', exc_type.__name__)
+        with _spans_lock:
+            _spans.append(self)
+        return False
+
+    def duration(self):
+        return self.end - self.start
+
+
+class _NullSpan:
+    def __enter__(self):
+        return {}
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+def span(category, name):
+    '''
+    Times the with block. Yields a dict for extra info, like 'exit_code' and 'bytes'.
+    category is 'command', 'http', 'gpg' or 'step'.
+    '''
+    if not ENABLED:
+        return _NullSpan()
+    return _Span(category, name)
+
+
+class step:
+    '''
+    Context manager naming what the thread is doing, nested under the current step,
+    or under parent if given (which is how pipeline.py carries steps across threads)
+    '''
+
+    def __init__(self, name, parent=None):
+        self.name = name
+        self.parent = parent
+        self._span = None
+
+    def __enter__(self):
+        parent = self.parent if self.parent is not None else current_step()
+        full_name = f"{parent}/{self.name}" if parent else self.name
+        if not hasattr(_local, 'steps'):
+            _local.steps = []
+        _local.steps.append(full_name)
+        if ENABLED:
+            self._span = _Span('step', full_name, step_name=full_name)
+            self._span.__enter__()
+        return full_name
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._span:
+            self._span.__exit__(exc_type, exc, tb)
+        _local.steps.pop()
+        return False
+
+
+def traced_step(func):
+    '''
+    Decorator running func as a step named after it
+    '''
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with step(func.__name__):
+            return func(*args, **kwargs)
+    return wrapper
+
+
+def spans():
+    with _spans_lock:
+        return list(_spans)
+
+
+def chrome_trace(recorded_spans):
+    '''
+    Returns the spans as a Chrome trace-event dict
+    '''
+    thread_ids = {}
+    events = []
+    for recorded_span in sorted(recorded_spans, key=lambda s: s.start):
+        tid = thread_ids.setdefault(recorded_span.thread, len(thread_ids) + 1)
+        events.append({'name': recorded_span.name, 'cat': recorded_span.category, 'ph': 'X',
+                       'ts': round((recorded_span.start - _start) * 1e6, 1),
+                       'dur': round(recorded_span.duration() * 1e6, 1),
+                       'pid': os.getpid(), 'tid': tid,
+                       'args': dict(recorded_span.args, step=recorded_span.step)})
+
+    for thread, tid in thread_ids.items():
+        events.append({'name': 'thread_name', 'ph': 'M', 'pid': os.getpid(), 'tid': tid,
+                       'args': {'name': thread}})
+    return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+
+def write_chrome_trace(filename, recorded_spans=None):
+    import json
+    with open(filename, 'w', encoding='UTF-8') as f:
+        json.dump(chrome_trace(spans() if recorded_spans is None else recorded_spans), f)
+
+
+def print_summary(count, recorded_spans=None, file=None):
+    '''
+    Prints the slowest operations (steps excluded) and totals per category
+    '''
+    file = file or sys.stderr
+    operations = [s for s in (spans() if recorded_spans is None else recorded_spans)
+                  if s.category != 'step']
+    if not operations:
+        return
+
+    print(f"Slowest {min(count, len(operations))} of {len(operations)} operations:", file=file)
+    for operation in sorted(operations, key=lambda s: s.duration(), reverse=True)[:count]:
+        name = operation.name if len(operation.name) <= 80 else operation.name[:77] + '...'
+        extra = ' '.join(f"{key}={value}" for key, value in operation.args.items())
+        print(f"  {operation.duration():8.3f}s  {operation.category:7}  {name}  "
+              f"[{operation.step or '-'}] {extra}".rstrip(), file=file)
+
+    totals = {}
+    for operation in operations:
+        count_and_time = totals.setdefault(operation.category, [0, 0.0])
+        count_and_time[0] += 1
+        count_and_time[1] += operation.duration()
+    print("  totals: " + ', '.join(f"{category} {n}x {seconds:.3f}s"
+                                   for category, (n, seconds) in sorted(totals.items())), file=file)
+
+
+@atexit.register
+def _at_exit():
+    if not ENABLED:
+        return
+    if TRACE_FILE:
+        write_chrome_trace(TRACE_FILE)
+    if SUMMARY_SIZE:
+        print_summary(SUMMARY_SIZE)
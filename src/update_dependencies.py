@@ -11,7 +11,9 @@
 # ./src/update_dependencies.py --update-dependency kdalgorithms --repo-path ../knut --proj-name Knut
 
 import argparse
+import sys
 import gh_utils
+import metrics
 
 
 def print_dependencies(proj_name, repo_path):
@@ -30,6 +32,7 @@ def print_dependencies(proj_name, repo_path):
         print("::group::Versions")
 
         # Print with annotation tags so it appears under GH actions results
+        outdated = 0
         for version in versions:
             latest_version = version['latest_version']
             current_version = version['current_version']
@@ -43,6 +46,7 @@ def print_dependencies(proj_name, repo_path):
                 print(
                     f"::notice::{name} is up to date ({latest_version})")
             elif latest_version:
+                outdated += 1
                 print(
                     f"::warning::{name} {current_version} can be bumped to {latest_version}")
             else:
@@ -50,42 +54,50 @@ def print_dependencies(proj_name, repo_path):
 
         if versions:
             print("::endgroup::")
+        metrics.set_gauge('dependencies_outdated', outdated, project=proj_name)
     else:
         print(
             f"::warning::No dependencies found for {proj_name} in {repo_path}")
 
 
-parser = argparse.ArgumentParser()
-parser.add_argument('--print-dependency-versions', action='store_true',
-                    help="prints dependency versions", required=False)
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--print-dependency-versions', action='store_true',
+                        help="prints dependency versions", required=False)
 
-parser.add_argument('--proj-name', metavar='<path>',
-                    help="Project like 'Knut'", required=True)
+    parser.add_argument('--proj-name', metavar='<path>',
+                        help="Project like 'Knut'", required=True)
 
-parser.add_argument('--repo-path', metavar='<path>',
-                    help="Path to repository", required=True)
+    parser.add_argument('--repo-path', metavar='<path>',
+                        help="Path to repository", required=True)
 
-parser.add_argument('--update-dependency', metavar='<dependency name>',
-                    help="Dependency name", required=False, dest='dependency_name')
+    parser.add_argument('--update-dependency', metavar='<dependency name>',
+                        help="Dependency name", required=False, dest='dependency_name')
 
-parser.add_argument('--remote', metavar='<remote>',
-                    help="Remote, defaults to origin", required=False, default='origin')
+    parser.add_argument('--remote', metavar='<remote>',
+                        help="Remote, defaults to origin", required=False, default='origin')
 
-parser.add_argument('--branch', metavar='<branch>',
-                    help="Remote branch, defaults to the main branch", required=False)
+    parser.add_argument('--branch', metavar='<branch>',
+                        help="Remote branch, defaults to the main branch", required=False)
 
-parser.add_argument('--owner', metavar='<owner>',
-                    help="Repo owner, usually KDAB", required=False, default='KDAB')
+    parser.add_argument('--owner', metavar='<owner>',
+                        help="Repo owner, usually KDAB", required=False, default='KDAB')
 
-parser.add_argument('--sha1', metavar='<sha1, tag or branch>',
-                    help="Sha tag or branch, defaults to latest", dest='new_sha1', required=False)
+    parser.add_argument('--sha1', metavar='<sha1, tag or branch>',
+                        help="Sha tag or branch, defaults to latest", dest='new_sha1', required=False)
 
-args = parser.parse_args()
+    args = parser.parse_args(argv)
 
-if args.print_dependency_versions:
-    print_dependencies(args.proj_name, args.repo_path)
-elif args.dependency_name:
-    gh_utils.update_dependency(args.proj_name, args.dependency_name,
-                               args.new_sha1, args.repo_path,
-                               args.remote, args.branch,
-                               args.owner)
+    if args.print_dependency_versions:
+        print_dependencies(args.proj_name, args.repo_path)
+    elif args.dependency_name:
+        gh_utils.update_dependency(args.proj_name, args.dependency_name,
+                                   args.new_sha1, args.repo_path,
+                                   args.remote, args.branch,
+                                   args.owner)
+    return 0
+
+
+if __name__ == "__main__":
+    import ci_release_tools
+    sys.exit(ci_release_tools.run('update_dependencies', sys.argv[1:], main))
@@ -5,32 +5,133 @@
 
 # Generic utils used by the other scripts
 
+import contextlib
 import os
 import sys
-import tomllib
+import threading
+import time
 import subprocess
-import tempfile
-import urllib.request
+
+import metrics
+import tracing
 
 VERBOSE = os.getenv("VERBOSE", "0") == "1"
 
+# Where GitHub is. Overridable to run against a local stand-in, see benchmarks/fake_github.py.
+# 'gh' itself isn't affected, the benchmarks put a fake 'gh' in PATH.
+GITHUB_URL = os.getenv("CI_RELEASE_TOOLS_GITHUB_URL", "https://github.com").rstrip('/')
+GITHUB_RAW_URL = os.getenv("CI_RELEASE_TOOLS_GITHUB_RAW_URL",
+                           "https://raw.githubusercontent.com").rstrip('/')
+# Where KDAB repos are cloned from, can be a file:// URL
+GITHUB_GIT_URL = os.getenv("CI_RELEASE_TOOLS_GITHUB_GIT_URL", GITHUB_URL).rstrip('/')
+
+# Seconds that query results (downloads, gh queries) are cached for, 0 disables caching.
+# Only the daemon (see daemon.py) enables it, as it outlives a single workflow step.
+QUERY_CACHE_TTL = 0
+
+_query_cache = {}
+_query_cache_lock = threading.Lock()
+_projects_cache = {}
+_thread_state = threading.local()
+
 
 def exit_because(reason):
     print(reason)
     sys.exit(1)
 
 
-def run_command_silent(command):
+def recorded(kind, request, func):
+    '''
+    Returns func(), going through the cassette if CI_RELEASE_TOOLS_CASSETTE is set, see cassette.py
+    '''
+    if not os.getenv("CI_RELEASE_TOOLS_CASSETTE"):
+        return func()
+
+    import cassette
+    return cassette.current().interaction(kind, request, func)
+
+
+@contextlib.contextmanager
+def observed(category, name):
+    '''
+    Traces (see tracing.py) and measures (see metrics.py) the with block, a command or HTTP request.
+    Yields a dict the block fills with 'exit_code' or 'status', and 'bytes'.
+    '''
+    start = time.monotonic()
+    span = {}
+    try:
+        with tracing.span(category, name) as span:
+            yield span
+    finally:
+        metrics.operation_finished(category, name, span, time.monotonic() - start)
+
+
+@contextlib.contextmanager
+def commands_cwd(cwd):
+    '''
+    Runs the commands of the with block in cwd, unless they're given one.
+    Unlike os.chdir(), it only affects the current thread.
+    '''
+    previous = getattr(_thread_state, 'cwd', None)
+    _thread_state.cwd = cwd
+    try:
+        yield
+    finally:
+        _thread_state.cwd = previous
+
+
+def _command_cwd(cwd):
+    return cwd or getattr(_thread_state, 'cwd', None)
+
+
+@contextlib.contextmanager
+def commands_env(env):
+    '''
+    Runs the commands of the with block with env instead of os.environ, and caches their queries
+    apart from other environments' (see cached_query()). Only affects the current thread.
+    '''
+    import hashlib
+    import json
+
+    previous = getattr(_thread_state, 'env', None), getattr(_thread_state, 'env_key', None)
+    _thread_state.env = env
+    _thread_state.env_key = hashlib.sha256(json.dumps(env, sort_keys=True).encode()).hexdigest()
+    try:
+        yield
+    finally:
+        _thread_state.env, _thread_state.env_key = previous
+
+
+def _command_env():
+    return getattr(_thread_state, 'env', None)
+
+
+def run_command_silent(command, cwd=None):
     '''
     runs a command but doesn't print to stdout/stderr
     '''
-    result = subprocess.run(
-        command, shell=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=False)
-    return result.returncode == 0
+    cwd = _command_cwd(cwd)
+
+    def run():
+        with observed('command', command) as span:
+            result = subprocess.run(
+                command, shell=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=False, cwd=cwd,
+                env=_command_env())
+            span['exit_code'] = result.returncode
+        return result.returncode == 0
+
+    return recorded('command', command, run)
+
 
+def run_command(command, fatal=True, cwd=None):
+    cwd = _command_cwd(cwd)
 
-def run_command(command, fatal=True):
-    if os.system(command) == 0:
+    def run():
+        with observed('command', command) as span:
+            span['exit_code'] = subprocess.run(command, shell=True, check=False, cwd=cwd, env=_command_env()).returncode
+        return span['exit_code'] == 0
+
+    if recorded('command', command, run):
         return True
 
     if fatal:
@@ -40,22 +141,30 @@ def run_command(command, fatal=True):
 
 
 def run_command_with_output(command, cwd=None):
-    current_dir = os.getcwd()
-    if cwd:
-        os.chdir(cwd)
-    try:
-        if VERBOSE:
-            print(f"run_command_with_output: {command} cwd:{os.getcwd()}")
-
-        process = os.popen(command)
-        output = process.read()
-        exit_code = process.close()
-        if exit_code:
-            print(f"cmd failed: {command} cwd={cwd}")
-    finally:
-        if cwd:
-            os.chdir(current_dir)
-    return output
+    return recorded('command_output', command, lambda: _run_command_with_output(command, cwd)[1])
+
+
+def run_command_with_exit_code(command, cwd=None):
+    '''
+    Returns [exit code, output], for when an output can be incomplete on failure
+    '''
+    return recorded('command_exit_code', command, lambda: list(_run_command_with_output(command, cwd)))
+
+
+def _run_command_with_output(command, cwd):
+    cwd = _command_cwd(cwd)
+    # cwd is passed to the process, os.chdir() would change it for every thread
+    if VERBOSE:
+        print(f"run_command_with_output: {command} cwd:{cwd or os.getcwd()}")
+
+    with observed('command', command) as span:
+        result = subprocess.run(command, shell=True, stdout=subprocess.PIPE, text=True, check=False, cwd=cwd,
+                                env=_command_env())
+        span['exit_code'] = result.returncode
+        span['bytes'] = len(result.stdout)
+    if result.returncode != 0:
+        print(f"cmd failed: {command} cwd={cwd}")
+    return result.returncode, result.stdout
 
 
 def repo_exists(repo):
@@ -64,8 +173,18 @@ def repo_exists(repo):
 
 def get_projects():
     script_path = os.path.dirname(__file__)
-    with open(f'{script_path}/../releasing.toml', 'rb') as f:
+    filename = f'{script_path}/../releasing.toml'
+
+    # Parsed once per process, re-read if the file changes while the daemon is running
+    mtime = os.path.getmtime(filename)
+    cached = _projects_cache.get(filename)
+    if cached and cached[0] == mtime:
+        return cached[1]
+
+    import tomllib
+    with open(filename, 'rb') as f:
         toml_content = tomllib.load(f)
+        _projects_cache[filename] = (mtime, toml_content['project'])
         return toml_content['project']
     return None
 
@@ -112,18 +231,108 @@ def get_fetchcontent_builtin_dependencies(name):
     return {k: v for k, v in deps.items() if 'fetchcontent_path' in v}
 
 
-def download_file_as_string(filename):
+def cached_query(key, func):
     '''
-    Downloads a file and returns it as a string
+    Returns func(), cached under key for QUERY_CACHE_TTL seconds.
+    None results aren't cached, so failures are retried.
+    '''
+    if QUERY_CACHE_TTL <= 0:
+        return func()
+    # Another environment can have other credentials, and see other repos
+    key = (getattr(_thread_state, 'env_key', None), key)
+
+    with _query_cache_lock:
+        hit = _query_cache.get(key)
+    if hit and time.monotonic() - hit[0] < QUERY_CACHE_TTL:
+        metrics.inc('cache_requests', cache='query', result='hit')
+        return hit[1]
+
+    metrics.inc('cache_requests', cache='query', result='miss')
+    result = func()
+    if result is not None:
+        with _query_cache_lock:
+            _query_cache[key] = (time.monotonic(), result)
+    return result
+
+
+def set_query_cache_ttl(seconds):
+    global QUERY_CACHE_TTL
+    QUERY_CACHE_TTL = seconds
+    with _query_cache_lock:
+        _query_cache.clear()
+
+
+def http_error_info(error):
+    '''
+    The status of urllib's HTTPError, and whether GitHub throttled the request, see metrics.is_throttled()
     '''
-    result = ""
+    code = getattr(error, 'code', None)
+    if not isinstance(code, int):
+        return {}
     try:
-        with urllib.request.urlopen(filename) as response:
-            result = response.read().decode('utf-8')
-    except Exception as e:
-        exit_because(f"Failed to download {filename}: {e}")
+        body = error.read(64 * 1024) if code == 403 else b''
+    except Exception:
+        body = b''
+    return {'status': code, 'throttled': metrics.is_throttled(code, getattr(error, 'headers', None), body)}
 
-    return result
+
+def download_file_as_string(filename, fatal=True):
+    '''
+    Downloads a file and returns it as a string
+    If fatal is False, returns None on failure instead of exiting
+    '''
+    def fetch():
+        import urllib.request
+        with observed('http', filename) as span:
+            try:
+                with urllib.request.urlopen(filename) as response:
+                    body = response.read()
+                    span.update(status=response.status, bytes=len(body))
+                    return {'body': body.decode('utf-8')}
+            except Exception as e:
+                span.update(error=str(e), **http_error_info(e))
+                return {'error': str(e)}
+
+    def download():
+        result = recorded('http', filename, fetch)
+        if 'error' in result:
+            if fatal:
+                exit_because(f"Failed to download {filename}: {result['error']}")
+            print(f"Failed to download {filename}: {result['error']}")
+            return None
+        return result['body']
+
+    return cached_query(('url', filename), download)
+
+
+def get_url_sha256(url, chunk_size=1024 * 1024):
+    '''
+    Streams a URL through sha256 without storing it.
+    Returns the hex digest, or None if the download failed.
+    '''
+    def digest():
+        import hashlib
+        import urllib.request
+        sha256 = hashlib.sha256()
+        with observed('http', url) as span:
+            span['bytes'] = 0
+            try:
+                with urllib.request.urlopen(url) as response:
+                    span['status'] = response.status
+                    while True:
+                        chunk = response.read(chunk_size)
+                        if not chunk:
+                            break
+                        sha256.update(chunk)
+                        span['bytes'] += len(chunk)
+            except Exception as e:
+                span.update(error=str(e), **http_error_info(e))
+                print(f"Failed to download {url}: {e}")
+                return None
+
+        return sha256.hexdigest()
+
+    return recorded('http_sha256', url, digest)
 
 
 def get_correct_repo_case(repo_name):
@@ -147,23 +356,55 @@ def tag_for_version(proj_name, version):
     return f"{proj['tag_prefix']}{version}"
 
 
-def create_tarball_with_submodules(proj_name, sha1, version):
+def checkout_sha1(proj_name, sha1, clone_dir, submodules=True):
     '''
-    Create a release tarball including submodules.
-    Some of our projects depend on unpopular submodules which aren't packaged anywhere.
+    Clones the project into clone_dir and checks out sha1, with its submodules unless told otherwise
     '''
+    from pipeline import resource
 
-    with tempfile.TemporaryDirectory() as temp_dir:
-        clone_dir = f"{temp_dir}/{proj_name.lower()}-{version}"
-        if not run_command(f"git clone https://github.com/KDAB/{proj_name} {clone_dir}", fatal=False):
+    with resource('network'):
+        if not run_command(f"git clone {GITHUB_GIT_URL}/KDAB/{proj_name} {clone_dir}", fatal=False):
             return False
         if not run_command(f"git -C {clone_dir} checkout {sha1}", fatal=False):
             return False
-        if not run_command(f"git -C {clone_dir} submodule update --init --recursive", fatal=False):
+        if submodules and not run_command(f"git -C {clone_dir} submodule update --init --recursive", fatal=False):
+            return False
+    if metrics.ENABLED:
+        metrics.inc('clone_bytes', _directory_size(clone_dir), project=proj_name)
+    return True
+
+
+def create_tarball_with_submodules(proj_name, sha1, version, work_dir=None):
+    '''
+    Create a release tarball including submodules.
+    Some of our projects depend on unpopular submodules which aren't packaged anywhere.
+    The tarball is written to work_dir, or the current directory.
+    '''
+    import tempfile
+    from pipeline import resource
+
+    with resource('tarball'), tempfile.TemporaryDirectory() as temp_dir:
+        clone_dir = f"{temp_dir}/{proj_name.lower()}-{version}"
+        if not checkout_sha1(proj_name, sha1, clone_dir):
             return False
-        return run_command(
-            f"tar --exclude='.git' -C {temp_dir} -czvf {proj_name.lower()}-{version}.tar.gz {proj_name.lower()}-{version}",
-            fatal=False)
+
+        tarball = f"{proj_name.lower()}-{version}.tar.gz"
+        with metrics.timer('tarball_duration_seconds', project=proj_name):
+            ok = run_command(f"tar --exclude='.git' -C {temp_dir} -czvf {tarball} {proj_name.lower()}-{version}",
+                             fatal=False, cwd=work_dir)
+        if ok and metrics.ENABLED:
+            metrics.inc('tarball_bytes', os.path.getsize(os.path.join(work_dir or '.', tarball)), project=proj_name)
+        return ok
+
+
+def _directory_size(path):
+    total = 0
+    for root, _, files in os.walk(path):
+        for filename in files:
+            filename = os.path.join(root, filename)
+            if not os.path.islink(filename):
+                total += os.path.getsize(filename)
+    return total
 
 
 def clone_repo(repo, callback):
@@ -171,6 +412,7 @@ def clone_repo(repo, callback):
     Clones repo into a temporary directory.
     Executes callback and deletes directory.
     '''
+    import tempfile
     with tempfile.TemporaryDirectory() as temp_dir:
         if run_command_silent(f"git clone {repo} {temp_dir}"):
             return callback(temp_dir)
@@ -5,22 +5,43 @@
 
 # Scripts related to vcpkg
 
-import requests
 import json
 import argparse
 import sys
+from utils import cached_query, observed, recorded, GITHUB_RAW_URL
+
+_session = None
+
+
+def get_session():
+    """Returns a shared requests session, so connections are reused across queries."""
+    global _session
+    import requests
+    if _session is None:
+        _session = requests.Session()
+    return _session
 
 
 def fetch_vcpkg_port_vcpkg_json_file(port_name, vcpkg_repo="microsoft/vcpkg", vcpkg_branch="master"):
     """Fetches the vcpkg.json file for a port and returns its content."""
-    url = f"https://raw.githubusercontent.com/{vcpkg_repo}/refs/heads/{vcpkg_branch}/ports/{port_name}/vcpkg.json"
-    try:
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()  # Raise an exception for HTTP errors
-        return response.text
-    except requests.RequestException as e:
-        print(f"Error fetching JSON: {e}")
-        return None
+    url = f"{GITHUB_RAW_URL}/{vcpkg_repo}/refs/heads/{vcpkg_branch}/ports/{port_name}/vcpkg.json"
+
+    def fetch():
+        import metrics
+        import requests
+        with observed('http', url) as span:
+            try:
+                response = get_session().get(url, timeout=10)
+                span.update(status=response.status_code, bytes=len(response.content),
+                            throttled=metrics.is_throttled(response.status_code, response.headers, response.content))
+                response.raise_for_status()  # Raise an exception for HTTP errors
+                return response.text
+            except requests.RequestException as e:
+                span['error'] = str(e)
+                print(f"Error fetching JSON: {e}")
+                return None
+
+    return cached_query(('url', url), lambda: recorded('http', url, fetch))
 
 
 def extract_version_from_vcpkg_json_file_content(vcpks_json_content):
@@ -41,7 +62,7 @@ def get_latest_version_in_vcpkg(port_name, vcpkg_repo="microsoft/vcpkg", vcpkg_b
         return version
 
 
-if __name__ == "__main__":
+def main(argv=None):
     parser = argparse.ArgumentParser()
     parser.add_argument('--get-latest-vcpkg-version', type=str, metavar='PORT_NAME',
                         help="returns latest vcpkg version for a port")
@@ -49,14 +70,19 @@ if __name__ == "__main__":
                         help="The vcpkg repository (optional, default: 'microsoft/vcpkg').")
     parser.add_argument('--vcpkg-branch', type=str, metavar='VCPKG_BRANCH', default="master",
                         help="The branch of the vcpkg repository (optional, default: 'master').")
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     if args.get_latest_vcpkg_version:
         ret = get_latest_version_in_vcpkg(args.get_latest_vcpkg_version, args.vcpkg_repository, args.vcpkg_branch)
         if ret is None:
-            sys.exit(1)
+            return 1
         print(ret)
-        sys.exit(0)
+        return 0
 
     parser.print_help()
-    sys.exit(1)
+    return 1
+
+
+if __name__ == "__main__":
+    import ci_release_tools
+    sys.exit(ci_release_tools.run('vcpkg_utils', sys.argv[1:], main))
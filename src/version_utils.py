@@ -4,8 +4,7 @@
 # SPDX-License-Identifier: MIT
 
 import re
-from utils import download_file_as_string, get_project
-from packaging import version
+from utils import download_file_as_string, get_project, GITHUB_RAW_URL
 import argparse
 import sys
 
@@ -45,7 +44,7 @@ def get_version_in_versiontxt(project_name, sha1):
     KD* projects compatible with release-plz have a version.txt which is read by CMakeLists.txt
     All projects are encouraged to port to this way as it's easier for tooling.
     '''
-    filename = f"https://raw.githubusercontent.com/KDAB/{project_name}/{sha1}/version.txt"
+    filename = f"{GITHUB_RAW_URL}/KDAB/{project_name}/{sha1}/version.txt"
     file_contents = download_file_as_string(filename)
     return file_contents.strip()
 
@@ -76,6 +75,7 @@ def has_newer_version(version_in_use, latest_version):
     This function expects that latest_version is greater or equal than version_in_use.
     If this is not true, this function raises ValueError.
     """
+    from packaging import version
     version_in_use_parsed = version.parse(version_in_use)
     latest_version_parsed = version.parse(latest_version)
     if version_in_use_parsed < latest_version_parsed:
@@ -85,7 +85,7 @@ def has_newer_version(version_in_use, latest_version):
     else:
         raise ValueError(f"Error: Version {version_in_use} is greater than {latest_version}.")
 
-if __name__ == "__main__":
+def main(argv=None):
     parser = argparse.ArgumentParser()
     parser.add_argument(
         "--has-newer-version",
@@ -93,7 +93,7 @@ if __name__ == "__main__":
         metavar=("VERSION_IN_USE", "LATEST_VERSION"),
         help="Check if VERSION_IN_USE is less than LATEST_VERSION.",
     )
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     if args.has_newer_version:
         version_in_use, latest_version = args.has_newer_version
@@ -101,13 +101,18 @@ if __name__ == "__main__":
             result = has_newer_version(version_in_use, latest_version)
             if result:
                 print("true")
-                sys.exit(0)
+                return 0
             else:
                 print("false")
-                sys.exit(0)
+                return 0
         except ValueError as e:
             print(e)
-            sys.exit(1)
+            return 1
 
     parser.print_help()
-    sys.exit(1)
+    return 1
+
+
+if __name__ == "__main__":
+    import ci_release_tools
+    sys.exit(ci_release_tools.run('version_utils', sys.argv[1:], main))
@@ -3,6 +3,46 @@
 # SPDX-FileCopyrightText: 2024 Klarälvdalens Datakonsult AB, a KDAB Group company <info@kdab.com>
 # SPDX-License-Identifier: MIT
 
+import os
 import sys
 from pathlib import Path
+import pytest
 sys.path.append(str(Path(__file__).parent.parent / "src"))
+
+import cassette  # noqa: E402
+
+CASSETTES = Path(__file__).parent / "cassettes"
+
+
+@pytest.fixture
+def recorded(request, monkeypatch):
+    '''
+    Replays tests/cassettes/<test>.json, so the test needs no network.
+    When it isn't recorded yet, or with CI_RELEASE_TOOLS_RECORD_CASSETTES=1, runs the test against
+    GitHub and records it there instead.
+    '''
+    path = CASSETTES / f"{request.node.name}.json"
+    mode = cassette.RECORD if os.getenv("CI_RELEASE_TOOLS_RECORD_CASSETTES") == '1' or not path.exists() \
+        else cassette.REPLAY
+
+    monkeypatch.setenv("CI_RELEASE_TOOLS_CASSETTE", str(path))
+    monkeypatch.setenv("CI_RELEASE_TOOLS_CASSETTE_MODE", mode)
+    current = cassette.current()
+    yield current
+    # A failed recording, without network for example, would replay as a failure
+    if mode == cassette.RECORD:
+        if request.node.stash.get(CALL_PASSED, False):
+            current.save()
+        else:
+            current.discard()
+
+
+CALL_PASSED = pytest.StashKey[bool]()
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    outcome = yield
+    report = outcome.get_result()
+    if report.when == 'call':
+        item.stash[CALL_PASSED] = report.passed
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: 2026 Klarälvdalens Datakonsult AB, a KDAB Group company <info@kdab.com>
+# SPDX-License-Identifier: MIT
+
+import json
+import tempfile
+import pytest
+import cassette
+import gh_utils
+import utils
+import version_utils
+from changelog_utils import get_changelog
+
+KDSME_SHA1 = "cfc67509d244feb9057a0941b7e7626d95cd2169"
+
+# Made up, to test replaying. tests/cassettes/ has the real recordings, see conftest.py.
+KDSME_INTERACTIONS = [
+    {'kind': 'http',
+     'request': f"https://raw.githubusercontent.com/KDAB/KDStateMachineEditor/{KDSME_SHA1}/CHANGES",
+     'response': {'body': "Version 2.1.0:\n--------------\n"
+                          "* KDStateMachineEditor now looks for Qt6 by default, rather than Qt5.\n\n"
+                          "Version 2.0.0:\n--------------\n* Qt6 support\n"}},
+    {'kind': 'http',
+     'request': f"https://raw.githubusercontent.com/KDAB/KDStateMachineEditor/{KDSME_SHA1}/version.txt",
+     'response': {'body': "2.1.0\n"}},
+    {'kind': 'command_output',
+     'request': "gh release list --repo KDAB/KDStateMachineEditor --limit 1",
+     'response': "KDStateMachineEditor 2.1.0\tLatest\tv2.1.0\t2025-03-12T10:21:03Z\n"},
+]
+
+
+def use_cassette(monkeypatch, path, mode=cassette.REPLAY):
+    monkeypatch.setenv("CI_RELEASE_TOOLS_CASSETTE", str(path))
+    monkeypatch.setenv("CI_RELEASE_TOOLS_CASSETTE_MODE", mode)
+    return cassette.current()
+
+
+def kdsme_cassette(tmp_path):
+    path = tmp_path / "kdstatemachineeditor.json"
+    path.write_text(json.dumps({'interactions': KDSME_INTERACTIONS}))
+    return path
+
+
+def test_replay_kdstatemachineeditor(monkeypatch, tmp_path):
+    use_cassette(monkeypatch, kdsme_cassette(tmp_path))
+
+    changelog = get_changelog("KDStateMachineEditor", "2.1.0", KDSME_SHA1)
+    assert changelog.startswith("* KDStateMachineEditor now looks for Qt6 by default")
+    assert get_changelog("KDStateMachineEditor", "9999.0.0", KDSME_SHA1) == ""
+
+    assert version_utils.get_current_version_in_cmake("KDStateMachineEditor", KDSME_SHA1) == "2.1.0"
+    assert gh_utils.get_latest_release_tag_in_github(
+        "KDAB/KDStateMachineEditor", None, None) == "v2.1.0"
+
+
+def test_replay_miss_is_an_error(monkeypatch, tmp_path):
+    use_cassette(monkeypatch, kdsme_cassette(tmp_path))
+
+    with pytest.raises(cassette.CassetteMiss):
+        utils.run_command_silent("git fetch --tags")
+
+
+def test_record_then_replay(monkeypatch, tmp_path):
+    path = tmp_path / "cassette.json"
+    recording = use_cassette(monkeypatch, path, cassette.RECORD)
+    assert utils.run_command_with_output("echo first") == "first\n"
+    assert utils.run_command_silent("exit 3") is False
+    recording.save()
+
+    interactions = json.loads(path.read_text())['interactions']
+    assert [(i['kind'], i['request'], i['response']) for i in interactions] == [
+        ('command_output', 'echo first', 'first\n'),
+        ('command', 'exit 3', False)]
+
+    # Edit the recording, to prove that replay doesn't run anything
+    interactions[0]['response'] = "replayed\n"
+    path.write_text(json.dumps({'interactions': interactions}))
+
+    use_cassette(monkeypatch, path, cassette.REPLAY)
+    assert utils.run_command_with_output("echo first") == "replayed\n"
+    assert utils.run_command_silent("exit 3") is False
+
+
+def test_requests_are_portable(monkeypatch, tmp_path):
+    recording = use_cassette(monkeypatch, tmp_path / "cassette.json", cassette.RECORD)
+    utils.run_command_silent(f"git -C {cassette.ROOT_DIR}/tests/submodules/knut describe --tags")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        utils.run_command_silent(f"git clone -q {temp_dir}/missing {temp_dir}/clone")
+    assert [i['request'] for i in recording.interactions] == [
+        "git -C <root>/tests/submodules/knut describe --tags", "git clone -q <tmp>/missing <tmp>/clone"]
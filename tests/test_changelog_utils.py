@@ -6,7 +6,7 @@
 from changelog_utils import get_changelog
 
 
-def test_get_kdstatemachineeditor_changelog():
+def test_get_kdstatemachineeditor_changelog(recorded):
     """
     Test getting changelog for KDStateMachineEditor
     Using a known SHA and version to verify the changelog retrieval works correctly
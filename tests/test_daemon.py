@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: 2026 Klarälvdalens Datakonsult AB, a KDAB Group company <info@kdab.com>
+# SPDX-License-Identifier: MIT
+
+import os
+import threading
+import time
+
+import pytest
+
+import utils
+
+import daemon
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    '''
+    A daemon on a socket in tmp_path, with a fake gh which logs the dir it's run in to gh.log,
+    and its GH_TOKEN to tokens.log
+    '''
+    bin_dir = tmp_path / 'bin'
+    bin_dir.mkdir()
+    gh = bin_dir / 'gh'
+    gh.write_text(f"#!/bin/sh\npwd >> {tmp_path / 'gh.log'}\n"
+                  f"echo \"${{GH_TOKEN:-none}}\" >> {tmp_path / 'tokens.log'}\n"
+                  "printf 'KDReports 2.3.0\\tLatest\\tkdreports-2.3.0\\t2025-01-01T00:00:00Z\\n'\n")
+    gh.chmod(0o755)
+    monkeypatch.setenv('PATH', f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+    monkeypatch.setenv('CI_RELEASE_TOOLS_SOCKET', str(tmp_path / 'daemon.sock'))
+    monkeypatch.setenv('GH_TOKEN', 'daemon-token')
+    monkeypatch.delenv('CI_RELEASE_TOOLS_CASSETTE', raising=False)
+
+    instance = daemon.create_server(daemon.socket_path(), 60)
+
+    def serve():
+        while not instance.should_stop:
+            instance.handle_request()
+
+    thread = threading.Thread(target=serve)
+    thread.start()
+    utils.set_query_cache_ttl(60)
+    yield tmp_path
+    utils.set_query_cache_ttl(0)
+    daemon.send_request({'command': 'stop'})
+    thread.join()
+    instance.server_close()
+
+
+def gh_calls(tmp_path):
+    log = tmp_path / 'gh.log'
+    return log.read_text().splitlines() if log.exists() else []
+
+
+def query(argv, cwd, env=None):
+    return daemon.send_request({'script': 'gh_utils', 'argv': argv, 'cwd': str(cwd), 'env': env or {}}, timeout=30)
+
+
+def test_cached_query(server):
+    caller_dir = server / 'caller'
+    caller_dir.mkdir()
+    for _ in range(2):
+        assert query(['--get-latest-release=KDAB/KDReports'], caller_dir) == \
+            {'exit_code': 0, 'output': 'kdreports-2.3.0\n'}
+    # Answered from the cache the second time, gh ran in the caller's dir, not the daemon's
+    assert gh_calls(server) == [str(caller_dir)]
+    assert os.getcwd() != str(caller_dir)
+
+
+def test_cache_expires(server):
+    utils.set_query_cache_ttl(0.5)
+    assert query(['--get-latest-release=KDAB/KDReports'], server)['exit_code'] == 0
+    time.sleep(1)
+    assert query(['--get-latest-release=KDAB/KDReports'], server)['exit_code'] == 0
+    assert len(gh_calls(server)) == 2
+
+
+def test_not_a_query(server):
+    assert 'error' in query(['--test-tarball', 'KDReports'], server)
+    assert 'error' in daemon.send_request({'script': 'update_dependencies', 'cwd': str(server),
+                                           'argv': ['--print-dependency-versions', '--proj-name', 'KDReports']})
+    assert gh_calls(server) == []
+
+
+def test_caller_credentials(server):
+    for token in ('alice-token', 'alice-token', 'bob-token'):
+        assert query(['--get-latest-release=KDAB/KDReports'], server, {'GH_TOKEN': token})['exit_code'] == 0
+    assert query(['--get-latest-release=KDAB/KDReports'], server)['exit_code'] == 0
+    # Cached per caller's credentials, never the daemon's own
+    assert (server / 'tokens.log').read_text().split() == ['alice-token', 'bob-token', 'none']
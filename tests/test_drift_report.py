@@ -0,0 +1,19 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: 2026 Klarälvdalens Datakonsult AB, a KDAB Group company <info@kdab.com>
+# SPDX-License-Identifier: MIT
+
+from drift_report import drift_status
+
+
+def test_drift_status():
+    assert drift_status('2.1.0', '2.1.0') == 'up-to-date'
+    assert drift_status('2.0.0', '2.1.0') == 'behind'
+    assert drift_status('2.2.0', '2.1.0') == 'ahead'
+    assert drift_status(None, '2.1.0') == 'missing'
+    assert drift_status('2.1.0', None) == 'unknown'
+
+
+def test_unparsable_versions_are_unknown():
+    assert drift_status('2.1.0-custom+weird version', '2.1.0') == 'unknown'
+    assert drift_status('2.1.0', 'latest') == 'unknown'
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: 2026 Klarälvdalens Datakonsult AB, a KDAB Group company <info@kdab.com>
+# SPDX-License-Identifier: MIT
+
+import shutil
+import subprocess
+import threading
+import pytest
+from gpg_utils import GpgError, GpgSession, parse_status
+from pipeline import set_resource_limits
+
+TEST_KEY = "Test Key <test@example.com>"
+
+
+@pytest.fixture
+def keyring(tmp_path):
+    '''
+    A throwaway GNUPGHOME with a passphrase-less signing key
+    '''
+    if not shutil.which('gpg'):
+        pytest.skip("gpg is not installed")
+
+    homedir = tmp_path / 'gnupg'
+    homedir.mkdir(mode=0o700)
+    subprocess.run(['gpg', '--homedir', str(homedir), '--batch', '--passphrase', '',
+                    '--quick-gen-key', TEST_KEY, 'ed25519', 'sign', 'never'],
+                   check=True, capture_output=True)
+    yield str(homedir)
+    subprocess.run(['gpgconf', '--homedir', str(homedir), '--kill', 'gpg-agent'],
+                   check=False, capture_output=True)
+
+
+def test_parse_status():
+    status = parse_status("[GNUPG:] NEWSIG\n"
+                          "[GNUPG:] GOODSIG 1234 Test Key\n"
+                          "gpg: some noise\n"
+                          "[GNUPG:] VALIDSIG ABCD 2026-01-01 0 4 0 22 8 00 ABCD\n")
+    assert status['GOODSIG'] == [['1234', 'Test', 'Key']]
+    assert status['VALIDSIG'][0][-1] == 'ABCD'
+    assert 'BADSIG' not in status
+
+
+def test_sign_and_verify_many_files(keyring, tmp_path):
+    filenames = [f"file{i}.tar.gz" for i in range(5)]
+    for i, filename in enumerate(filenames):
+        (tmp_path / filename).write_text(f"content {i}")
+
+    session = GpgSession(TEST_KEY, homedir=keyring)
+    signed = session.sign_files(filenames, str(tmp_path))
+    assert all(result.ok for result in signed), signed
+    assert all((tmp_path / f"{filename}.asc").exists() for filename in filenames)
+
+    fingerprints = {result.fingerprint for result in signed}
+    assert len(fingerprints) == 1
+
+    verified = session.verify_files(filenames, str(tmp_path))
+    assert all(result.ok for result in verified), verified
+    assert {result.fingerprint for result in verified} == fingerprints
+    assert fingerprints <= session.key_fingerprints(TEST_KEY)
+    assert session.key_fingerprints("Someone Else <else@example.com>") == set()
+
+
+def test_verify_reports_bad_and_missing_signatures(keyring, tmp_path):
+    (tmp_path / 'good').write_text("good")
+    (tmp_path / 'tampered').write_text("original")
+    (tmp_path / 'unsigned').write_text("unsigned")
+
+    session = GpgSession(TEST_KEY, homedir=keyring)
+    assert all(result.ok for result in session.sign_files(['good', 'tampered'], str(tmp_path)))
+    (tmp_path / 'tampered').write_text("modified")
+
+    good, tampered, unsigned = session.verify_files(['good', 'tampered', 'unsigned'], str(tmp_path))
+    assert good.ok
+    assert not tampered.ok and 'BADSIG' in tampered.error
+    assert not unsigned.ok and 'does not exist' in unsigned.error
+
+
+def test_unknown_signing_key(keyring, tmp_path):
+    (tmp_path / 'file').write_text("content")
+
+    session = GpgSession("Nobody <nobody@example.com>", homedir=keyring)
+    with pytest.raises(GpgError, match="No secret key"):
+        session.sign_files(['file'], str(tmp_path))
+    assert not (tmp_path / 'file.asc').exists()
+
+
+def test_gpg_processes_share_the_resource(keyring, tmp_path):
+    filenames = [f"file{i}.tar.gz" for i in range(6)]
+    for filename in filenames:
+        (tmp_path / filename).write_text(filename)
+    session = GpgSession(TEST_KEY, homedir=keyring, jobs=4)
+    running = []
+    most_running = []
+    lock = threading.Lock()
+    sign = session.backend.sign
+
+    def counted_sign(path):
+        with lock:
+            running.append(path)
+            most_running.append(len(running))
+        try:
+            return sign(path)
+        finally:
+            with lock:
+                running.remove(path)
+
+    session.backend.sign = counted_sign
+    set_resource_limits(gpg=1)
+    try:
+        assert all(result.ok for result in session.sign_files(filenames, str(tmp_path)))
+    finally:
+        set_resource_limits(gpg=None)
+    # One gpg at a time, even with 4 jobs
+    assert max(most_running) == 1
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: 2026 Klarälvdalens Datakonsult AB, a KDAB Group company <info@kdab.com>
+# SPDX-License-Identifier: MIT
+
+import homebrew_utils
+
+FORMULA = '''class Kdbindings < Formula
+  desc "Reactive programming & data binding in C++"
+  homepage "https://github.com/KDAB/KDBindings"
+  url "https://github.com/KDAB/KDBindings/releases/download/v1.0.5/kdbindings-1.0.5.tar.gz"
+  sha256 "1111111111111111111111111111111111111111111111111111111111111111"
+  license "MIT"
+
+  bottle do
+    sha256 cellar: :any_skip_relocation, all: "2222222222222222222222222222222222222222222222222222222222222222"
+  end
+
+  resource "extra" do
+    url "https://example.com/extra-1.0.tar.gz"
+    sha256 "3333333333333333333333333333333333333333333333333333333333333333"
+  end
+end
+'''
+
+
+def test_set_formula_url_and_sha256():
+    '''
+    Tests that only the stable url and sha256 are rewritten
+    '''
+    url = homebrew_utils.release_tarball_url('KDBindings', '1.1.0')
+    assert url == "https://github.com/KDAB/KDBindings/releases/download/v1.1.0/kdbindings-1.1.0.tar.gz"
+
+    new_sha256 = 'a' * 64
+    code = homebrew_utils.set_formula_url_and_sha256(FORMULA, url, new_sha256)
+    assert code.count(new_sha256) == 1
+    assert f'  url "{url}"' in code
+    assert f'  sha256 "{new_sha256}"' in code
+    assert '2222222222222222222222222222222222222222222222222222222222222222' in code
+    assert 'https://example.com/extra-1.0.tar.gz' in code
+    assert '3333333333333333333333333333333333333333333333333333333333333333' in code
+
+    assert homebrew_utils.get_formula_version(FORMULA) == '1.0.5'
+    assert homebrew_utils.get_formula_version(code) == '1.1.0'
+
+    assert homebrew_utils.set_formula_url_and_sha256(
+        'class Foo < Formula\nend\n', url, new_sha256) is None
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: 2026 Klarälvdalens Datakonsult AB, a KDAB Group company <info@kdab.com>
+# SPDX-License-Identifier: MIT
+
+import http.server
+import threading
+
+import pytest
+
+import metrics
+import utils
+from pipeline import Step, run_pipeline
+
+
+@pytest.fixture
+def enabled(monkeypatch):
+    monkeypatch.setattr(metrics, 'ENABLED', True)
+    monkeypatch.setattr(metrics, '_metrics', {})
+
+
+def test_exposition_format(enabled):
+    metrics.inc('github_throttled', host='api.github.com')
+    metrics.inc('github_throttled', 2, host='api.github.com')
+    metrics.set_gauge('dependencies_outdated', 3, project='Knut "2"')
+    metrics.observe('tarball_duration_seconds', 0.2, buckets=(0.1, 1), project='KDSoap')
+    metrics.observe('tarball_duration_seconds', 5, buckets=(0.1, 1), project='KDSoap')
+
+    assert metrics.exposition() == """\
+# TYPE ci_release_tools_dependencies_outdated gauge
+# HELP ci_release_tools_dependencies_outdated Dependencies which can be bumped
+ci_release_tools_dependencies_outdated{project="Knut \\"2\\""} 3
+# TYPE ci_release_tools_github_throttled counter
+# HELP ci_release_tools_github_throttled Requests GitHub answered with 429, or 403 because of a rate limit
+ci_release_tools_github_throttled_total{host="api.github.com"} 3
+# TYPE ci_release_tools_tarball_duration_seconds histogram
+# HELP ci_release_tools_tarball_duration_seconds Time to compress tarballs
+ci_release_tools_tarball_duration_seconds_bucket{project="KDSoap",le="0.1"} 0
+ci_release_tools_tarball_duration_seconds_bucket{project="KDSoap",le="1.0"} 1
+ci_release_tools_tarball_duration_seconds_bucket{project="KDSoap",le="+Inf"} 2
+ci_release_tools_tarball_duration_seconds_sum{project="KDSoap"} 5.2
+ci_release_tools_tarball_duration_seconds_count{project="KDSoap"} 2
+# EOF
+"""
+
+
+def test_commands_pipelines_and_cache(enabled, monkeypatch, tmp_path):
+    monkeypatch.setattr(utils, 'QUERY_CACHE_TTL', 60)
+    monkeypatch.setattr(utils, '_query_cache', {})
+    assert not run_pipeline([Step('ok', lambda: utils.run_command_silent("true")),
+                             Step('fails', lambda: utils.run_command_silent("false"), ['ok'])], name='test')
+    for _ in range(3):
+        utils.cached_query('key', lambda: 'value')
+
+    textfile = tmp_path / 'release.prom'
+    metrics.write_textfile(textfile)
+    text = textfile.read_text()
+    assert 'ci_release_tools_command_duration_seconds_count{program="true",result="ok"} 1' in text
+    assert 'ci_release_tools_command_duration_seconds_count{program="false",result="failed"} 1' in text
+    assert 'ci_release_tools_pipeline_duration_seconds_count{pipeline="test",result="failed"} 1' in text
+    assert 'ci_release_tools_pipeline_step_duration_seconds_count{pipeline="test",status="failed",step="fails"} 1' \
+        in text
+    assert 'ci_release_tools_cache_requests_total{cache="query",result="hit"} 2' in text
+    assert 'ci_release_tools_cache_requests_total{cache="query",result="miss"} 1' in text
+    assert text.endswith('# EOF\n')
+
+
+class ThrottlingHandler(http.server.BaseHTTPRequestHandler):
+    pushed = []
+
+    def do_GET(self):
+        # Only the rate limited one counts, the other is a permission problem
+        self.send_response(403)
+        if self.path.endswith('/CHANGES'):
+            self.send_header('x-ratelimit-remaining', '0')
+        self.end_headers()
+
+    def do_PUT(self):
+        self.pushed.append(self.rfile.read(int(self.headers['Content-Length'])).decode())
+        self.send_response(200)
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+def test_throttling_and_push(enabled):
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), ThrottlingHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}"
+    try:
+        assert utils.download_file_as_string(f"{url}/KDAB/KDSoap/CHANGES", fatal=False) is None
+        assert utils.download_file_as_string(f"{url}/KDAB/private/CHANGES.txt", fatal=False) is None
+        assert metrics.push(f"{url}/metrics/job/ci_release_tools")
+    finally:
+        server.shutdown()
+
+    pushed = ThrottlingHandler.pushed[-1]
+    assert 'ci_release_tools_github_throttled_total{host="127.0.0.1"} 1' in pushed
+    assert 'ci_release_tools_http_request_duration_seconds_count{host="127.0.0.1",status="403"} 2' in pushed
+    assert metrics.is_throttled(429)
+    assert metrics.is_throttled(403, body=b'{"message": "You have exceeded a secondary rate limit."}')
+    assert not metrics.is_throttled(403, {'x-ratelimit-remaining': '4999'})
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: 2026 Klarälvdalens Datakonsult AB, a KDAB Group company <info@kdab.com>
+# SPDX-License-Identifier: MIT
+
+import os
+import subprocess
+
+import utils
+
+import mirror_repos
+
+GIT_ENV = dict(os.environ, GIT_AUTHOR_NAME='test', GIT_AUTHOR_EMAIL='test@kdab.com',
+               GIT_COMMITTER_NAME='test', GIT_COMMITTER_EMAIL='test@kdab.com')
+
+
+def git(*args):
+    return subprocess.run(['git'] + list(args), check=True, capture_output=True, text=True, env=GIT_ENV).stdout
+
+
+def test_plan():
+    listed = {'KDDockWidgets': False, 'KDReports': False, 'old-thing': True, 'new-thing': False}
+    assert mirror_repos.plan(listed, {'KDDockWidgets', 'KDReports', 'old-thing', 'deleted'}) == \
+        (['new-thing'], ['KDDockWidgets', 'KDReports'], ['deleted', 'old-thing'])
+    assert mirror_repos.plan(listed, {'old-thing'}, include_archived=True) == \
+        (['KDDockWidgets', 'KDReports', 'new-thing'], ['old-thing'], [])
+
+
+def test_sync(tmp_path):
+    for repo in ('KDReports', 'KDSoap'):
+        work = tmp_path / 'upstream' / 'KDAB' / repo
+        git('init', '-q', '-b', 'main', str(work))
+        (work / 'CMakeLists.txt').write_text(f"project({repo})\n")
+        git('-C', str(work), 'add', '.')
+        git('-C', str(work), 'commit', '-q', '-m', 'initial')
+        git('-C', str(work), 'update-ref', 'refs/pull/1/head', 'HEAD')
+    mirror_dir = tmp_path / 'mirror'
+    git_url = f"file://{tmp_path / 'upstream'}"
+
+    assert mirror_repos.sync(str(mirror_dir), {'KDAB': {'KDReports': False, 'KDSoap': False}}, git_url, jobs=2)
+    assert mirror_repos.mirrored_repos(str(mirror_dir / 'KDAB')) == {'KDReports', 'KDSoap'}
+
+    # New commits and tags are fetched, deleted repos removed
+    work = tmp_path / 'upstream' / 'KDAB' / 'KDReports'
+    git('-C', str(work), 'commit', '-q', '--allow-empty', '-m', 'second')
+    git('-C', str(work), 'tag', 'v2.3.0')
+    assert mirror_repos.sync(str(mirror_dir), {'KDAB': {'KDReports': False}}, git_url)
+    mirror = str(mirror_dir / 'KDAB' / 'KDReports.git')
+    assert git('-C', mirror, 'rev-parse', 'main', 'v2.3.0') == git('-C', str(work), 'rev-parse', 'main', 'v2.3.0')
+    assert mirror_repos.mirrored_repos(str(mirror_dir / 'KDAB')) == {'KDReports'}
+    # Without the pull requests
+    assert git('-C', mirror, 'for-each-ref', '--format=%(refname)') == "refs/heads/main\nrefs/tags/v2.3.0\n"
+
+    # A mirror cloned with --mirror loses them on its next fetch
+    old_mirror = str(mirror_dir / 'KDAB' / 'KDSoap.git')
+    git('clone', '-q', '--mirror', f"{git_url}/KDAB/KDSoap", old_mirror)
+    assert 'refs/pull/1/head' in git('-C', old_mirror, 'for-each-ref', '--format=%(refname)')
+    assert mirror_repos.sync(str(mirror_dir), {'KDAB': {'KDReports': False, 'KDSoap': False}}, git_url)
+    assert git('-C', old_mirror, 'for-each-ref', '--format=%(refname)') == "refs/heads/main\n"
+    assert git('-C', old_mirror, 'config', '--get-all', 'remote.origin.fetch').split() == \
+        list(mirror_repos.FETCH_REFSPECS)
+
+
+def test_failed_or_partial_listing(tmp_path, monkeypatch):
+    # What gh --paginate gives when a page after the first one fails
+    assert utils.run_command_with_exit_code("echo KDReports; exit 1") == [1, 'KDReports\n']
+    monkeypatch.setattr(mirror_repos, 'run_command_with_exit_code', lambda command: [1, 'KDReports\tfalse\n'])
+    assert mirror_repos.list_repos('KDAB') is None
+    monkeypatch.setattr(mirror_repos, 'run_command_with_exit_code', lambda command: [0, ''])
+    assert mirror_repos.list_repos('KDAB') is None
+    monkeypatch.setattr(mirror_repos, 'run_command_with_exit_code',
+                        lambda command: [0, 'KDReports\tfalse\nold-thing\ttrue\n'])
+    assert mirror_repos.list_repos('KDAB') == {'KDReports': False, 'old-thing': True}
+
+    # A listing missing most of the mirrored repos doesn't remove them
+    org_dir = tmp_path / 'KDAB'
+    repos = [f"repo{i}" for i in range(10)]
+    for repo in repos:
+        (org_dir / f"{repo}.git").mkdir(parents=True)
+    monkeypatch.setattr(mirror_repos, 'fetch_mirror', lambda path: True)
+    assert mirror_repos.sync(str(tmp_path), {'KDAB': {repo: False for repo in repos[:3]}})
+    assert mirror_repos.mirrored_repos(str(org_dir)) == set(repos)
+    assert mirror_repos.sync(str(tmp_path), {'KDAB': {repo: False for repo in repos[:3]}}, max_prune=1)
+    assert mirror_repos.mirrored_repos(str(org_dir)) == set(repos[:3])
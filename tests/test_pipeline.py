@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: 2026 Klarälvdalens Datakonsult AB, a KDAB Group company <info@kdab.com>
+# SPDX-License-Identifier: MIT
+
+import time
+from pipeline import Step, run_pipeline, critical_path, SUCCEEDED, FAILED, SKIPPED
+
+
+def sleeper(seconds, result=True):
+    def func():
+        time.sleep(seconds)
+        return result
+    return func
+
+
+def test_independent_steps_run_concurrently():
+    steps = [Step('ci', sleeper(0.2)),
+             Step('tarball', sleeper(0.3)),
+             Step('changelog', sleeper(0.1)),
+             Step('tag', sleeper(0.05), ['ci', 'tarball', 'changelog'])]
+
+    start = time.monotonic()
+    assert run_pipeline(steps)
+    assert time.monotonic() - start < 0.5
+
+    assert [step.name for step in critical_path(steps)] == ['tarball', 'tag']
+
+
+def test_failure_skips_dependents():
+    steps = [Step('ci', sleeper(0, False)),
+             Step('tarball', sleeper(0)),
+             Step('tag', sleeper(0), ['ci', 'tarball']),
+             Step('release', sleeper(0), ['tag'])]
+
+    assert not run_pipeline(steps)
+    assert [step.status for step in steps] == [FAILED, SUCCEEDED, SKIPPED, SKIPPED]
+
+
+def test_steps_run_commands_in_their_own_dir(tmp_path):
+    from utils import run_command_with_output
+
+    dirs = [tmp_path / str(i) for i in range(8)]
+    outputs = {}
+
+    def pwd(directory):
+        def func():
+            outputs[directory] = run_command_with_output("sleep 0.05; pwd", cwd=str(directory)).strip()
+            return True
+        return func
+
+    for directory in dirs:
+        directory.mkdir()
+    assert run_pipeline([Step(directory.name, pwd(directory)) for directory in dirs])
+    assert outputs == {directory: str(directory) for directory in dirs}
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: 2026 Klarälvdalens Datakonsult AB, a KDAB Group company <info@kdab.com>
+# SPDX-License-Identifier: MIT
+
+import os
+import shlex
+import threading
+import time
+
+import qt_build
+
+
+def test_presets_inherit_cache_variables():
+    presets = qt_build.load_presets()
+    assert 'base' not in qt_build.buildable_presets(presets)
+
+    static = presets['static']['cacheVariables']
+    assert static['BUILD_SHARED_LIBS'] == 'OFF'
+    assert static['CMAKE_BUILD_TYPE'] == 'RelWithDebInfo'   # from profile
+    assert static['QT_UNITY_BUILD'] == 'ON'                 # from base
+    assert presets['qtbase-only']['cacheVariables']['QT_BUILD_SUBMODULES'] == 'qtbase'
+    assert qt_build.build_dir('/src', 'tsan', presets) == '/src/build-tsan'
+
+
+def test_job_budget():
+    # 64 cores, 256 GiB, 5 sanitizer presets at once
+    assert qt_build.job_budget(5, 64, 256) == {'jobs': 12, 'compile': 12, 'link': 3}
+    # RAM bound: 16 GiB for 2 presets leaves 4 compiles and 1 link each
+    assert qt_build.job_budget(2, 32, 16) == {'jobs': 16, 'compile': 4, 'link': 1}
+    assert qt_build.job_budget(8, 4, 1) == {'jobs': 1, 'compile': 1, 'link': 1}
+
+
+def test_changed_cache_variables(tmp_path):
+    presets = qt_build.load_presets()
+    budget = qt_build.job_budget(1, 8, 32)
+    wanted = qt_build.cache_variables('/src', 'asan', presets, '/opt/qt-asan', budget)
+    assert wanted['CMAKE_EXPORT_COMPILE_COMMANDS'] == 'ON'
+    assert wanted['CMAKE_JOB_POOLS'] == 'compile=8;link=2'
+    assert qt_build.changed_cache_variables(str(tmp_path), wanted) == sorted(wanted)
+
+    lines = ['# This is the CMakeCache file.', '//No help, variable specified on the command line.']
+    lines += [f"{name}:STRING={value}" for name, value in wanted.items()]
+    (tmp_path / 'CMakeCache.txt').write_text('\n'.join(lines).replace('COMMANDS:STRING=ON', 'COMMANDS:BOOL=TRUE'))
+    assert qt_build.changed_cache_variables(str(tmp_path), wanted) == []
+
+    wanted['CMAKE_INSTALL_PREFIX'] = '/opt/other'
+    assert qt_build.changed_cache_variables(str(tmp_path), wanted) == ['CMAKE_INSTALL_PREFIX']
+
+
+def test_swap_in(tmp_path):
+    prefix = tmp_path / 'qt-v6.11.0-asan'
+    (prefix / 'lib').mkdir(parents=True)
+    (tmp_path / 'qt-v6.11.0-asan.staging' / 'bin').mkdir(parents=True)
+    qt_build.swap_in(str(tmp_path / 'qt-v6.11.0-asan.staging'), str(prefix))
+    assert os.listdir(prefix) == ['bin']
+    assert os.listdir(tmp_path) == ['qt-v6.11.0-asan']
+
+
+def test_paths_are_quoted(tmp_path, monkeypatch):
+    commands = []
+    monkeypatch.setattr(qt_build, 'run_command', lambda command, **kwargs: commands.append(command) or False)
+    src_dir = str(tmp_path / 'my sources' / 'qt6')
+    assert not qt_build.prepare_source('v6.11.0', src_dir)
+    assert shlex.split(commands[0])[-1] == src_dir
+
+
+def test_parallel_limits_configures(tmp_path, monkeypatch):
+    running = []
+    most_running = []
+    lock = threading.Lock()
+
+    def counted(name):
+        def func(*args, **kwargs):
+            with lock:
+                running.append(name)
+                most_running.append(len(running))
+            time.sleep(0.05)
+            with lock:
+                running.remove(name)
+            return True
+        return func
+
+    monkeypatch.setattr(qt_build, 'prepare_source', lambda qt_tag, src_dir: True)
+    monkeypatch.setattr(qt_build, 'configure', counted('configure'))
+    monkeypatch.setattr(qt_build, 'build_and_install', counted('build'))
+    assert qt_build.build_presets('v6.11.0', str(tmp_path / 'src'), str(tmp_path / 'installed'),
+                                  ['asan', 'tsan', 'debug'], total_jobs=8, ram_gb=32, parallel=1)
+    assert len(most_running) == 6 and max(most_running) == 1
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: 2026 Klarälvdalens Datakonsult AB, a KDAB Group company <info@kdab.com>
+# SPDX-License-Identifier: MIT
+
+import qt_build_telemetry
+
+NINJA_LOG = '''# ninja log v5
+0\t100\t1000\tqtbase/src/corelib/CMakeFiles/Core.dir/global/qglobal.cpp.o\tcafe
+0\t50\t1000\tqtbase/src/corelib/CMakeFiles/Core.dir/Unity/unity_0_cxx.cxx.o\tbeef
+100\t3000\t1000\tqtbase/lib/libQt6Core.so.6.11.0\tf00d
+50\t2000\t1000\tqtsvg/src/svg/CMakeFiles/Svg.dir/qsvghandler.cpp.o\t1234
+3000\t3500\t1000\tqtbase/bin/moc\t5678
+'''
+
+
+def test_ninja_log_and_ccache_log(tmp_path):
+    log = tmp_path / '.ninja_log'
+    log.write_text(NINJA_LOG)
+    before = qt_build_telemetry.read_ninja_log(str(tmp_path))
+    assert len(before) == 5
+    with open(log, 'a', encoding='UTF-8') as f:
+        f.write('0\t90\t2000\tqtbase/bin/moc\t5678\n')
+    after = qt_build_telemetry.read_ninja_log(str(tmp_path))
+    assert qt_build_telemetry.rebuilt_outputs(before, after) == ['qtbase/bin/moc']
+
+    ccache_log = tmp_path / 'ccache.log'
+    ccache_log.write_text('# a.cpp\ndirect_cache_hit\n# b.cpp\ncache_miss\n# c.cpp\npreprocessed_cache_hit\n')
+    assert qt_build_telemetry.read_ccache_log(str(ccache_log)) == (2, 1)
+
+
+def test_analyze_and_regressions(tmp_path):
+    (tmp_path / '.ninja_log').write_text(NINJA_LOG)
+    entries = qt_build_telemetry.read_ninja_log(str(tmp_path))
+    report = qt_build_telemetry.analyze(entries, list(entries))
+
+    assert report['wall_seconds'] == 3.5
+    assert list(report['modules']) == ['qtbase', 'qtsvg']
+    assert report['modules']['qtbase'] == {'seconds': 3.55, 'outputs': 4}
+    assert report['targets']['Core'] == {'seconds': 0.15, 'outputs': 2}
+    assert report['slowest_compiles'][0]['output'].endswith('qsvghandler.cpp.o')
+    assert [link['output'] for link in report['slowest_links']] == ['qtbase/lib/libQt6Core.so.6.11.0',
+                                                                    'qtbase/bin/moc']
+    # moc started when libQt6Core finished, which started when qglobal.cpp.o finished
+    assert report['critical_path'] == {'seconds': 3.5, 'outputs': [
+        'qtbase/src/corelib/CMakeFiles/Core.dir/global/qglobal.cpp.o', 'qtbase/lib/libQt6Core.so.6.11.0',
+        'qtbase/bin/moc']}
+
+    previous = dict(report, full_build=True)
+    slower = dict(report, full_build=True, modules=dict(report['modules'], qtsvg={'seconds': 100, 'outputs': 1}))
+    assert qt_build_telemetry.regressions(previous, slower) == [('qtsvg', 1.95, 100)]
+    assert qt_build_telemetry.regressions(dict(previous, full_build=False), slower) == []
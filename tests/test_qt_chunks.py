@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: 2026 Klarälvdalens Datakonsult AB, a KDAB Group company <info@kdab.com>
+# SPDX-License-Identifier: MIT
+
+import http.server
+import json
+import os
+import random
+import threading
+import time
+from datetime import datetime, timezone
+
+import pytest
+
+import qt_chunks
+import qt_index
+
+
+def test_chunks_survive_insertions():
+    data = random.Random(1).randbytes(2 * 1024 * 1024)
+    edited = data[:1_000_000] + b'inserted' + data[1_000_000:]
+    chunks = {data[start:end] for start, end in qt_chunks.chunk_offsets(data)}
+    edited_chunks = {edited[start:end] for start, end in qt_chunks.chunk_offsets(edited)}
+
+    assert all(qt_chunks.MIN_CHUNK_SIZE <= len(chunk) <= qt_chunks.MAX_CHUNK_SIZE for chunk in list(chunks)[:-1])
+    # Only the chunk with the insertion differs
+    assert len(edited_chunks - chunks) == 1
+    assert qt_chunks.coalesce([('a', ['p1', 100, 10, 20]), ('b', ['p1', 0, 50, 80]), ('c', ['p2', 0, 5, 5])],
+                              gap=50) == [('p1', 0, 110, [('b', 0, 50), ('a', 100, 10)]), ('p2', 0, 5, [('c', 0, 5)])]
+
+
+def make_install(root, flavor):
+    rng = random.Random(2)
+    (root / 'include' / 'QtCore').mkdir(parents=True)
+    (root / 'include' / 'QtCore' / 'qglobal.h').write_bytes(rng.randbytes(300_000))
+    (root / 'lib').mkdir()
+    (root / 'lib' / 'libQt6Core.so.6.11.0').write_bytes(random.Random(flavor).randbytes(100_000))
+    (root / 'lib' / 'libQt6Core.so.6').symlink_to('libQt6Core.so.6.11.0')
+    (root / 'bin').mkdir()
+    (root / 'bin' / 'qmake').write_text('#!/bin/sh\n')
+    (root / 'bin' / 'qmake').chmod(0o755)
+
+
+@pytest.fixture
+def release(tmp_path):
+    '''
+    Serves tmp_path/release, with Range support
+    '''
+    served = tmp_path / 'release'
+    served.mkdir()
+    requests = []
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            path = served / self.path.lstrip('/')
+            requests.append((self.path, self.headers.get('Range')))
+            if not path.exists():
+                self.send_error(404)
+                return
+            body = path.read_bytes()
+            if self.headers.get('Range'):
+                start, end = self.headers['Range'].split('=')[1].split('-')
+                body = body[int(start):int(end) + 1]
+                self.send_response(206)
+            else:
+                self.send_response(200)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    httpd = http.server.ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield served, f"http://127.0.0.1:{httpd.server_port}", requests
+    httpd.shutdown()
+
+
+def test_publish_and_extract(release, tmp_path):
+    served, url, requests = release
+    index = {}
+    for preset in ('asan', 'tsan'):
+        make_install(tmp_path / preset, preset)
+        qt_chunks.build_assets(str(tmp_path / preset), f"qt-{preset}", index, str(served), jobs=2)
+    # The header is stored once
+    assert len([name for name in os.listdir(served) if name.endswith('.pack')]) == 2
+
+    cache_dir = tmp_path / 'cache'
+    dest = tmp_path / 'Qt' / 'qt-asan'
+    assert qt_chunks.extract_chunked(f"{url}/qt-asan.tar.zst", str(dest), str(cache_dir))
+    assert (dest / 'include' / 'QtCore' / 'qglobal.h').read_bytes() == \
+        (tmp_path / 'asan' / 'include' / 'QtCore' / 'qglobal.h').read_bytes()
+    assert os.readlink(dest / 'lib' / 'libQt6Core.so.6') == 'libQt6Core.so.6.11.0'
+    assert os.access(dest / 'bin' / 'qmake', os.X_OK)
+
+    # Only the chunks of tsan's library are missing
+    requests.clear()
+    assert qt_chunks.extract_chunked(f"{url}/qt-tsan.tar.zst", str(tmp_path / 'Qt' / 'qt-tsan'), str(cache_dir))
+    assert (tmp_path / 'Qt' / 'qt-tsan' / 'lib' / 'libQt6Core.so.6.11.0').read_bytes() == \
+        (tmp_path / 'tsan' / 'lib' / 'libQt6Core.so.6.11.0').read_bytes()
+    packs = {path for path, _ in requests if path.endswith('.pack')}
+    assert len(packs) == 1
+
+    assert not qt_chunks.extract_chunked(f"{url}/qt-debug.tar.zst", str(tmp_path / 'Qt' / 'qt-debug'), str(cache_dir))
+
+
+def fake_gh(tmp_path, served):
+    '''
+    A gh which uploads to and deletes from served, refusing to replace an asset without --clobber
+    '''
+    bin_dir = tmp_path / 'bin'
+    bin_dir.mkdir()
+    (bin_dir / 'gh').write_text(f"""#!/bin/sh
+if [ "$2" = delete-asset ]; then rm {served}/$4; exit; fi
+shift 3
+while [ "$1" != --repo ]; do files="$files $1"; shift; done
+if [ "$3" != --clobber ]; then for f in $files; do [ -e {served}/${{f##*/}} ] && exit 1; done; fi
+cp $files {served}/
+""")
+    (bin_dir / 'gh').chmod(0o755)
+    return bin_dir
+
+
+def test_upload_waits_for_the_lock(release, tmp_path, monkeypatch, capsys):
+    served, url, _ = release
+    monkeypatch.setattr(qt_chunks, 'release_url', lambda name: f"{url}/{name}")
+    monkeypatch.setattr(qt_index, 'release_url', lambda name: f"{url}/{name}")
+    monkeypatch.setattr(qt_index, 'LOCK_POLL_SECONDS', 0.1)
+    monkeypatch.setenv('PATH', f"{fake_gh(tmp_path, served)}{os.pathsep}{os.environ['PATH']}")
+
+    # Another upload holds the lock, and publishes its index before releasing it
+    racing = tmp_path / 'racing'
+    racing.mkdir()
+    make_install(tmp_path / 'tsan', 'tsan')
+    qt_chunks.build_assets(str(tmp_path / 'tsan'), 'qt-tsan', {}, str(racing), jobs=2)
+    lock = served / f"{qt_chunks.INDEX_ASSET}{qt_index.LOCK_SUFFIX}"
+    lock.write_text(json.dumps({'holder': 'racing', 'acquired_at': datetime.now(timezone.utc).isoformat()}))
+
+    def finish_racing_upload():
+        time.sleep(0.5)
+        os.rename(racing / qt_chunks.INDEX_ASSET, served / qt_chunks.INDEX_ASSET)
+        lock.unlink()
+
+    make_install(tmp_path / 'asan', 'asan')
+    output_dir = tmp_path / 'output'
+    output_dir.mkdir()
+    filenames = qt_chunks.build_assets(str(tmp_path / 'asan'), 'qt-asan', qt_chunks.read_index(), str(output_dir),
+                                       jobs=2)
+    racing_upload = threading.Thread(target=finish_racing_upload)
+    racing_upload.start()
+    assert qt_chunks.upload(filenames)
+    racing_upload.join()
+
+    assert 'Waiting for racing to finish' in capsys.readouterr().out
+    assert not lock.exists()
+    index = qt_chunks.read_index()
+    for manifest in (served / f"qt-asan{qt_chunks.MANIFEST_SUFFIX}", racing / f"qt-tsan{qt_chunks.MANIFEST_SUFFIX}"):
+        # Chunks both have can be in either pack
+        assert qt_chunks._read_json_gz(manifest.read_bytes())['chunks'].keys() <= index.keys()
+
+    # A lock left behind by an upload which died is broken
+    lock.write_text(json.dumps({'holder': 'dead', 'acquired_at': '2026-01-01T00:00:00+00:00'}))
+    assert qt_chunks.upload(filenames)
+    assert 'breaking the lock of qt-chunks-index.json.gz, held by dead' in capsys.readouterr().out
+    assert not lock.exists()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: 2026 Klarälvdalens Datakonsult AB, a KDAB Group company <info@kdab.com>
+# SPDX-License-Identifier: MIT
+
+import json
+import os
+import random
+import shutil
+import subprocess
+
+import pytest
+
+import qt_delta
+from qt_download import cache_path, PACKAGE_SUFFIX
+from release_plan import file_digests
+
+pytestmark = pytest.mark.skipif(not shutil.which('zstd'), reason="zstd isn't installed")
+
+
+def make_package(tmp_path, served, name, edit):
+    install = tmp_path / name
+    (install / 'include').mkdir(parents=True)
+    (install / 'include' / 'qglobal.h').write_bytes(random.Random(1).randbytes(200_000) + edit)
+    tarball = served / f"{name}{PACKAGE_SUFFIX}"
+    subprocess.run(['tar', '--zstd', '-cf', str(tarball), '-C', str(install), '.'], check=True)
+    return str(tarball)
+
+
+def test_deltas_chain(tmp_path):
+    served = tmp_path / 'release'
+    served.mkdir()
+    tarballs = [make_package(tmp_path, served, f"qt-v6.11.0-beta{i}", b'beta' * i) for i in range(1, 4)]
+    metas = []
+    for base, tarball in zip(tarballs, tarballs[1:]):
+        base_name = os.path.basename(base)[:-len(PACKAGE_SUFFIX)]
+        with open(qt_delta.create_delta(tarball, base, base_name), encoding='UTF-8') as f:
+            metas.append(json.load(f))
+
+    cache_dir = tmp_path / 'cache'
+    beta1 = cache_path(str(cache_dir), file_digests(tarballs[0])['sha256'], PACKAGE_SUFFIX)
+    os.makedirs(os.path.dirname(beta1))
+    shutil.copy(tarballs[0], beta1)
+
+    # beta3's delta is applied to the tar rebuilt from beta2's
+    for tarball, meta in zip(tarballs[1:], metas):
+        dest = tmp_path / 'Qt' / meta['package']
+        assert qt_delta.extract_with_delta(f"file://{tarball}", meta, str(dest), str(cache_dir))
+        assert (dest / 'include' / 'qglobal.h').read_bytes().endswith(b'beta' * (tarballs.index(tarball) + 1))
+        assert os.path.exists(cache_path(str(cache_dir), meta['tar_sha256'], '.tar'))
+
+
+def test_base_bigger_than_window(tmp_path, monkeypatch, capsys):
+    served = tmp_path / 'release'
+    served.mkdir()
+    base, tarball = (make_package(tmp_path, served, f"qt-v6.11.0-beta{i}", b'beta' * i) for i in range(1, 3))
+    monkeypatch.setattr(qt_delta, 'ZSTD_WINDOW_LOG', 16)
+
+    assert qt_delta.create_delta(tarball, base, 'qt-v6.11.0-beta1') is None
+    assert "not making a delta" in capsys.readouterr().out
+    assert not [name for name in os.listdir(served) if name.endswith(qt_delta.DELTA_SUFFIX)]
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: 2026 Klarälvdalens Datakonsult AB, a KDAB Group company <info@kdab.com>
+# SPDX-License-Identifier: MIT
+
+import hashlib
+import http.server
+import io
+import json
+import os
+import tarfile
+import threading
+
+import pytest
+
+import qt_download
+
+
+def make_tarball():
+    content = io.BytesIO()
+    with tarfile.open(fileobj=content, mode='w:gz') as tar:
+        for name, data in (('bin/qmake', b'#!/bin/sh\n'), ('include/QtCore/qglobal.h', os.urandom(200_000))):
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(data))
+    return content.getvalue()
+
+
+@pytest.fixture
+def server(monkeypatch):
+    '''
+    Serves /qt.tar.gz, with Range support, dropping the first connection halfway
+    '''
+    monkeypatch.setattr(qt_download, 'RETRY_DELAY_SECONDS', 0)
+    tarball = make_tarball()
+    state = {'tarball': tarball, 'requests': [], 'drop_once': True}
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            state['requests'].append((self.path, self.headers.get('Range')))
+            if self.path == '/qt.tar.gz.sha256':
+                body = f"{hashlib.sha256(tarball).hexdigest()}  qt.tar.gz\n".encode()
+                self.send_response(200)
+            elif self.path == '/qt.delta.json' and 'delta' in state:
+                body = json.dumps(state['delta']).encode()
+                self.send_response(200)
+            elif self.path == '/qt.tar.gz':
+                start = int(self.headers['Range'].split('=')[1].rstrip('-')) if self.headers.get('Range') else 0
+                body = state['tarball'][start:]
+                self.send_response(206 if start else 200)
+            else:
+                self.send_error(404)
+                return
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            if state['drop_once'] and self.path == '/qt.tar.gz':
+                state['drop_once'] = False
+                self.wfile.write(body[:len(body) // 2])
+                self.close_connection = True
+                return
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    httpd = http.server.ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    state['url'] = f"http://127.0.0.1:{httpd.server_port}/qt.tar.gz"
+    yield state
+    httpd.shutdown()
+
+
+def test_resumes_and_caches(server, tmp_path):
+    dest = tmp_path / 'Qt' / 'qt-v6.11.0-debug'
+    cache_dir = tmp_path / 'cache'
+    assert qt_download.download_and_extract(server['url'], str(dest), cache_dir=str(cache_dir))
+    assert (dest / 'bin' / 'qmake').read_bytes() == b'#!/bin/sh\n'
+    assert not os.path.exists(f"{dest}.partial")
+    # Resumed where the dropped connection stopped
+    ranges = [request_range for path, request_range in server['requests'] if path == '/qt.tar.gz']
+    assert ranges[0] is None and ranges[1] == f"bytes={len(server['tarball']) // 2}-"
+
+    sha256 = hashlib.sha256(server['tarball']).hexdigest()
+    assert (cache_dir / 'sha256' / f"{sha256}.tar.gz").read_bytes() == server['tarball']
+
+    # Cache hit, only the digest is downloaded
+    server['requests'].clear()
+    (dest / 'bin' / 'qmake').unlink()
+    assert qt_download.download_and_extract(server['url'], str(dest), cache_dir=str(cache_dir))
+    assert (dest / 'bin' / 'qmake').exists()
+    assert [path for path, _ in server['requests']] == ['/qt.tar.gz.sha256']
+
+
+def test_digest_mismatch(server, tmp_path):
+    dest = tmp_path / 'qt'
+    assert not qt_download.download_and_extract(server['url'], str(dest), sha256='0' * 64,
+                                                cache_dir=str(tmp_path / 'cache'))
+    assert not dest.exists()
+    assert not os.path.exists(f"{dest}.partial")
+    assert os.listdir(tmp_path / 'cache' / 'sha256') == []
+
+
+def test_delta_without_cached_base(server, tmp_path, capsys):
+    server['delta'] = {'format': 1, 'package': 'qt', 'base': 'qt-v6.11.0-beta2-debug', 'base_sha256': '1' * 64,
+                       'delta': 'qt.from-qt-v6.11.0-beta2-debug.zstpatch', 'delta_sha256': '2' * 64,
+                       'delta_size': 1000, 'full_size': 10000, 'tar_sha256': '3' * 64}
+    dest = tmp_path / 'qt'
+    assert qt_download.download_package(server['url'], str(dest), cache_dir=str(tmp_path / 'cache'))
+    assert "qt-v6.11.0-beta2-debug isn't cached, downloading the full qt" in capsys.readouterr().out
+    assert (dest / 'bin' / 'qmake').exists()
+    assert [path for path, _ in server['requests']] == ['/qt.chunks.json.gz', '/qt.delta.json', '/qt.tar.gz.sha256',
+                                                        '/qt.tar.gz', '/qt.tar.gz']
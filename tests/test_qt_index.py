@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: 2026 Klarälvdalens Datakonsult AB, a KDAB Group company <info@kdab.com>
+# SPDX-License-Identifier: MIT
+
+import hashlib
+import json
+
+import qt_index
+
+
+def entry(package, built_at='2026-03-01T10:00:00+00:00'):
+    qt_version, preset = qt_index.parse_package(package)
+    return {'package': package, 'asset': f"{package}.tar.zst", 'qt_version': qt_version, 'preset': preset,
+            'compressor': 'zstd', 'size': 1, 'sha256': package, 'built_at': built_at, 'patches': ''}
+
+
+def test_resolve():
+    index = {'format': qt_index.INDEX_FORMAT, 'packages': {}}
+    for package in ('qt-v6.11.0-beta2-tsan', 'qt-v6.11.0-tsan', 'qt-v6.11.0-rc-tsan', 'qt-v6.1.3-tsan',
+                    'qt-v6.11.0-asan_ubsan', 'qt-v6.10.2-tsan', 'qt-v6.11.0-qtbase-only'):
+        qt_index.add_entry(index, entry(package))
+
+    assert qt_index.resolve(index, 'latest 6.11 tsan')['package'] == 'qt-v6.11.0-tsan'
+    assert qt_index.resolve(index, 'latest 6.1 tsan')['package'] == 'qt-v6.1.3-tsan'
+    assert qt_index.resolve(index, '6.11.0-beta2 tsan')['package'] == 'qt-v6.11.0-beta2-tsan'
+    assert qt_index.resolve(index, 'latest asan_ubsan')['package'] == 'qt-v6.11.0-asan_ubsan'
+    assert qt_index.resolve(index, 'qt-v6.10.2-tsan')['package'] == 'qt-v6.10.2-tsan'
+    assert qt_index.resolve(index, 'latest 6.12 tsan') is None
+    assert qt_index.resolve(index, 'latest 6.11 qtbase-only')['package'] == 'qt-v6.11.0-qtbase-only'
+    assert qt_index.parse_package('qt-v6.11.0-beta2-qtbase-only') == ('6.11.0-beta2', 'qtbase-only')
+
+    # Uploading again replaces the entry, the latest build wins
+    qt_index.add_entry(index, entry('qt-v6.11.0-tsan', '2026-04-01T10:00:00+00:00'))
+    assert qt_index.resolve(index, 'latest 6.11 tsan')['built_at'] == '2026-04-01T10:00:00+00:00'
+    assert len(index['packages']) == 7
+
+
+def test_package_entry(tmp_path):
+    tarball = tmp_path / 'qt-v6.11.0-beta2-asan_ubsan.tar.gz'
+    tarball.write_bytes(b'not really a tarball')
+    install_dir = tmp_path / 'qt-v6.11.0-beta2-asan_ubsan'
+    (tmp_path / 'qt-v6.11.0-beta2-asan_ubsan.build-report.json').write_text(
+        json.dumps({'format': 1, 'finished_at': '2026-02-03T04:05:06+00:00', 'patches': '0123456789abcdef01234567'}))
+
+    package = qt_index.package_entry(str(tarball), f"{install_dir}/")
+    assert package['package'] == 'qt-v6.11.0-beta2-asan_ubsan'
+    assert package['qt_version'] == '6.11.0-beta2'
+    assert package['preset'] == 'asan_ubsan'
+    assert package['compressor'] == 'gzip'
+    assert package['size'] == len(b'not really a tarball')
+    assert package['sha256'] == hashlib.sha256(b'not really a tarball').hexdigest()
+    assert package['built_at'] == '2026-02-03T04:05:06+00:00'
+    # As built, whatever the patches of this checkout are
+    assert package['patches'] == '0123456789abcdef01234567'
+
+    # Without a build report, the date is the tarball's and the patch set is unknown
+    package = qt_index.package_entry(str(tarball))
+    assert package['patches'] is None
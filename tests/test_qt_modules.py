@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: 2026 Klarälvdalens Datakonsult AB, a KDAB Group company <info@kdab.com>
+# SPDX-License-Identifier: MIT
+
+import subprocess
+
+import qt_modules
+
+GITMODULES = '''[submodule "qtbase"]
+	path = qtbase
+	depends = 
+[submodule "qtsvg"]
+	path = qtsvg
+	depends = qtbase
+[submodule "qtshadertools"]
+	path = qtshadertools
+	depends = qtbase
+[submodule "qtdeclarative"]
+	path = qtdeclarative
+	depends = qtbase
+	recommends = qtshadertools qtsvg
+[submodule "qt5compat"]
+	path = qt5compat
+	depends = qtbase qtdeclarative
+[submodule "qtscxml"]
+	path = qtscxml
+	depends = qtbase qtdeclarative
+'''
+
+
+def test_qt_components(tmp_path):
+    subprocess.run(['git', 'init', '-q', str(tmp_path)], check=True)
+    (tmp_path / 'CMakeLists.txt').write_text('''
+set(KDSME_QT_COMPONENTS Widgets ${EXTRA_COMPONENTS})
+set(EXTRA_COMPONENTS StateMachine)
+# find_package(Qt6 COMPONENTS WebEngineCore)
+find_package(Qt${QT_VERSION_MAJOR} ${QT_MIN_VERSION} CONFIG REQUIRED
+    COMPONENTS Core ${KDSME_QT_COMPONENTS}
+    OPTIONAL_COMPONENTS Quick)
+''')
+    (tmp_path / 'cmake').mkdir()
+    (tmp_path / 'cmake' / 'Test.cmake').write_text('find_package(Qt6Test 6.5 REQUIRED)\n')
+    (tmp_path / 'README.md').write_text('find_package(Qt6 COMPONENTS Charts)\n')
+    subprocess.run(['git', '-C', str(tmp_path), 'add', '-A'], check=True)
+    subprocess.run(['git', '-C', str(tmp_path), '-c', 'user.name=Test', '-c', 'user.email=test@example.com',
+                    'commit', '-qm', 'Initial'], check=True)
+
+    files = qt_modules.cmake_files(str(tmp_path))
+    assert sorted(files) == ['CMakeLists.txt', 'cmake/Test.cmake']
+    assert qt_modules.qt_components(files) == {'Core', 'Widgets', 'StateMachine', 'Quick', 'Test'}
+
+
+def test_minimal_submodules():
+    qt_repos = qt_modules.parse_gitmodules(GITMODULES)
+    assert qt_repos['qtdeclarative'] == {'depends': ['qtbase'], 'recommends': ['qtshadertools', 'qtsvg']}
+    assert qt_modules.with_dependencies(['qt5compat'], qt_repos) == ['qtbase', 'qtdeclarative', 'qt5compat']
+    assert qt_modules.with_dependencies(['qtdeclarative'], qt_repos, recommends=True) == \
+        ['qtbase', 'qtsvg', 'qtshadertools', 'qtdeclarative']
+
+    presets = {'debug': {'cacheVariables': {'QT_BUILD_SUBMODULES': 'qtbase;qtsvg;qtdeclarative;qtscxml'}},
+               'qtbase-only': {'cacheVariables': {'QT_BUILD_SUBMODULES': 'qtbase'}}}
+    components = {'KDReports': {'Widgets', 'PrintSupport', 'Sql'}, 'KDStateMachineEditor': {'Scxml', 'Magic'},
+                  'GammaRay': {'Core5Compat'}}
+    needed, consumers, unknown, per_preset = qt_modules.minimal_submodules(components, qt_repos, presets)
+
+    assert needed == ['qtbase', 'qtdeclarative', 'qt5compat', 'qtscxml']
+    assert consumers['qtbase'] == ['KDReports']
+    assert unknown == ['Magic']
+    # debug doesn't build qt5compat today, and gets no new repos
+    assert per_preset == {'debug': ['qtbase', 'qtdeclarative', 'qtscxml'], 'qtbase-only': ['qtbase']}
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: 2026 Klarälvdalens Datakonsult AB, a KDAB Group company <info@kdab.com>
+# SPDX-License-Identifier: MIT
+
+import os
+import subprocess
+
+import pytest
+
+import qt_build
+import qt_patches
+
+GIT_ENV = dict(os.environ, GIT_AUTHOR_NAME='Test', GIT_AUTHOR_EMAIL='test@example.com',
+               GIT_COMMITTER_NAME='Test', GIT_COMMITTER_EMAIL='test@example.com',
+               GIT_CONFIG_COUNT='1', GIT_CONFIG_KEY_0='protocol.file.allow', GIT_CONFIG_VALUE_0='always')
+
+
+def git(cwd, *args):
+    return subprocess.run(['git'] + list(args), cwd=cwd, env=GIT_ENV, check=True,
+                          capture_output=True, text=True).stdout.strip()
+
+
+def commit_patch(repo, filename, content, patch_path):
+    with open(os.path.join(repo, filename), 'w', encoding='UTF-8') as f:
+        f.write(content)
+    git(repo, 'commit', '-qam', f"Change {filename}")
+    with open(patch_path, 'w', encoding='UTF-8') as f:
+        f.write(git(repo, 'format-patch', '-1', '--stdout') + '\n')
+    git(repo, 'reset', '-q', '--hard', 'HEAD~1')
+
+
+@pytest.fixture
+def qt_checkout(tmp_path):
+    '''
+    A superproject with a qtbase submodule, and two patches for it
+    '''
+    upstream = tmp_path / 'qtbase-upstream'
+    upstream.mkdir()
+    git(upstream, 'init', '-q', '-b', 'dev')
+    (upstream / 'a.cpp').write_text('int a;\n')
+    (upstream / 'b.cpp').write_text('int b;\n')
+    git(upstream, 'add', '-A')
+    git(upstream, 'commit', '-qm', 'Initial')
+
+    patches_dir = tmp_path / 'patches'
+    (patches_dir / 'qtbase').mkdir(parents=True)
+    commit_patch(upstream, 'a.cpp', 'int a = 1;\n', patches_dir / 'qtbase' / '0001-a.patch')
+    commit_patch(upstream, 'b.cpp', 'int b = 2;\n', patches_dir / 'qtbase' / '0002-b.patch')
+
+    src_dir = tmp_path / 'qt5'
+    src_dir.mkdir()
+    git(src_dir, 'init', '-q', '-b', 'dev')
+    git(src_dir, 'submodule', 'add', '-q', str(upstream), 'qtbase')
+    git(src_dir, 'commit', '-qm', 'Add qtbase')
+    return str(src_dir), str(patches_dir)
+
+
+def test_patches_are_applied_then_cached(qt_checkout):
+    src_dir, patches_dir = qt_checkout
+    patches = qt_patches.discover_patches(patches_dir)['qtbase']
+    assert [os.path.basename(p) for p in patches] == ['0001-a.patch', '0002-b.patch']
+
+    assert qt_patches.patch_submodule(src_dir, 'qtbase', patches) == 'applied'
+    patched = git(os.path.join(src_dir, 'qtbase'), 'rev-parse', 'HEAD')
+    assert open(os.path.join(src_dir, 'qtbase', 'b.cpp'), encoding='UTF-8').read() == 'int b = 2;\n'
+
+    git(src_dir, 'submodule', 'update', '-q')  # back to the pinned commit, as a new build would
+    assert qt_patches.patch_submodule(src_dir, 'qtbase', patches) == 'cached'
+    assert git(os.path.join(src_dir, 'qtbase'), 'rev-parse', 'HEAD') == patched
+
+
+def test_unchanged_prepare_keeps_mtimes(qt_checkout, tmp_path, monkeypatch):
+    upstream, patches_dir = qt_checkout
+    git(upstream, 'tag', 'v6.11.0')
+    src_dir = str(tmp_path / 'qt6_ci')
+    git(tmp_path, 'clone', '-q', upstream, src_dir)
+    for key, value in GIT_ENV.items():
+        monkeypatch.setenv(key, value)
+
+    assert qt_build.prepare_source('v6.11.0', src_dir, patches_dir)
+    patched_files = [os.path.join(src_dir, 'qtbase', name) for name in ('a.cpp', 'b.cpp')]
+    for path in patched_files + [os.path.join(src_dir, 'CMakePresets.json')]:
+        os.utime(path, (1000, 1000))
+
+    assert qt_build.prepare_source('v6.11.0', src_dir, patches_dir)
+    assert open(patched_files[1], encoding='UTF-8').read() == 'int b = 2;\n'
+    assert [os.path.getmtime(path) for path in patched_files + [os.path.join(src_dir, 'CMakePresets.json')]] == \
+        [1000] * 3
+
+
+def test_failing_patch_is_reported(qt_checkout):
+    src_dir, patches_dir = qt_checkout
+    with open(os.path.join(patches_dir, 'qtbase', '0003-broken.patch'), 'w', encoding='UTF-8') as f:
+        f.write(open(os.path.join(patches_dir, 'qtbase', '0001-a.patch'), encoding='UTF-8').read()
+                .replace('-int a;', '-int c;'))
+    patches = qt_patches.discover_patches(patches_dir)['qtbase']
+
+    with pytest.raises(qt_patches.PatchError) as error:
+        qt_patches.patch_submodule(src_dir, 'qtbase', patches)
+    assert error.value.patch.endswith('0003-broken.patch')
+    assert 'qtbase/0003-broken.patch failed to apply' in str(error.value)
+    assert not qt_patches.apply_patches(src_dir, patches_dir)
+
+
+def test_shipped_series():
+    # What build.sh applied before qt_patches.py, the other patches are .patch.disabled
+    series = {submodule: [os.path.basename(patch) for patch in patches]
+              for submodule, patches in qt_patches.discover_patches().items()}
+    assert series == {
+        'qtbase': ['0001-fix-ubsan.patch', '0002-disable-fsanitize-float-divide-by-zero.patch',
+                   '0005-WIP-CMake-Pass-fvisibility-default-when-using-fsanit.patch'],
+        'qtdeclarative': ['0001-fix-build-with-UBSAN.patch',
+                          '0003-Fix-undefined-behaviour-when-initializing-TextArea.patch',
+                          '0004-Fix-UB-don-t-static-cast-partially-deleted-base-clas.patch'],
+        'qtshadertools': ['0001-Fix-UBSAN-build-due-to-invalid-down-cast.patch',
+                          '0002-Don-t-build-qsb-with-TSAN.patch'],
+        'qtwayland': ['0001-compositor-Avoid-overflow-for-infiniteRegion.patch'],
+    }
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: 2026 Klarälvdalens Datakonsult AB, a KDAB Group company <info@kdab.com>
+# SPDX-License-Identifier: MIT
+
+import json
+import os
+import tarfile
+
+import cassette
+import release_plan
+
+
+def make_tree(root, mtime):
+    os.makedirs(os.path.join(root, 'src', 'sub'))
+    os.makedirs(os.path.join(root, '.git'))
+    files = {'version.txt': '2.2.1\n', 'src/b.cpp': 'int b;\n', 'src/a.cpp': 'int a;\n',
+             'src/sub/.git': 'gitdir: ../../.git/modules/sub\n', 'src/sub/c.c': 'int c;\n',
+             '.git/HEAD': 'ref: refs/heads/main\n', 'build.sh': '#!/bin/sh\n'}
+    for name, content in files.items():
+        with open(os.path.join(root, name), 'w', encoding='UTF-8') as f:
+            f.write(content)
+    os.chmod(os.path.join(root, 'build.sh'), 0o775)
+    for dirpath, dirnames, filenames in os.walk(root):
+        for name in dirnames + filenames:
+            os.utime(os.path.join(dirpath, name), (mtime, mtime))
+
+
+def test_reproducible_tarball(tmp_path):
+    tarballs = []
+    for i, mtime in enumerate((1_600_000_000, 1_700_000_000)):
+        tree = tmp_path / f"tree{i}"
+        make_tree(tree, mtime)
+        tarballs.append(tmp_path / f"kdsoap-{i}.tar.gz")
+        release_plan.reproducible_tarball(tree, 'kdsoap-2.2.1', tarballs[-1], 1_650_000_000)
+
+    assert tarballs[0].read_bytes() == tarballs[1].read_bytes()
+    assert tarballs[0].read_bytes()[4:8] == b'\0\0\0\0'  # gzip header mtime
+
+    with tarfile.open(tarballs[0]) as tar:
+        members = tar.getmembers()
+    assert [m.name for m in members] == [
+        'kdsoap-2.2.1', 'kdsoap-2.2.1/build.sh', 'kdsoap-2.2.1/src', 'kdsoap-2.2.1/version.txt',
+        'kdsoap-2.2.1/src/a.cpp', 'kdsoap-2.2.1/src/b.cpp', 'kdsoap-2.2.1/src/sub', 'kdsoap-2.2.1/src/sub/c.c']
+    assert all(m.uid == 0 and m.uname == '' and m.mtime == 1_650_000_000 for m in members)
+    assert {m.name: m.mode for m in members}['kdsoap-2.2.1/build.sh'] == 0o755
+    assert {m.name: m.mode for m in members}['kdsoap-2.2.1/version.txt'] == 0o644
+
+
+def test_plan_round_trip_and_tarball_check(tmp_path):
+    tarball = tmp_path / 'kdsoap-2.2.1.tar.gz'
+    tarball.write_bytes(b'tarball content')
+    plan = {'format': release_plan.PLAN_FORMAT, 'project': 'KDSoap', 'version': '2.2.1',
+            'tag': 'kdsoap-2.2.1', 'sha1': 'a' * 40, 'branch': 'master', 'notes': '* Fixes',
+            'tarball': dict({'filename': tarball.name, 'size': tarball.stat().st_size},
+                            **release_plan.file_digests(tarball))}
+
+    loaded = release_plan.load_plan(release_plan.write_plan(plan, tmp_path))
+    assert loaded == plan
+    assert release_plan.check_tarball(loaded, tmp_path)
+
+    tarball.write_bytes(b'tarball c0ntent')
+    assert not release_plan.check_tarball(loaded, tmp_path)
+
+    (tmp_path / release_plan.PLAN_FILENAME).write_text('{"format": 99}')
+    assert release_plan.load_plan(tmp_path / release_plan.PLAN_FILENAME) is None
+
+
+def test_publish_tag_archive(tmp_path, monkeypatch):
+    # Made up, KDReports has no submodules, so GitHub's archive of the tag is published
+    sha1 = 'a' * 40
+    ci_runs = (f"gh api --paginate 'repos/KDAB/KDReports/actions/runs?head_sha={sha1}&per_page=100&"
+               "exclude_pull_requests=true' --jq '.workflow_runs[] | [(.workflow_id // \"\"), (.name // \"\"), "
+               "(.id // \"\"), (.run_attempt // \"\"), (.status // \"\"), (.conclusion // \"\")] | @tsv'")
+    interactions = [
+        ('command_output', f"gh api repos/KDAB/KDReports/compare/master...{sha1} --jq .status", "identical\n"),
+        ('command_output', ci_runs, "1\tCI\t11\t1\tcompleted\tsuccess\n"),
+        ('command', "gh release view kdreports-2.3.1 --repo KDAB/KDReports", False),
+        ('command', "gh api repos/KDAB/KDReports/git/refs/tags/kdreports-2.3.1", False),
+        ('command', f"git -C repos/KDReports tag -a kdreports-2.3.1 {sha1} -m \"KDReports kdreports-2.3.1\"", True),
+        ('command', "git -C repos/KDReports push origin kdreports-2.3.1", True),
+        ('command', "curl -L -o kdreports-2.3.1.tar.gz "
+                    "https://github.com/KDAB/KDReports/archive/refs/tags/kdreports-2.3.1.tar.gz", True),
+        ('command', "tar tzf kdreports-2.3.1.tar.gz", True),
+        ('command', "gh release create kdreports-2.3.1 --repo KDAB/KDReports --title \"Release kdreports-2.3.1\" "
+                    "--notes \"* Fixes\" kdreports-2.3.1.tar.gz", True),
+    ]
+    path = tmp_path / 'cassette.json'
+    path.write_text(json.dumps({'interactions': [{'kind': kind, 'request': request, 'response': response}
+                                                 for kind, request, response in interactions]}))
+    monkeypatch.setenv("CI_RELEASE_TOOLS_CASSETTE", str(path))
+    monkeypatch.setenv("CI_RELEASE_TOOLS_CASSETTE_MODE", cassette.REPLAY)
+    requests = []
+    current = cassette.current()
+    interaction = current.interaction
+    monkeypatch.setattr(current, 'interaction',
+                        lambda kind, request, func: requests.append(request) or interaction(kind, request, func))
+
+    plan = {'format': release_plan.PLAN_FORMAT, 'project': 'KDReports', 'version': '2.3.1',
+            'tag': 'kdreports-2.3.1', 'sha1': sha1, 'branch': 'master', 'notes': '* Fixes',
+            'tarball': release_plan.tag_archive_entry('KDReports', '2.3.1')}
+    assert release_plan.publish_plan(plan, str(tmp_path), 'repos/KDReports', should_sign=False)
+    # The archive is downloaded once the tag is pushed
+    assert requests.index(interactions[6][1]) > requests.index(interactions[5][1])
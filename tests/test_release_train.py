@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: 2026 Klarälvdalens Datakonsult AB, a KDAB Group company <info@kdab.com>
+# SPDX-License-Identifier: MIT
+
+import json
+
+import cassette
+import release_train
+
+KDSME = ('KDStateMachineEditor', '2.2.0', 'a' * 40)
+GAMMARAY = ('GammaRay', '3.3.0', 'b' * 40)
+
+CI_RUNS = ("gh api --paginate 'repos/KDAB/{proj_name}/actions/runs?head_sha={sha1}&per_page=100&"
+           "exclude_pull_requests=true' --jq '.workflow_runs[] | [(.workflow_id // \"\"), (.name // \"\"), "
+           "(.id // \"\"), (.run_attempt // \"\"), (.status // \"\"), (.conclusion // \"\")] | @tsv'")
+
+
+def release_interactions(proj_name, version, sha1, previous_version, released_already=False):
+    '''
+    What create_release() asks GitHub for a project with a CHANGES file and a version.txt, made up
+    '''
+    def command(request, response, kind='command'):
+        return {'kind': kind, 'request': request, 'response': response}
+
+    def http(request, body):
+        return {'kind': 'http', 'request': f"https://raw.githubusercontent.com/KDAB/{proj_name}/{sha1}/{request}",
+                'response': {'body': body}}
+
+    tag = f"v{version}"
+    return [
+        http('CHANGES', f"Version {version}:\n--------------\n* Fixed things\n"),
+        http('version.txt', f"{version}\n"),
+        command(f"gh api repos/KDAB/{proj_name}/git/refs/tags/v{previous_version}", True),
+        command(CI_RUNS.format(proj_name=proj_name, sha1=sha1), "1\tCI\t11\t1\tcompleted\tsuccess\n",
+                'command_output'),
+        command(f"gh release view {tag} --repo KDAB/{proj_name}", released_already),
+        command(f"gh api repos/KDAB/{proj_name}/git/refs/tags/{tag}", False),
+        command(f"git -C repos/{proj_name} tag -a {tag} {sha1} -m \"{proj_name} {tag}\"", True),
+        command(f"git -C repos/{proj_name} push origin {tag}", True),
+        command(f"curl -L -o {proj_name.lower()}-{version}.tar.gz "
+                f"https://github.com/KDAB/{proj_name}/archive/refs/tags/{tag}.tar.gz", True),
+        command(f"tar tzf {proj_name.lower()}-{version}.tar.gz", True),
+        command(f"gh release create {tag} --repo KDAB/{proj_name} --title \"Release {tag}\" "
+                f"--notes \"* Fixed things\" {proj_name.lower()}-{version}.tar.gz", True),
+    ]
+
+
+def replay(monkeypatch, tmp_path, interactions):
+    '''
+    Replays interactions, returns the list the requests made are appended to, in order
+    '''
+    path = tmp_path / 'release-train.json'
+    path.write_text(json.dumps({'interactions': interactions}))
+    monkeypatch.setenv("CI_RELEASE_TOOLS_CASSETTE", str(path))
+    monkeypatch.setenv("CI_RELEASE_TOOLS_CASSETTE_MODE", cassette.REPLAY)
+    current = cassette.current()
+    requests = []
+    interaction = current.interaction
+
+    def logged(kind, request, func):
+        requests.append(cassette.normalized(request))
+        return interaction(kind, request, func)
+
+    monkeypatch.setattr(current, 'interaction', logged)
+    return requests
+
+
+def test_released_in_dependency_order(monkeypatch, tmp_path):
+    requests = replay(monkeypatch, tmp_path,
+                      release_interactions(*KDSME, '2.1.0') + release_interactions(*GAMMARAY, '3.2.0'))
+
+    # GammaRay is listed first, but depends on KDStateMachineEditor
+    assert release_train.release_train([GAMMARAY, KDSME], 'repos', str(tmp_path / 'work'), sign_and_upload=False)
+    published = [i for i, request in enumerate(requests) if request.startswith('gh release create')]
+    assert [requests[i].split()[5] for i in published] == ['KDAB/KDStateMachineEditor', 'KDAB/GammaRay']
+    assert all('GammaRay' not in request for request in requests[:published[0] + 1])
+
+
+def test_failure_stops_the_train(monkeypatch, tmp_path, capsys):
+    requests = replay(monkeypatch, tmp_path,
+                      release_interactions(*KDSME, '2.1.0', released_already=True) +
+                      release_interactions(*GAMMARAY, '3.2.0'))
+
+    assert not release_train.release_train([KDSME, GAMMARAY], 'repos', str(tmp_path / 'work'),
+                                           sign_and_upload=False)
+    assert "error: release v2.2.0 already exists in KDStateMachineEditor" in capsys.readouterr().out
+    assert not [request for request in requests if 'GammaRay' in request or request.startswith('git ')]
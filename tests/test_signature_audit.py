@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: 2026 Klarälvdalens Datakonsult AB, a KDAB Group company <info@kdab.com>
+# SPDX-License-Identifier: MIT
+
+from signature_audit import audit_items, pending_items, load_cache, save_cache
+
+
+def asset(name, digest=None):
+    return {'name': name, 'size': 10, 'digest': digest, 'updated_at': '2026-01-01T00:00:00Z',
+            'url': f"https://github.com/KDAB/KDSoap/releases/download/kdsoap-2.2.0/{name}"}
+
+
+RELEASE = {'tag': 'kdsoap-2.2.0',
+           'assets': [asset('kdsoap-2.2.0.tar.gz', 'sha256:aaaa'),
+                      asset('kdsoap-2.2.0.tar.gz.asc', 'sha256:bbbb'),
+                      asset('kdsoap-2.2.0.zip'),
+                      asset('kdsoap-2.2.0.zip.asc', 'sha256:cccc')]}
+
+
+def test_audit_items_pairs_signatures():
+    items, unsigned = audit_items('KDSoap', RELEASE)
+    by_name = {item['name']: item for item in items}
+
+    assert sorted(by_name) == ['kdsoap-2.2.0.tar.gz', 'kdsoap-2.2.0.zip']
+    assert by_name['kdsoap-2.2.0.tar.gz']['asset'] == 'sha256:aaaa'
+    assert by_name['kdsoap-2.2.0.tar.gz']['signature'] == 'sha256:bbbb'
+    assert by_name['kdsoap-2.2.0.zip']['asset'] == 'size:10:2026-01-01T00:00:00Z'
+    assert unsigned == []
+
+
+def test_audit_items_github_archives():
+    release = {'tag': 'v2.2.0', 'assets': [asset('v2.2.0.tar.gz.asc', 'sha256:dddd'),
+                                           asset('kdsoap-2.2.0.tar.gz', 'sha256:eeee')]}
+    items, unsigned = audit_items('KDSoap', release)
+
+    assert [item['url'] for item in items] == [
+        "https://github.com/KDAB/KDSoap/archive/refs/tags/v2.2.0.tar.gz"]
+    assert unsigned == ['KDSoap/v2.2.0/kdsoap-2.2.0.tar.gz']
+
+
+def test_audit_items_archive_identities():
+    releases = [{'tag': tag, 'tag_sha1': sha1, 'assets': [asset(f"{tag}{suffix}.asc", f"sha256:{tag}{suffix}")
+                                                          for suffix in ('.tar.gz', '.zip')]}
+                for tag, sha1 in (('v2.1.0', 'a' * 40), ('v2.2.0', 'b' * 40))]
+    items = [item for release in releases for item in audit_items('KDSoap', release)[0]]
+    assert [item['asset'] for item in items] == [f"archive:{'a' * 40}"] * 2 + [f"archive:{'b' * 40}"] * 2
+    verified = {item['key']: {'asset': item['asset'], 'signature': item['signature'], 'fingerprint': 'KDAB'}
+                for item in items}
+    assert pending_items(items, verified) == []
+
+    # The tag moved
+    releases[0]['tag_sha1'] = 'c' * 40
+    moved = [item for release in releases for item in audit_items('KDSoap', release)[0]]
+    assert pending_items(moved, verified) == moved[:2]
+
+    # Without the tag's commit, archives are always verified
+    del releases[1]['tag_sha1']
+    unknown = audit_items('KDSoap', releases[1])[0]
+    assert pending_items(unknown, verified) == unknown
+
+
+def test_pending_items_checks_the_signer():
+    items, _ = audit_items('KDSoap', RELEASE)
+    verified = {item['key']: {'asset': item['asset'], 'signature': item['signature'], 'fingerprint': 'OTHER'}
+                for item in items}
+    assert pending_items(items, verified) == []
+    assert pending_items(items, verified, trusted={'KDAB'}) == items
+
+
+def test_pending_items_skips_verified_pairs(tmp_path):
+    items, _ = audit_items('KDSoap', RELEASE)
+    cache_file = str(tmp_path / 'cache' / 'signature-audit.json')
+    assert load_cache(cache_file) == {}
+
+    tarball = next(item for item in items if item['name'] == 'kdsoap-2.2.0.tar.gz')
+    save_cache(cache_file, {tarball['key']: {'asset': 'sha256:aaaa', 'signature': 'sha256:bbbb'}})
+    verified = load_cache(cache_file)
+    assert tarball not in pending_items(items, verified)
+    assert len(pending_items(items, verified)) == len(items) - 1
+
+    # A re-uploaded signature is verified again
+    verified[tarball['key']]['signature'] = 'sha256:old'
+    assert tarball in pending_items(items, verified)
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: 2026 Klarälvdalens Datakonsult AB, a KDAB Group company <info@kdab.com>
+# SPDX-License-Identifier: MIT
+
+# Guards the cold start of ci_release_tools.py: subcommands must only import what they need.
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ENTRY_POINT = str(Path(__file__).parent.parent / "src" / "ci_release_tools.py")
+
+# Total import time allowed for a subcommand, in microseconds. Generous, as CI runners are noisy.
+STARTUP_BUDGET_US = 150_000
+
+HEAVY_MODULES = {'requests', 'packaging', 'urllib.request', 'ssl', 'tomllib', 'changelog_utils'}
+
+
+def import_times(args):
+    '''
+    Runs the entry point with -X importtime.
+    Returns a dict of imported module to its cumulative import time (us).
+    '''
+    env = dict(os.environ, CI_RELEASE_TOOLS_NO_DAEMON="1")
+    result = subprocess.run([sys.executable, '-X', 'importtime', ENTRY_POINT] + args,
+                            capture_output=True, text=True, env=env, check=False)
+
+    modules = {}
+    for line in result.stderr.split('\n'):
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        modules[name.rstrip()] = int(cumulative)
+    return modules
+
+
+def top_level_import_time(modules):
+    return sum(time for name, time in modules.items() if not name.startswith(' '))
+
+
+def imported(modules):
+    return {name.strip() for name in modules}
+
+
+def test_help_imports_no_subsystem():
+    modules = imported(import_times(['--help']))
+    assert 'gh_utils' not in modules
+    assert 'utils' not in modules
+    assert not modules & HEAVY_MODULES
+
+
+def test_gh_subcommand_is_lazy():
+    modules = imported(import_times(['gh', '--help']))
+    assert 'gh_utils' in modules
+    assert 'version_utils' not in modules
+    assert not modules & HEAVY_MODULES
+
+
+def test_version_subcommand_startup_budget():
+    modules = import_times(['version', '--has-newer-version', '1.0.0', '1.1.0'])
+    names = imported(modules)
+    assert 'packaging' in names
+    assert 'gh_utils' not in names
+    assert 'requests' not in names
+
+    assert top_level_import_time(modules) < STARTUP_BUDGET_US
@@ -9,7 +9,7 @@ import gh_utils
 import utils
 
 
-def test_get_version_in_versiontxt():
+def test_get_version_in_versiontxt(recorded):
     '''
     tests version_utils.get_current_version_in_cmake() and
     indirectly version_utils.get_version_in_versiontxt()
@@ -23,7 +23,7 @@ def test_get_version_in_versiontxt():
     assert version_utils.is_numeric(version)
 
 
-def test_submodule_versions():
+def test_submodule_versions(recorded):
     '''
     Tests gh_utils.get_submodule_versions()
     We have knut as a submodule, do not bump it
@@ -43,7 +43,7 @@ def test_submodule_versions():
         i += 1
 
 
-def test_fetchcontent_versions():
+def test_fetchcontent_versions(recorded):
     '''
     Tests gh_utils.get_current_fetchcontent_sha1s()
     We have kdutils as a submodule, do not bump it
@@ -73,3 +73,23 @@ def test_fetchcontent_versions():
         # we can't compare latest_version, as that changes upstream
         assert version['current_version'] == expected[i]['current_version']
         i += 1
+
+
+def test_aggregate_ci_runs():
+    def run(run_id, name, status='completed', conclusion='success', attempt=1, workflow_id=None):
+        return {'id': run_id, 'workflow_id': workflow_id or hash(name), 'name': name, 'run_attempt': attempt,
+                'status': status, 'conclusion': conclusion if status == 'completed' else ''}
+
+    runs = [
+        run(1, 'CI', conclusion='failure'),
+        run(1, 'CI', attempt=2),                      # re-run fixed it
+        run(2, 'Docs', conclusion='skipped'),
+        run(3, 'Sanitizers', conclusion='timed_out'),
+        run(4, 'Nightly', conclusion='cancelled'),
+        run(5, 'Nightly', status='in_progress'),      # newer run of the same workflow
+        run(6, 'Create release', conclusion='failure'),
+        run(7, 'CI', conclusion='failure', workflow_id='ci-windows'),  # another workflow file, same name
+    ]
+    states = {(run['name'], state) for state, run in gh_utils.aggregate_ci_runs(runs).values()}
+    assert states == {('CI', gh_utils.CI_PASSED), ('CI', gh_utils.CI_FAILED), ('Docs', gh_utils.CI_PASSED),
+                      ('Sanitizers', gh_utils.CI_FAILED), ('Nightly', gh_utils.CI_IN_PROGRESS)}
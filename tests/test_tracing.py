@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: 2026 Klarälvdalens Datakonsult AB, a KDAB Group company <info@kdab.com>
+# SPDX-License-Identifier: MIT
+
+import io
+import json
+
+import pytest
+
+import tracing
+import utils
+from pipeline import Step, run_pipeline
+
+
+@pytest.fixture
+def enabled(monkeypatch):
+    monkeypatch.setattr(tracing, 'ENABLED', True)
+    monkeypatch.setattr(tracing, '_spans', [])
+
+
+def spans_of(category):
+    return [span for span in tracing.spans() if span.category == category]
+
+
+def test_commands_are_traced_with_their_step(enabled):
+    with tracing.step('can_bump_to'):
+        with tracing.step('ci_run_status'):
+            assert utils.run_command_with_output("printf hello") == "hello"
+        assert not utils.run_command_silent("exit 3")
+
+    commands = spans_of('command')
+    assert [span.step for span in commands] == ['can_bump_to/ci_run_status', 'can_bump_to']
+    assert commands[0].args == {'exit_code': 0, 'bytes': 5}
+    assert commands[1].args == {'exit_code': 3}
+    assert [span.name for span in spans_of('step')] == ['can_bump_to/ci_run_status', 'can_bump_to']
+
+
+def test_pipeline_steps_inherit_the_callers_step(enabled):
+    seen = {}
+
+    def record(name):
+        def func():
+            seen[name] = tracing.current_step()
+            return True
+        return func
+
+    with tracing.step('create_release'):
+        assert run_pipeline([Step('ci_status', record('ci_status')),
+                             Step('tag', record('tag'), ['ci_status'])])
+
+    assert seen == {'ci_status': 'create_release/ci_status', 'tag': 'create_release/tag'}
+    assert tracing.current_step() == ''
+
+
+def test_chrome_trace_and_summary(enabled, tmp_path):
+    with tracing.step('sign_and_upload'):
+        utils.run_command_silent("true")
+
+    trace_file = tmp_path / 'trace.json'
+    tracing.write_chrome_trace(trace_file)
+    events = json.loads(trace_file.read_text())['traceEvents']
+    complete = [event for event in events if event['ph'] == 'X']
+    assert {event['cat'] for event in complete} == {'step', 'command'}
+    assert all(event['dur'] >= 0 and 'step' in event['args'] for event in complete)
+    assert any(event['ph'] == 'M' and event['name'] == 'thread_name' for event in events)
+
+    summary = io.StringIO()
+    tracing.print_summary(5, file=summary)
+    lines = summary.getvalue().splitlines()
+    assert lines[0] == "Slowest 1 of 1 operations:"
+    assert "true  [sign_and_upload] exit_code=0" in lines[1]
+    assert lines[2].startswith("  totals: command 1x")
+
+
+def test_disabled_records_nothing(monkeypatch):
+    monkeypatch.setattr(tracing, 'ENABLED', False)
+    monkeypatch.setattr(tracing, '_spans', [])
+    with tracing.step('release'):
+        assert utils.run_command_silent("true")
+    assert tracing.spans() == []